@@ -0,0 +1,37 @@
+"""
+Mede a vazão de run_batch (jobs por segundo) com 1, 2, 4, ... processos até
+os.cpu_count(), rodando o programa de multiplicação com entradas diferentes,
+e o ganho sobre um processo só. O ganho deve acompanhar o número de núcleos
+livres da máquina.
+
+    python -m benchmarks.batch [jobs]
+"""
+import os
+import sys
+import time
+
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.batch import Job, STATUS_OK, run_batch
+
+def jobs(count: int):
+    # As palavras 0 e 2 são o LOCO 5 e o LOCO 4 (x e y); o resultado fica em final, no endereço 21
+    return [Job(MULTIPLICATION, {0: 0x7000 | (1 + k % 5), 2: 0x7000 | (1 + k % 3)}, cells=(21,)) for k in range(count)]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    batch = jobs(count)
+    counts, workers = [], 1
+    while workers <= (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    base = None
+    for workers in counts:
+        start = time.perf_counter()
+        results = list(run_batch(batch, workers=workers))
+        seconds = time.perf_counter() - start
+        assert all(result.status == STATUS_OK for result in results)
+        base = base or seconds
+        print(f"workers={workers:<3} {count / seconds:8.1f} jobs/s  {base / seconds:5.2f}x")
+
+if __name__ == "__main__":
+    main()
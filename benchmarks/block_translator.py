@@ -0,0 +1,40 @@
+"""
+Compara o IsaInterpreter com o BlockTranslator em um laço longo (a
+multiplicação do teste de integração com um multiplicador grande) e mostra
+as estatísticas de tradução e encadeamento de blocos.
+
+    python -m benchmarks.block_translator [multiplier]
+"""
+import sys
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.block_translator import BlockTranslator
+from src.mic1.isa_interpreter import IsaInterpreter
+from src.mic1.mic1 import Mic1
+
+def program(multiplier: int) -> list:
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION.replace("LOCO 5", f"LOCO {multiplier}"))
+    return mic1.mp.dump_words()
+
+def main():
+    multiplier = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    memory = program(multiplier)
+    instructions = 8 * multiplier + 10 # o laço tem 8 instruções por volta
+
+    rates = {}
+    for engine_class in (IsaInterpreter, BlockTranslator):
+        rates[engine_class] = instructions / timed(lambda: engine_class(memory).run(instructions))
+        print(f"{engine_class.__name__:<16} {rates[engine_class]:12.0f} instr/s")
+    print(f"speedup: {rates[BlockTranslator] / rates[IsaInterpreter]:.1f}x")
+
+    translator = BlockTranslator(memory)
+    translator.run(instructions)
+    for name, value in translator.statistics().items():
+        print(f"  {name:<15} {value:.3f}" if isinstance(value, float) else f"  {name:<15} {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Utilitários compartilhados pelos benchmarks (rodar da raiz: python -m
+benchmarks.<nome>). Os programas MAC-1 ficam em src.mic1.programs.
+"""
+import contextlib
+import io
+import time
+
+def quiet():
+    """Silencia o stdout (o aviso do ControlUnit quando falta o control_store.txt)."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def timed(func, *args, repeat: int = 3):
+    """Menor tempo de parede (s) entre `repeat` execuções de func(*args)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
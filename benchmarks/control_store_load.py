@@ -0,0 +1,55 @@
+"""
+Mede a carga do control store: interpretando o texto (use_cache=False),
+pela imagem binária em __pycache__, copiando a imagem já em memória e só
+referenciando a imagem compartilhada; e quanto custa (tempo e memória)
+construir um Mic1 com o cache quente.
+
+    python -m benchmarks.control_store_load [repeat]
+"""
+import sys
+import tracemalloc
+
+from benchmarks.common import quiet, timed
+from src.components.signals import SignalSender
+from src.mic1.control_store import ControlStore, CtrlStoreTxtSrcFileLoader
+from src.mic1.mic1 import Mic1
+
+def load(use_cache: bool, keep_memory_cache: bool, repeat: int):
+    store = ControlStore(SignalSender(0), SignalSender(0), SignalSender(0), None)
+    loader = CtrlStoreTxtSrcFileLoader(use_cache=use_cache)
+    for _ in range(repeat):
+        if not keep_memory_cache:
+            CtrlStoreTxtSrcFileLoader.clear_memory_cache()
+        loader.load(store)
+
+def share(repeat: int):
+    store = ControlStore(SignalSender(0), SignalSender(0), SignalSender(0), None)
+    loader = CtrlStoreTxtSrcFileLoader()
+    for _ in range(repeat):
+        store.share_image(loader.shared_image(len(store)))
+
+def construct(repeat: int):
+    with quiet():
+        for _ in range(repeat):
+            Mic1()
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    load(True, True, 1) # garante a imagem em disco
+    text = timed(load, False, True, repeat) / repeat
+    for label, use_cache, keep in (("text", False, True), ("disk cache", True, False), ("memory cache", True, True)):
+        seconds = timed(load, use_cache, keep, repeat) / repeat
+        print(f"{label:<14} {seconds * 1e6:9.1f} us/load  {text / seconds:6.1f}x")
+    seconds = timed(share, repeat) / repeat
+    print(f"{'shared image':<14} {seconds * 1e6:9.1f} us/load  {text / seconds:6.1f}x")
+    print(f"{'Mic1()':<14} {timed(construct, repeat) / repeat * 1e6:9.1f} us/machine")
+
+    tracemalloc.start()
+    with quiet():
+        machines = [Mic1() for _ in range(repeat)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'Mic1()':<14} {allocated / len(machines) / 1024:9.1f} KiB/machine")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Compara o modo por eventos com o modo levelizado (ordem estática por fase)
+rodando o programa de multiplicação, e mostra quantos componentes cada fase
+avalia no modo levelizado.
+
+    python -m benchmarks.evaluation_modes [micro_steps]
+"""
+import sys
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.mic1 import Mic1
+
+def build(evaluation: str) -> Mic1:
+    with quiet():
+        mic1 = Mic1(evaluation=evaluation)
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+    return mic1
+
+def run(evaluation: str, micro_steps: int):
+    mic1 = build(evaluation)
+    with quiet():
+        for _ in range(micro_steps):
+            mic1.step_micro()
+
+def main():
+    micro_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    results = {mode: timed(run, mode, micro_steps) for mode in Mic1.EVALUATION_MODES}
+    for mode, elapsed in results.items():
+        print(f"{mode:<10} {elapsed * 1000:8.1f} ms  {micro_steps / elapsed:10.0f} micro/s")
+    print(f"levelized / event: {results['levelized'] / results['event']:.2f}x")
+
+    schedule = build("levelized")._schedule
+    print(f"{schedule.node_count} componentes no grafo")
+    for phase in range(4):
+        print(f"  fase {phase}: {len(schedule.phase_order(phase))} avaliações")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Mede o EventHandler contra a versão anterior (lista, com `in` e `remove`
+lineares no -=): o custo de um invoke com 1, 4 e 16 listeners e o de sair e
+voltar à lista com 256 listeners. Depois roda o programa de multiplicação
+com e sem event_profile.profiling, para mostrar o custo do perfil, e
+imprime as linhas mais caras da tabela.
+
+    python -m benchmarks.event_handler [iterations]
+"""
+import sys
+import textwrap
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.components.event_profile import EventProfile, profiling
+from src.components.signals import EventHandler
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.mic1 import Mic1
+
+class ListEventHandler:
+    """A versão anterior de EventHandler."""
+
+    def __init__(self):
+        self._listeners = []
+
+    def __iadd__(self, listener):
+        self._listeners.append(listener)
+        return self
+
+    def __isub__(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        return self
+
+    def invoke(self, sender, args):
+        for listener in self._listeners:
+            listener(sender, args)
+
+def with_listeners(cls, count: int):
+    handler = cls()
+    for _ in range(count):
+        handler += lambda sender, args: None
+    return handler
+
+def invoke(handler, iterations: int):
+    for _ in range(iterations):
+        handler.invoke(None, None)
+
+def churn(handler, iterations: int):
+    listener = lambda sender, args: None
+    for _ in range(iterations):
+        handler += listener
+        handler -= listener
+
+def multiplication():
+    with quiet():
+        mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(MULTIPLICATION))
+    return mic1
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'':>18} {'EventHandler':>14} {'ListEventHandler':>17}")
+    for count in (1, 4, 16):
+        costs = [timed(invoke, with_listeners(cls, count), iterations) / iterations * 1e9
+                 for cls in (EventHandler, ListEventHandler)]
+        print(f"invoke, {count:>2} listeners {costs[0]:11.0f} ns {costs[1]:14.0f} ns")
+    costs = [timed(churn, with_listeners(cls, 256), iterations) / iterations * 1e9
+             for cls in (EventHandler, ListEventHandler)]
+    print(f"+= -=, 256 listeners {costs[0]:9.0f} ns {costs[1]:14.0f} ns")
+
+    plain = timed(lambda: multiplication().run())
+    profile = EventProfile()
+    def profiled():
+        mic1 = multiplication()
+        profile.reset()
+        profile.name_components(mic1)
+        with profiling(profile):
+            mic1.run()
+    print(f"\nmultiplication: {plain * 1e3:.1f} ms, profiled {timed(profiled) * 1e3:.1f} ms\n")
+    print(profile.table(by_component=True, limit=10))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compara o step_macro do Mic1 (simulação por eventos) com o IsaInterpreter
+no programa de multiplicação, em instruções MAC-1 por segundo.
+
+    python -m benchmarks.isa_interpreter [macro_steps]
+"""
+import sys
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.isa_interpreter import IsaInterpreter
+from src.mic1.mic1 import Mic1
+
+def build() -> Mic1:
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+    return mic1
+
+def run_mic1(macro_steps: int):
+    mic1 = build()
+    with quiet():
+        for _ in range(macro_steps):
+            mic1.step_macro()
+
+def run_interpreter(instructions: int):
+    IsaInterpreter.from_mic1(build()).run(instructions)
+
+def main():
+    macro_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    instructions = 1_000_000
+    mic1_rate = macro_steps / timed(run_mic1, macro_steps)
+    # build() também entra no tempo, mas é diluído em um milhão de instruções
+    interpreter_rate = instructions / timed(run_interpreter, instructions)
+    print(f"Mic1.step_macro  {mic1_rate:12.0f} instr/s")
+    print(f"IsaInterpreter   {interpreter_rate:12.0f} instr/s")
+    print(f"speedup: {interpreter_rate / mic1_rate:.0f}x")
+
+if __name__ == "__main__":
+    main()
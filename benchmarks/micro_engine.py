@@ -0,0 +1,41 @@
+"""
+Compara o step_micro do Mic1 (simulação por eventos) com o MicroEngine, que
+roda o control store pré-decodificado sobre inteiros, e com o MicrocodeJit,
+que compila cada endereço em uma função, no programa de multiplicação.
+
+    python -m benchmarks.micro_engine [micro_steps]
+"""
+import sys
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.micro_engine import MicroEngine
+from src.mic1.microcode_jit import MicrocodeJit
+from src.mic1.mic1 import Mic1
+
+def build() -> Mic1:
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+    return mic1
+
+def run_mic1(micro_steps: int):
+    mic1 = build()
+    with quiet():
+        for _ in range(micro_steps):
+            mic1.step_micro()
+
+def run_engine(engine_class, micro_steps: int):
+    engine_class.from_mic1(build()).run_micro(micro_steps)
+
+def main():
+    micro_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    mic1_rate = micro_steps / timed(run_mic1, micro_steps)
+    print(f"{'Mic1.step_micro':<16} {mic1_rate:12.0f} micro/s")
+    for engine_class in (MicroEngine, MicrocodeJit):
+        rate = 200_000 / timed(run_engine, engine_class, 200_000)
+        print(f"{engine_class.__name__:<16} {rate:12.0f} micro/s  {rate / mic1_rate:6.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Mede o custo de trocar a seleção de um Multiplexer de 16 entradas (como os
+muxes dos barramentos A/B faziam a cada microinstrução) com 0, 16 e 256
+outros listeners em cada entrada. O Multiplexer assina as entradas uma vez,
+então o custo não depende desses listeners; ChurningMultiplexer reproduz a
+implementação anterior, que saía e entrava na lista de listeners da entrada
+a cada troca (um `in` e um `remove` lineares em EventHandler.__isub__).
+
+    python -m benchmarks.multiplexer [switches]
+"""
+import sys
+
+from benchmarks.common import timed
+from src.components.multiplexer import Multiplexer
+from src.components.signals import SignalSender
+from src.utils.bit_utils import BitArray
+
+class ChurningMultiplexer(Multiplexer):
+    """A versão anterior: só ouve a entrada selecionada e troca a assinatura a cada seleção."""
+
+    def __init__(self, length, input_senders, control_sender):
+        super().__init__(length, input_senders, control_sender)
+        for sender in input_senders:
+            sender.signal_changed -= self._on_input_change
+        self._current.signal_changed += self._on_input_change
+
+    def set_output(self, index: int):
+        self._current.signal_changed -= self._on_input_change
+        self._current = self._in[index]
+        self._current.signal_changed += self._on_input_change
+        self._out.set_data(self._current.signal())
+
+def build(cls, listeners: int):
+    inputs = [SignalSender(BitArray.from_int(i, 16)) for i in range(16)]
+    for sender in inputs:
+        for _ in range(listeners):
+            sender.signal_changed += lambda sender, value: None
+    control = SignalSender(4)
+    return cls(16, inputs, control), control
+
+def switch(mux_and_control, switches: int):
+    _, control = mux_and_control
+    selections = [BitArray.from_int(k * 7 % 16, 4).frozen() for k in range(16)]
+    for k in range(switches):
+        control.set_data(selections[k % 16])
+
+def main():
+    switches = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'listeners':>9} {'Multiplexer':>14} {'ChurningMultiplexer':>20}")
+    for listeners in (0, 16, 256):
+        costs = [timed(switch, build(cls, listeners), switches) / switches * 1e9
+                 for cls in (Multiplexer, ChurningMultiplexer)]
+        print(f"{listeners:>9} {costs[0]:11.0f} ns {costs[1]:17.0f} ns")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Conta quantos BitArray/SignalValue são criados por ciclo de clock ao rodar o
+programa de multiplicação no Mic1 orientado a eventos.
+
+    python -m benchmarks.signal_allocations [micro_steps]
+"""
+import sys
+
+from benchmarks.common import quiet
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.mic1 import Mic1
+from src.utils import bit_utils
+from src.utils.bit_utils import BitArray
+
+def count_allocations(micro_steps: int):
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+
+    codes = {
+        BitArray.__init__.__code__: "BitArray",
+        bit_utils._new_value.__code__: "SignalValue",
+    }
+    counts = {name: 0 for name in codes.values()}
+
+    def profiler(frame, event, arg):
+        if event == "call":
+            name = codes.get(frame.f_code)
+            if name is not None:
+                counts[name] += 1
+
+    sys.setprofile(profiler)
+    try:
+        with quiet():
+            for _ in range(micro_steps):
+                mic1.step_micro()
+    finally:
+        sys.setprofile(None)
+    return counts
+
+def main():
+    micro_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    counts = count_allocations(micro_steps)
+    cycles = micro_steps * 4
+    total = sum(counts.values())
+    print(f"{micro_steps} microinstruções ({cycles} ciclos de clock)")
+    for name, count in counts.items():
+        print(f"  {name:<12} {count:>8}  ({count / cycles:.1f}/ciclo)")
+    print(f"  {'total':<12} {total:>8}  ({total / cycles:.1f}/ciclo)")
+
+if __name__ == "__main__":
+    main()
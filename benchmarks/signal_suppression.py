@@ -0,0 +1,32 @@
+"""
+Mostra, por sinal do Mic1, quantos eventos foram propagados e quantos foram
+suprimidos (escritas sem mudança de valor) ao rodar o programa de multiplicação.
+
+    python -m benchmarks.signal_suppression [micro_steps]
+"""
+import sys
+
+from benchmarks.common import quiet
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.mic1 import Mic1
+
+def main():
+    micro_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+        mic1.reset_signal_statistics()
+        for _ in range(micro_steps):
+            mic1.step_micro()
+
+    stats = mic1.signal_statistics()
+    print(f"{'sinal':<16} {'disparados':>10} {'suprimidos':>10}")
+    for name, fired, suppressed in sorted(stats, key=lambda row: -row[2]):
+        print(f"{name:<16} {fired:>10} {suppressed:>10}")
+    fired = sum(row[1] for row in stats)
+    suppressed = sum(row[2] for row in stats)
+    print(f"{'total':<16} {fired:>10} {suppressed:>10}  ({suppressed / max(1, fired + suppressed):.0%} suprimidos)")
+
+if __name__ == "__main__":
+    main()
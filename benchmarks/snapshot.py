@@ -0,0 +1,84 @@
+"""
+Mede snapshot/restore/fork de um Mic1 no meio do programa de multiplicação,
+e gravar/carregar o mesmo estado como checkpoint em disco (com a memória
+mapeada ou copiada), contra rodar o prefixo de novo em uma máquina nova; e
+quanta memória nova cada snapshot de uma sequência ocupa (só as páginas
+escritas entre eles).
+
+    python -m benchmarks.snapshot [repeat]
+"""
+import os
+import sys
+import tempfile
+import textwrap
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.checkpoint import load_checkpoint, save_checkpoint
+from src.mic1.mic1 import Mic1
+
+PREFIX = 2000
+
+def loaded() -> Mic1:
+    with quiet():
+        mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(MULTIPLICATION))
+    return mic1
+
+def rerun(repeat: int):
+    for _ in range(repeat):
+        loaded().run(max_cycles=PREFIX)
+
+def snapshot(mic1: Mic1, repeat: int):
+    for _ in range(repeat):
+        mic1.snapshot()
+
+def restore(mic1: Mic1, snap, repeat: int):
+    for _ in range(repeat):
+        mic1.restore(snap)
+
+def fork(mic1: Mic1, repeat: int):
+    with quiet():
+        for _ in range(repeat):
+            mic1.fork()
+
+def save(mic1: Mic1, path: str, repeat: int):
+    for _ in range(repeat):
+        save_checkpoint(mic1, path)
+
+def load(mic1: Mic1, path: str, map_memory: bool, repeat: int):
+    for _ in range(repeat):
+        load_checkpoint(path, mic1, map_memory=map_memory)
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    mic1 = loaded()
+    mic1.run(max_cycles=PREFIX)
+    snap = mic1.snapshot()
+    base = timed(rerun, 5) / 5
+    print(f"{'rerun prefix':<14} {base * 1e6:9.1f} us")
+    for label, func, args in (("snapshot", snapshot, (mic1,)), ("restore", restore, (mic1, snap)),
+                              ("fork", fork, (mic1,))):
+        seconds = timed(func, *args, repeat) / repeat
+        print(f"{label:<14} {seconds * 1e6:9.1f} us  {base / seconds:8.1f}x")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mic1.ckpt")
+        target = loaded()
+        print(f"{'save':<14} {timed(save, mic1, path, repeat) / repeat * 1e6:9.1f} us  ({os.path.getsize(path)} bytes)")
+        for label, map_memory in (("load (mmap)", True), ("load (copy)", False)):
+            seconds = timed(load, target, path, map_memory, repeat) / repeat
+            print(f"{label:<14} {seconds * 1e6:9.1f} us  {base / seconds:8.1f}x")
+        del target
+
+    snapshots = []
+    for _ in range(20):
+        mic1.run(max_cycles=200)
+        snapshots.append(mic1.snapshot())
+    pages = {id(page): len(page) for snap in snapshots for page in snap.memory}
+    full = sum(len(page) for page in snapshots[0].memory)
+    print(f"{'20 snapshots':<14} {sum(pages.values()) / 1024:9.1f} KiB of pages ({20 * full / 1024:.1f} KiB if copied)")
+
+if __name__ == "__main__":
+    main()
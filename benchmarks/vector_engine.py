@@ -0,0 +1,55 @@
+"""
+Mede a vazão do VectorEngine (instruções MAC-1 por segundo, somando todas
+as lanes) no programa de multiplicação com K = 1, 4, 16, ... entradas
+diferentes, contra o IsaInterpreter rodando as mesmas K máquinas uma a uma.
+A vazão do VectorEngine deve crescer com K, já que o custo de cada passo é
+quase todo fixo.
+
+    python -m benchmarks.vector_engine [max_lanes]
+"""
+import sys
+
+from benchmarks.common import quiet, timed
+from src.mic1.programs import MULTIPLICATION
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.isa_interpreter import IsaInterpreter
+from src.mic1.mic1 import Mic1
+from src.mic1.vector_engine import VectorEngine
+
+STEPS = 2000
+
+def build() -> Mic1:
+    with quiet():
+        mic1 = Mic1()
+        AssemblerV2.assemble(mic1.mp, MULTIPLICATION)
+    return mic1
+
+def engine(mic1: Mic1, lanes: int) -> VectorEngine:
+    engine = VectorEngine.from_mic1(mic1, lanes)
+    # As palavras 0 e 2 são o LOCO 5 e o LOCO 4 (x e y); x grande o bastante para não parar antes de STEPS
+    engine.memory[:, 0] = 0x7000 | 1000
+    engine.memory[:, 2] = 0x7000 | (engine.memory[:, 2] + range(lanes)) & 0x0FFF
+    return engine
+
+def run_engine(mic1: Mic1, lanes: int):
+    engine(mic1, lanes).run(STEPS)
+
+def run_interpreters(mic1: Mic1, lanes: int):
+    vector = engine(mic1, lanes)
+    for lane in range(lanes):
+        interpreter = IsaInterpreter(vector.memory[lane].tolist())
+        interpreter.run(STEPS)
+
+def main():
+    max_lanes = int(sys.argv[1]) if len(sys.argv) > 1 else 4096
+    mic1 = build()
+    lanes = 1
+    while lanes <= max_lanes:
+        engine_rate = lanes * STEPS / timed(run_engine, mic1, lanes)
+        interpreter_rate = lanes * STEPS / timed(run_interpreters, mic1, lanes, repeat=1)
+        print(f"K={lanes:<5} VectorEngine {engine_rate:12.0f} instr/s  "
+              f"IsaInterpreter {interpreter_rate:10.0f} instr/s  {engine_rate / interpreter_rate:6.2f}x")
+        lanes *= 4
+
+if __name__ == "__main__":
+    main()
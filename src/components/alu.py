@@ -1,6 +1,7 @@
 from typing import Callable, List
-from src.utils.bit_utils import BitArray
+from src.utils.bit_utils import BitArray, SignalValue
 from src.components.signals import ISignalSender, SignalSender, SingleSignalSender
+from src.components.levelized import Ports
 
 class Alu:
     def __init__(self, in_a: ISignalSender, in_b: ISignalSender, in_control: ISignalSender):
@@ -15,8 +16,6 @@ class Alu:
         self._out_n = SingleSignalSender()
         self._out_z = SingleSignalSender()
 
-        self._functions = [self.sum_op, self.and_op, self.identity_op, self.inverse_op]
-
         self._in_a.signal_changed += self._update
         self._in_b.signal_changed += self._update
         self._in_control.signal_changed += self._update
@@ -28,29 +27,23 @@ class Alu:
     @property
     def out_z(self) -> ISignalSender: return self._out_z
 
-    def _update(self, sender, _):
-        idx = self._in_control.signal().to_int32()
-        if 0 <= idx < len(self._functions):
-            result = self._functions[idx](self._in_a.signal(), self._in_b.signal())
-        else:
-            result = BitArray(len(self._in_a.signal())) # Fallback
+    def _ports(self) -> Ports:
+        return Ports([self._out, self._out_n, self._out_z],
+                     inputs=[self._in_a, self._in_b, self._in_control],
+                     evaluate=lambda: self._update(None, None))
 
-        self._out.set_data(result)
-        self._out_n.set_enable(result[len(result) - 1])
-        self._out_z.set_enable(not result.has_any_set())
+    def _update(self, sender, _):
+        a = self._in_a.signal()
+        length = a.length
+        value = alu_kernel(self._in_control.signal().to_int32(), a.value, self._in_b.signal().value, (1 << length) - 1)
+        self._out.set_data(SignalValue.of(value, length))
+        self._out_n.set_enable(value >> (length - 1))
+        self._out_z.set_enable(not value)
 
     @staticmethod
     def sum_op(a: BitArray, b: BitArray) -> BitArray:
         if len(a) != len(b): raise ValueError("BitArrays must be same length")
-        result = BitArray(len(a))
-        carry = False
-        for i in range(len(a)):
-            bit_a = a[i]
-            bit_b = b[i]
-            # Python bitwise XOR for bools
-            result[i] = bit_a ^ bit_b ^ carry
-            carry = (bit_a and bit_b) or (bit_a and carry) or (bit_b and carry)
-        return result
+        return BitArray.from_int(alu_kernel(ALU_SUM, a.value, b.value, (1 << len(a)) - 1), len(a))
 
     @staticmethod
     def and_op(a: BitArray, b: BitArray) -> BitArray:
@@ -66,4 +59,18 @@ class Alu:
     def inverse_op(a: BitArray, b: BitArray) -> BitArray:
         res = a.clone()
         res.not_op()
-        return res
\ No newline at end of file
+        return res
+
+ALU_SUM, ALU_AND, ALU_IDENTITY, ALU_INVERSE = range(4)
+
+def alu_kernel(function: int, a: int, b: int, mask: int) -> int:
+    """
+    A função da ALU sobre inteiros de largura `mask` (o resultado dos
+    métodos *_op de BitArray, sem percorrer bits). Funções fora de 0..3 dão 0.
+    N é o bit mais alto do resultado e Z, resultado == 0.
+    """
+    if function == ALU_SUM: return (a + b) & mask
+    if function == ALU_AND: return a & b
+    if function == ALU_IDENTITY: return a
+    if function == ALU_INVERSE: return ~a & mask
+    return 0
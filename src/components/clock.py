@@ -1,6 +1,48 @@
-from typing import List
-from src.utils.bit_utils import BitArray
+import heapq
+from typing import Callable, List, Optional, Tuple
+from src.utils.bit_utils import BitArray, SignalValue
 from src.components.signals import ISignalSender, SingleSignalSender, EventHandler
+from src.components.levelized import Ports
+
+class Timer:
+    """
+    Evento temporizado de um componente, disparado pelo Clock depois de um
+    número de trocas de fase (Clock.timer). Cada Timer tem no máximo um
+    disparo pendente: start() substitui o anterior e cancel() o descarta.
+    """
+    __slots__ = ("_clock", "_order", "_callback", "_due", "_generation")
+
+    def __init__(self, clock: 'Clock', order: int, callback: Callable[[], None]):
+        self._clock = clock
+        self._order = order
+        self._callback = callback
+        self._due: Optional[int] = None
+        self._generation = 0
+
+    @property
+    def callback(self) -> Callable[[], None]:
+        return self._callback
+
+    @property
+    def due(self) -> Optional[int]:
+        """Troca de fase (Clock.ticks) do último disparo agendado, ou None se cancelado."""
+        return self._due
+
+    @property
+    def pending(self) -> bool:
+        return self._due is not None and self._due > self._clock.ticks
+
+    def start(self, delay: int):
+        """Dispara o callback na delay-ésima troca de fase a partir de agora (nunca, com delay 0)."""
+        clock = self._clock
+        self._due = clock.ticks + delay
+        self._generation += 1
+        if delay > 0:
+            heapq.heappush(clock._events, (self._due, self._order, self._generation, self))
+
+    def cancel(self):
+        self._due = None
+        self._generation += 1
 
 class Clock:
     def __init__(self, cycles: int):
@@ -8,12 +50,56 @@ class Clock:
         self._current_cycle = -1
         self._signals = [SingleSignalSender() for _ in range(cycles)]
         self.stepped = EventHandler()
+        self._ticks = 0
+        self._timers: List[Timer] = []
+        # Heap de (troca de fase, ordem do timer, geração, timer); entradas de
+        # uma geração antiga (timer reiniciado ou cancelado) são ignoradas
+        self._events = []
+
+    @property
+    def cycles(self) -> int:
+        return self._cycles
 
     def current_cycle(self) -> int:
         return self._current_cycle
     
+    @property
+    def ticks(self) -> int:
+        """Trocas de fase desde a criação (não volta a 0 no reset)."""
+        return self._ticks
+
+    @property
+    def timers(self) -> List[Timer]:
+        return list(self._timers)
+
+    def _state(self) -> Tuple[int, int, Tuple[Optional[int], ...]]:
+        """(fase atual, ticks, disparo agendado de cada timer): o que Mic1.snapshot guarda do clock."""
+        return self._current_cycle, self._ticks, tuple(timer._due for timer in self._timers)
+
+    def _load_state(self, state: Tuple[int, int, Tuple[Optional[int], ...]]):
+        # Não mexe nos sinais das fases (o Mic1 restaura todos os sinais) nem dispara nada
+        self._current_cycle, self._ticks, dues = state
+        if len(dues) != len(self._timers):
+            raise ValueError(f"State has {len(dues)} timers, clock has {len(self._timers)}")
+        self._events = []
+        for timer, due in zip(self._timers, dues):
+            timer._due = due
+            timer._generation += 1
+            if due is not None and due > self._ticks:
+                self._events.append((due, timer._order, timer._generation, timer))
+        heapq.heapify(self._events)
+
     def signal(self, cycle: int) -> ISignalSender:
         return self._signals[cycle]
+
+    def timer(self, callback: Callable[[], None]) -> Timer:
+        """
+        Cria um Timer. Disparos na mesma troca de fase seguem a ordem de
+        criação dos timers, e todos acontecem antes dos listeners de stepped.
+        """
+        timer = Timer(self, len(self._timers), callback)
+        self._timers.append(timer)
+        return timer
     
     def reset(self):
         if self._current_cycle >= 0:
@@ -23,6 +109,12 @@ class Clock:
     def step(self):
         if self._current_cycle >= 0:
             self._signals[self._current_cycle].disable()
+            self._ticks += 1
+            events = self._events
+            while events and events[0][0] <= self._ticks:
+                _, _, generation, timer = heapq.heappop(events)
+                if generation == timer._generation:
+                    timer._callback()
             self.stepped.invoke(self, None)
         
         self._current_cycle += 1
@@ -36,13 +128,16 @@ class ClockDelayedSignalSender(ISignalSender):
         self._source = source
         self._clock = clock
         self._delay = delay
-        self._counter = 0
-        self._buffer = BitArray(len(source.signal()))
+        self._buffer = SignalValue.of(0, len(source.signal()))
         
         self._signal_changed = EventHandler()
-        
+        self.events_fired = 0
+        self.events_suppressed = 0
+
         self._source.signal_changed += self._on_signal_changed
-        self._clock.stepped += self._on_step
+        # O atraso já começa correndo, como se a fonte tivesse acabado de mudar
+        self._timer = self._clock.timer(self._update_buffer)
+        self._timer.start(delay)
 
     @property
     def signal_changed(self):
@@ -53,19 +148,26 @@ class ClockDelayedSignalSender(ISignalSender):
         self._signal_changed = value
 
     def signal(self) -> BitArray:
-        return BitArray(self._buffer)
+        return self._buffer
+
+    def _ports(self) -> Ports:
+        return Ports([self], triggers=[(self._source, self._on_signal_changed)])
+
+    def _load(self, data: BitArray):
+        self._buffer = data
 
     def _on_signal_changed(self, sender, _):
-        if self._counter < self._delay: return
-        self._counter = 0
+        # Mudanças durante um atraso em andamento são lidas só no fim dele
+        if self._timer.pending: return
+        self._timer.start(self._delay)
         if self._delay == 0:
-            self._buffer = self._source.signal()
-            self._signal_changed.invoke(self, self._buffer)
+            self._update_buffer()
 
-    def _on_step(self, sender, _):
-        if self._counter <= self._delay:
-            self._counter += 1
-        
-        if self._counter == self._delay:
-            self._buffer = self._source.signal()
-            self._signal_changed.invoke(self, self._buffer)
\ No newline at end of file
+    def _update_buffer(self):
+        value = self._source.signal()
+        if value == self._buffer:
+            self.events_suppressed += 1
+            return
+        self._buffer = value
+        self.events_fired += 1
+        self._signal_changed.invoke(self, value)
\ No newline at end of file
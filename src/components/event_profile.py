@@ -0,0 +1,162 @@
+"""
+Perfil de eventos: quantas vezes cada listener foi chamado por um
+EventHandler.invoke e quanto tempo levou, por listener e por componente
+(o objeto dono do método ligado), para achar onde o fan-out das ligações
+do Mic1 custa caro.
+
+    profile = EventProfile()
+    profile.name_components(mic1)
+    with profiling(profile):
+        mic1.run()
+    print(profile.table())
+
+Enquanto o `with` está ativo, EventHandler.invoke é trocado na classe por
+uma versão que mede cada chamada; fora dele invoke é o de sempre. O tempo
+total de um listener inclui os listeners que ele dispara em cascata; o
+próprio desconta esses. No modo "levelized" quase não há invoke (a ordem é
+estática), então o perfil só faz sentido no modo por eventos.
+"""
+
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional
+
+from src.components.signals import EventHandler
+
+# component: rótulo do dono do listener; listener: nome qualificado da função;
+# total/own: segundos, com e sem os listeners chamados em cascata
+ListenerStats = namedtuple("ListenerStats", ["component", "listener", "calls", "total", "own"])
+ComponentStats = namedtuple("ComponentStats", ["component", "listeners", "calls", "own"])
+
+class EventProfile:
+    """Contadores por listener, preenchidos enquanto está ligado por profiling()."""
+
+    def __init__(self):
+        self._stats: Dict[object, list] = {}
+        self._names: Dict[int, str] = {}
+        self._anonymous: Dict[int, str] = {}
+        self._kinds: Dict[str, int] = {}
+        self._owners: List[object] = []
+        self._nested = 0.0
+
+    def name(self, component, name: str):
+        """Dá um rótulo ao componente na tabela (sem nome, vale o tipo e um número)."""
+        self._names[id(component)] = name
+        self._owners.append(component)
+
+    def name_components(self, root, prefix: str = ""):
+        """
+        Nomeia, pelo caminho de atributos a partir de `root` (mic1.alu,
+        mic1.control_unit.mpc, mic1.registers[3], ...), os objetos alcançáveis
+        pelos seus atributos, e o próprio root por `prefix`.
+        """
+        pending = deque([(root, prefix)])
+        seen = set()
+        while pending:
+            obj, path = pending.popleft()
+            if id(obj) in seen: continue
+            seen.add(id(obj))
+            if path:
+                self.name(obj, path)
+            if isinstance(obj, (list, tuple)):
+                children = ((f"{path}[{i}]", value) for i, value in enumerate(obj))
+            elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+                children = ((f"{path}.{key}" if path else key, value) for key, value in vars(obj).items())
+            else:
+                continue
+            for child_path, value in children:
+                if isinstance(value, (list, tuple)) or (hasattr(value, "__dict__") and not callable(value)):
+                    pending.append((value, child_path))
+
+    def reset(self):
+        self._stats.clear()
+        self._nested = 0.0
+
+    def _label(self, listener) -> str:
+        owner = getattr(listener, "__self__", None)
+        if owner is None:
+            return "-"
+        key = id(owner)
+        label = self._names.get(key) or self._anonymous.get(key)
+        if label is None:
+            kind = type(owner).__name__
+            count = self._kinds.get(kind, 0)
+            self._kinds[kind] = count + 1
+            label = self._anonymous[key] = f"{kind}#{count}"
+            self._owners.append(owner)
+        return label
+
+    def listeners(self) -> List[ListenerStats]:
+        """Um ListenerStats por listener chamado, do maior tempo próprio para o menor."""
+        rows = []
+        for listener, (calls, total, own) in self._stats.items():
+            function = getattr(listener, "__func__", listener)
+            name = getattr(function, "__qualname__", None) or repr(listener)
+            rows.append(ListenerStats(self._label(listener), name, calls, total, own))
+        rows.sort(key=lambda row: row.own, reverse=True)
+        return rows
+
+    def components(self) -> List[ComponentStats]:
+        """Os mesmos números somados por componente, do maior tempo próprio para o menor."""
+        totals: Dict[str, list] = {}
+        for row in self.listeners():
+            entry = totals.setdefault(row.component, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += row.calls
+            entry[2] += row.own
+        rows = [ComponentStats(component, *entry) for component, entry in totals.items()]
+        rows.sort(key=lambda row: row.own, reverse=True)
+        return rows
+
+    def table(self, by_component: bool = False, limit: Optional[int] = None) -> str:
+        """A tabela de listeners (ou de componentes) em texto, limitada às `limit` primeiras linhas."""
+        if by_component:
+            lines = [f"{'component':<32} {'listeners':>9} {'calls':>10} {'own ms':>10} {'us/call':>8}"]
+            for row in self.components()[:limit]:
+                lines.append(f"{row.component:<32} {row.listeners:>9} {row.calls:>10} "
+                             f"{row.own * 1e3:>10.2f} {row.own / row.calls * 1e6:>8.2f}")
+        else:
+            lines = [f"{'component':<32} {'listener':<40} {'calls':>10} {'total ms':>10} {'own ms':>10} {'us/call':>8}"]
+            for row in self.listeners()[:limit]:
+                lines.append(f"{row.component:<32} {row.listener:<40} {row.calls:>10} {row.total * 1e3:>10.2f} "
+                             f"{row.own * 1e3:>10.2f} {row.own / row.calls * 1e6:>8.2f}")
+        return "\n".join(lines)
+
+    def _call(self, listener, sender, args):
+        stats = self._stats.get(listener)
+        if stats is None:
+            stats = self._stats[listener] = [0, 0.0, 0.0]
+        outer = self._nested
+        self._nested = 0.0
+        start = perf_counter()
+        try:
+            listener(sender, args)
+        finally:
+            elapsed = perf_counter() - start
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - self._nested
+            self._nested = outer + elapsed
+
+_active: Optional[EventProfile] = None
+_plain_invoke = EventHandler.invoke
+
+def _profiled_invoke(self, sender, args):
+    call = _active._call
+    for listener in self.listeners:
+        call(listener, sender, args)
+
+@contextmanager
+def profiling(profile: Optional[EventProfile] = None) -> Iterator[EventProfile]:
+    """Mede os listeners de todos os EventHandlers durante um bloco `with`."""
+    global _active
+    if _active is not None:
+        raise RuntimeError("Event profiling is already active")
+    _active = profile if profile is not None else EventProfile()
+    EventHandler.invoke = _profiled_invoke
+    try:
+        yield _active
+    finally:
+        EventHandler.invoke = _plain_invoke
+        _active = None
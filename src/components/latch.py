@@ -1,5 +1,6 @@
 from src.utils.bit_utils import BitArray
 from src.components.signals import ISignalSender, SignalSender, EventHandler
+from src.components.levelized import Ports
 
 class Latch:
     def __init__(self, data_sender: ISignalSender, control_sender: ISignalSender):
@@ -33,6 +34,15 @@ class Latch:
         self._in_ctrl.signal_changed += self._on_control_change
         self._on_control_change(control_sender, control_sender.signal())
 
+    def _ports(self) -> Ports:
+        return Ports([self._out], gated=[(self._in, self._in_ctrl)], evaluate=self._evaluate)
+
+    def _evaluate(self):
+        self._on_control_change(self._in_ctrl, None)
+
+    def _resync(self):
+        self._output_enabled = self._in_ctrl.signal().has_all_set()
+
     def _on_data_change(self, sender, _):
         if self._in is None or not self._output_enabled: return
         self._out.set_data(self._in.signal())
@@ -0,0 +1,368 @@
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+from src.components.signals import ISignalSender
+
+class Ports:
+    """
+    Como um componente se liga ao grafo, do ponto de vista do escalonador
+    levelizado:
+
+    - inputs: sinais lidos de forma combinacional (a saída depende deles já);
+    - gated: pares (dado, habilita) de entradas transparentes só enquanto
+      `habilita` está alto (a Latch);
+    - triggers: pares (sinal, handler) de entradas cuja mudança dispara uma
+      ação sequencial; o handler é o mesmo usado no modo por eventos;
+    - samples: sinais lidos apenas no momento da ação sequencial;
+    - outputs: sinais escritos pelo componente;
+    - evaluate: recalcula as saídas a partir das entradas (combinacional).
+
+    Sem evaluate nem triggers o componente é um "fio" puro (ProcessedSignalSender,
+    CombinationalSignalSender): é calculado sob demanda por signal().
+    """
+    __slots__ = ("inputs", "gated", "triggers", "samples", "outputs", "evaluate")
+
+    def __init__(self, outputs: Sequence[ISignalSender],
+                 inputs: Sequence[ISignalSender] = (),
+                 gated: Sequence[Tuple[ISignalSender, ISignalSender]] = (),
+                 triggers: Sequence[Tuple[ISignalSender, Callable]] = (),
+                 samples: Sequence[ISignalSender] = (),
+                 evaluate: Optional[Callable[[], None]] = None):
+        self.inputs = list(inputs)
+        self.gated = list(gated)
+        self.triggers = list(triggers)
+        self.samples = list(samples)
+        self.outputs = list(outputs)
+        self.evaluate = evaluate
+
+class _Node:
+    __slots__ = ("owner", "ports", "index", "last")
+
+    def __init__(self, owner, ports: Ports, index: int):
+        self.owner = owner
+        self.ports = ports
+        self.index = index
+        self.last = [sender.signal() for sender, _ in ports.triggers]
+
+    @property
+    def is_wire(self) -> bool:
+        return self.ports.evaluate is None and not self.ports.triggers
+
+    @property
+    def is_sequential(self) -> bool:
+        return bool(self.ports.triggers)
+
+    def make_step(self) -> Callable[[], None]:
+        if self.ports.evaluate is not None:
+            return self.ports.evaluate
+        triggers = self.ports.triggers
+        last = self.last
+        if len(triggers) == 1:
+            (sender, handler), = triggers
+            signal = sender.signal
+
+            def step():
+                value = signal()
+                if value != last[0]:
+                    last[0] = value
+                    handler(sender, value)
+            return step
+
+        def step():
+            for i, (sender, handler) in enumerate(triggers):
+                value = sender.signal()
+                if value != last[i]:
+                    last[i] = value
+                    handler(sender, value)
+        return step
+
+class LevelizedSchedule:
+    """
+    Compila o grafo de componentes ligado a um Clock em uma ordem estática de
+    avaliação para cada fase, substituindo a cascata de callbacks de
+    EventHandler.invoke.
+
+    O grafo é descoberto a partir dos sinais do clock, seguindo os listeners
+    (métodos ligados) até os componentes e, pelas suas Ports, até as saídas.
+    Para cada fase p só entram os nós alcançáveis pelo que muda nela (a queda
+    de clock[p-1], a subida de clock[p] e as saídas atualizadas no `stepped`
+    ou pelos Timers do clock),
+    ordenados topologicamente. Elementos sequenciais amostram seus `samples`
+    como no modo por eventos: antes da reavaliação combinacional da fase, a
+    não ser que um elemento disparado antes deles na mesma borda (na ordem
+    dos listeners) tenha alterado aquele valor. Um nó que realimenta o
+    próprio elemento sequencial que o amostrou (o M-mux depois do MPC) é
+    reavaliado logo após ele; os demais rodam exatamente uma vez por fase.
+
+    Ao compilar, os listeners dos componentes são removidos dos sinais do
+    grafo: quem avança o clock deve chamar run_phase() depois de Clock.step().
+    """
+
+    def __init__(self, clock, extra_roots: Sequence[ISignalSender] = ()):
+        self._clock = clock
+        self._clock_signals = [clock.signal(i) for i in range(clock.cycles)]
+        self._nodes: List[_Node] = []
+        self._by_owner: Dict[int, _Node] = {}
+        self._owner_of_output: Dict[int, _Node] = {}
+        self._consumers: Dict[int, List[Tuple[_Node, str, ISignalSender]]] = {}
+
+        self._discover(self._clock_signals + list(extra_roots))
+        tick_listeners = list(clock.stepped.listeners) + [timer.callback for timer in clock.timers]
+        self._tick_outputs = [
+            out for listener in tick_listeners
+            for node in [self._node_of(listener)] if node is not None
+            for out in node.ports.outputs
+        ]
+        self._phases = [self._compile_phase(p) for p in range(clock.cycles)]
+        self._settle_order = [node.make_step() for node in self._settle_nodes() if not node.is_wire]
+        self._detach()
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def phase_order(self, phase: int) -> List[object]:
+        """Componentes avaliados na fase, na ordem compilada (para inspeção)."""
+        return list(self._phases[phase][1])
+
+    def run_phase(self, phase: int):
+        for step in self._phases[phase][0]:
+            step()
+
+    def settle(self):
+        """Reavalia todo o grafo (após escritas fora do clock, como um reset)."""
+        for step in self._settle_order:
+            step()
+
+    def resync(self):
+        """
+        Relê os gatilhos dos elementos sequenciais sem disparar nada, para que
+        valores escritos fora do clock (uma restauração de estado) não pareçam
+        bordas na próxima fase.
+        """
+        for node in self._nodes:
+            node.last[:] = [sender.signal() for sender, _ in node.ports.triggers]
+
+    # ------------------------------------------------------------------ descoberta
+
+    def _node_of(self, listener) -> Optional[_Node]:
+        owner = getattr(listener, "__self__", None)
+        if owner is None or not hasattr(owner, "_ports"):
+            return None
+        node = self._by_owner.get(id(owner))
+        if node is None:
+            node = _Node(owner, owner._ports(), len(self._nodes))
+            self._nodes.append(node)
+            self._by_owner[id(owner)] = node
+            for out in node.ports.outputs:
+                self._owner_of_output[id(out)] = node
+        return node
+
+    def _discover(self, roots: Sequence[ISignalSender]):
+        pending = list(roots)
+        seen: Set[int] = set()
+        while pending:
+            sender = pending.pop()
+            if id(sender) in seen: continue
+            seen.add(id(sender))
+            for listener in sender.signal_changed.listeners:
+                node = self._node_of(listener)
+                if node is not None:
+                    pending.extend(node.ports.outputs)
+
+        # Consumidores na ordem dos listeners de cada sinal: é a ordem em que a
+        # cascata de eventos os visitaria (os demais, como entradas não
+        # selecionadas de um multiplexador, vão para o fim).
+        for node in self._nodes:
+            for kind, sender in self._edges_in(node):
+                self._consumers.setdefault(id(sender), []).append((node, kind, sender))
+        for key, consumers in self._consumers.items():
+            sender = consumers[0][2]
+            owners = [getattr(l, "__self__", None) for l in sender.signal_changed.listeners]
+            position = {id(owner): k for k, owner in enumerate(owners)}
+            consumers.sort(key=lambda c: position.get(id(c[0].owner), len(owners)))
+
+    @staticmethod
+    def _all_inputs(node: _Node) -> List[ISignalSender]:
+        ports = node.ports
+        return ports.inputs + [d for d, _ in ports.gated] + [e for _, e in ports.gated] + \
+            [s for s, _ in ports.triggers]
+
+    @staticmethod
+    def _edges_in(node: _Node) -> List[Tuple[str, ISignalSender]]:
+        ports = node.ports
+        edges = [("input", s) for s in ports.inputs]
+        for data, enable in ports.gated:
+            edges.append(("input", enable))
+            edges.append(("gated", data))
+        edges += [("trigger", s) for s, _ in ports.triggers]
+        return edges
+
+    def _gate_open(self, node: _Node, data: ISignalSender, phase: int) -> bool:
+        for d, enable in node.ports.gated:
+            if d is data:
+                for k, clk in enumerate(self._clock_signals):
+                    if enable is clk:
+                        return k == phase
+                return True
+        return True
+
+    def _producers(self, sender: ISignalSender) -> List[_Node]:
+        node = self._owner_of_output.get(id(sender))
+        if node is None:
+            return []
+        if not node.is_wire:
+            return [node]
+        result = []
+        for src in node.ports.inputs:
+            result += self._producers(src)
+        return result
+
+    # ------------------------------------------------------------------ compilação
+
+    def _roots(self, phase: int) -> List[ISignalSender]:
+        n = len(self._clock_signals)
+        return [self._clock_signals[(phase - 1) % n]] + self._tick_outputs + [self._clock_signals[phase]]
+
+    def _cone(self, senders: Sequence[ISignalSender], phase: int) -> List[_Node]:
+        """Nós alcançados a partir dos sinais, em pré-ordem (a ordem dos listeners)."""
+        order: List[_Node] = []
+        visited: Set[int] = set()
+
+        def visit(sender):
+            for node, kind, _ in self._consumers.get(id(sender), ()):
+                if kind == "gated" and not self._gate_open(node, sender, phase): continue
+                if node.index in visited: continue
+                visited.add(node.index)
+                order.append(node)
+                for out in node.ports.outputs:
+                    visit(out)
+
+        for sender in senders:
+            visit(sender)
+        return order
+
+    def _compile_phase(self, phase: int):
+        active = self._cone(self._roots(phase), phase)
+        rank = {node.index: i for i, node in enumerate(active)}
+        active_set = set(rank)
+        # Elementos sequenciais alcançados só pela queda do clock anterior não
+        # amostram nada nesta fase (os componentes agem na subida do controle).
+        rising = {node.index for node in self._cone(self._roots(phase)[1:], phase)}
+        sequential = [node for node in active if node.is_sequential and node.index in rising]
+        cones = {node.index: {n.index for n in self._cone(node.ports.outputs, phase)} for node in sequential}
+
+        edges: Dict[int, Set[int]] = {node.index: set() for node in active}
+        feedback: Set[Tuple[int, int]] = set()
+
+        for node in active:
+            for kind, sender in self._edges_in(node):
+                if kind == "gated" and not self._gate_open(node, sender, phase): continue
+                for producer in self._producers(sender):
+                    if producer.index in active_set and producer is not node:
+                        edges[producer.index].add(node.index)
+
+        for node in sequential:
+            for sender in node.ports.samples:
+                for producer in self._producers(sender):
+                    if producer.index not in active_set or producer is node: continue
+                    if producer.is_sequential:
+                        edges[producer.index].add(node.index)
+                        continue
+                    settled_before = any(
+                        other.index != node.index and rank[other.index] < rank[node.index]
+                        and producer.index in cones[other.index]
+                        for other in sequential
+                    )
+                    if settled_before:
+                        edges[producer.index].add(node.index)
+                        if producer.index in cones[node.index]:
+                            feedback.add((node.index, producer.index))
+                    else:
+                        edges[node.index].add(producer.index)
+
+        # Realimentação: o elemento sequencial precisa ler o valor já assentado,
+        # mas esse valor também depende da nova saída dele. Cortamos as arestas
+        # do elemento de volta para o laço e reavaliamos o próprio cone logo
+        # depois dele, como a cascata de eventos faria.
+        for seq_index, _ in feedback:
+            edges[seq_index] -= cones[seq_index] & self._ancestors(seq_index, edges)
+
+        order = self._toposort([node.index for node in active], edges, rank)
+        position = {index: k for k, index in enumerate(order)}
+        by_index = {node.index: node for node in active}
+        steps, owners = [], []
+
+        def emit(node):
+            if not node.is_wire:
+                steps.append(node.make_step())
+                owners.append(node.owner)
+
+        for index in order:
+            emit(by_index[index])
+            if any(seq_index == index for seq_index, _ in feedback):
+                for again in sorted(cones[index], key=lambda i: position[i]):
+                    if position[again] < position[index]:
+                        emit(by_index[again])
+        return steps, owners
+
+    @staticmethod
+    def _ancestors(target: int, edges: Dict[int, Set[int]]) -> Set[int]:
+        reverse: Dict[int, List[int]] = {}
+        for src, dsts in edges.items():
+            for dst in dsts:
+                reverse.setdefault(dst, []).append(src)
+        found: Set[int] = set()
+        pending = [target]
+        while pending:
+            for src in reverse.get(pending.pop(), ()):
+                if src not in found:
+                    found.add(src)
+                    pending.append(src)
+        return found
+
+    @staticmethod
+    def _toposort(indices: List[int], edges: Dict[int, Set[int]], rank: Dict[int, int]) -> List[int]:
+        indegree = {i: 0 for i in indices}
+        for src in indices:
+            for dst in edges[src]:
+                indegree[dst] += 1
+        ready = sorted((i for i in indices if indegree[i] == 0), key=lambda i: rank[i])
+        order = []
+        while ready:
+            current = ready.pop(0)
+            order.append(current)
+            released = []
+            for dst in edges[current]:
+                indegree[dst] -= 1
+                if indegree[dst] == 0:
+                    released.append(dst)
+            if released:
+                ready = sorted(ready + released, key=lambda i: rank[i])
+        if len(order) != len(indices):
+            raise ValueError("combinational loop: the wired graph cannot be levelized")
+        return order
+
+    def _settle_nodes(self) -> List[_Node]:
+        rank = {node.index: node.index for node in self._nodes}
+        edges: Dict[int, Set[int]] = {node.index: set() for node in self._nodes}
+        for node in self._nodes:
+            for _, sender in self._edges_in(node):
+                for producer in self._producers(sender):
+                    if producer is not node:
+                        edges[producer.index].add(node.index)
+            for sender in node.ports.samples:
+                for producer in self._producers(sender):
+                    if producer is node: continue
+                    if producer.is_sequential:
+                        edges[producer.index].add(node.index)
+                    else:
+                        edges[node.index].add(producer.index)
+        order = self._toposort([node.index for node in self._nodes], edges, rank)
+        return [self._nodes[i] for i in order]
+
+    def _detach(self):
+        for node in self._nodes:
+            for sender in self._all_inputs(node):
+                handler = sender.signal_changed
+                for listener in list(handler.listeners):
+                    if getattr(listener, "__self__", None) is node.owner:
+                        handler -= listener
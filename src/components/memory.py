@@ -1,16 +1,58 @@
-from typing import List, Optional
-from src.utils.bit_utils import BitArray
+from array import array
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from src.utils.bit_utils import BitArray, SignalValue
 from src.components.signals import ISignalSender, SignalSender, EventHandler
-from src.components.clock import Clock
+from src.components.clock import Clock, Timer
+from src.components.levelized import Ports
+from src.utils.trace import tracer, MEMORY, DEBUG
+
+# Menor tipo de array sem sinal para cada largura de célula
+_TYPECODES = [(8, "B"), (16, "H"), (32, "I"), (64, "Q")]
+
+def _typecode(cell_length: int) -> str:
+    for bits, code in _TYPECODES:
+        if cell_length <= bits and array(code).itemsize * 8 >= bits:
+            return code
+    raise ValueError(f"Memory cells wider than 64 bits are not supported: {cell_length}")
+
+@lru_cache(maxsize=None)
+def _zero_page(size: int) -> bytes:
+    # Uma única página zerada de cada tamanho, compartilhada por todas as imagens
+    return bytes(size)
 
 class Memory:
+    """
+    As células ficam em um único array de inteiros sem sinal (array('H') para
+    células de 16 bits, array('I') para as de 32 do ControlStore), exposto
+    sem cópia por `words`. cell() devolve um SignalValue e set_cell() aceita
+    qualquer BitArray, como antes; load_words/dump_words copiam blocos de
+    palavras de uma vez, e reset() zera o buffer inteiro com uma cópia só.
+
+    share_image() faz a memória apenas referenciar uma imagem somente
+    leitura, compartilhada com outras memórias (o ControlStore usa a imagem
+    do microprograma, interpretada uma vez por processo). A primeira escrita
+    copia a imagem para um buffer próprio (copy-on-write).
+
+    pages() tira uma imagem das células em páginas imutáveis (bytes) de
+    PAGE_WORDS palavras; as páginas que não mudaram desde a imagem anterior
+    (ou que continuam zeradas) são os mesmos objetos, então várias imagens
+    da mesma memória custam só as páginas escritas entre elas.
+    """
+    PAGE_WORDS = 256
+
     def __init__(self, length: int, cell_length: int, 
                  address_sender: ISignalSender, in_buffer_sender: ISignalSender,
                  rd_sender: Optional[ISignalSender], wr_sender: Optional[ISignalSender],
                  name: Optional[str] = None):
         
-        self._cells = [BitArray(cell_length) for _ in range(length)]
+        self._typecode = _typecode(cell_length)
+        self._words = array(self._typecode, bytes(length * array(self._typecode).itemsize))
+        self._bytes = memoryview(self._words).cast("B")
+        self._shared = False
+        self._pages: Tuple[bytes, ...] = ()
         self._cell_length = cell_length
+        self._mask = (1 << cell_length) - 1
         self._in_address = address_sender
         self._in_buffer = in_buffer_sender
         self._in_rd = rd_sender
@@ -27,24 +69,141 @@ class Memory:
     @property
     def out_sig(self) -> ISignalSender: return self._out
 
+    @property
+    def words(self) -> memoryview:
+        """Visão (sem cópia) das células como inteiros; somente leitura enquanto a imagem é compartilhada."""
+        return memoryview(self._words)
+
+    @property
+    def shared(self) -> bool:
+        return self._shared
+
+    def share_image(self, image: memoryview):
+        """Passa a ler as células de `image` (mesmo formato e tamanho de `words`), sem copiar."""
+        image = memoryview(image)
+        if image.format != self._typecode or len(image) != len(self._words):
+            raise ValueError(f"Image must have {len(self._words)} words of format '{self._typecode}', "
+                             f"got {len(image)} of format '{image.format}'")
+        self._words = image.toreadonly()
+        self._bytes = self._words.cast("B")
+        self._shared = True
+
+    def __len__(self) -> int:
+        return len(self._words)
+
     def cell(self, cell_idx: int) -> BitArray:
-        return self._cells[cell_idx]
+        return SignalValue.of(self._words[cell_idx], self._cell_length)
 
     def set_cell(self, cell_idx: int, data: BitArray):
-        self._cells[cell_idx] = data.trim_or_pad(self._cell_length)
+        if self._shared: self._own()
+        self._words[cell_idx] = data.value & self._mask
         self.cell_changed.invoke(self, cell_idx)
-        if self.name:
-            print(f"MEMORY ({self.name}) changing cell ({cell_idx}) to {self._cells[cell_idx].to_bit_string()}")
+        if tracer.memory <= DEBUG and self.name:
+            tracer.emit(MEMORY, DEBUG, self.name, cell_idx, self._words[cell_idx], self._cell_length)
+
+    def load_words(self, offset: int, words: Union[Iterable[int], memoryview, bytes, array], raw: bool = False):
+        """
+        Grava palavras a partir de `offset`. Um buffer (array, memoryview) no
+        formato das células (o typecode de `words`) é copiado cru; bytes
+        crus, no formato nativo das células, só com raw=True. Qualquer outro
+        iterável, inclusive um array de outro formato, é lido como inteiros
+        (mascarados pela largura da célula). Dispara cell_changed para cada
+        célula, mas não gera trace.
+        """
+        try:
+            source = memoryview(words)
+        except TypeError:
+            source = None
+        if source is not None and not (source.format == self._typecode or (raw and source.format == "B")):
+            source = None
+        if source is not None:
+            data = source.cast("B")
+            if len(data) % self._words.itemsize:
+                raise ValueError(f"Buffer size {len(data)} is not a multiple of the word size {self._words.itemsize}")
+            start = offset * self._words.itemsize
+            end = start + len(data)
+            count = len(data) // self._words.itemsize
+        else:
+            values = array(self._typecode, [word & self._mask for word in words])
+            count = len(values)
+        if offset < 0 or offset + count > len(self._words):
+            raise ValueError(f"Cannot load {count} words at offset {offset} into a memory of {len(self._words)} cells")
+
+        if self._shared: self._own()
+        if source is not None:
+            self._bytes[start:end] = data
+        else:
+            self._words[offset:offset + count] = values
+        if self.cell_changed.listeners:
+            for cell_idx in range(offset, offset + count):
+                self.cell_changed.invoke(self, cell_idx)
+
+    def dump_words(self, start: int = 0, end: Optional[int] = None) -> List[int]:
+        """Cópia das células start..end-1 como lista de inteiros."""
+        return self._words[start:end].tolist()
+
+    def pages(self) -> Tuple[bytes, ...]:
+        """Imagem das células em páginas de PAGE_WORDS palavras (formato nativo de `words`)."""
+        data = bytes(self._bytes)
+        size = self.PAGE_WORDS * self._words.itemsize
+        zero = _zero_page(size)
+        previous = self._pages
+        pages = []
+        for i, start in enumerate(range(0, len(data), size)):
+            page = data[start:start + size]
+            if i < len(previous) and page == previous[i]:
+                page = previous[i]
+            elif len(page) == size and page == zero:
+                page = zero
+            pages.append(page)
+        self._pages = tuple(pages)
+        return self._pages
+
+    def load_pages(self, pages: Sequence[bytes]):
+        """
+        Restaura uma imagem de pages(), de uma memória de mesmo tamanho e
+        formato. Dispara cell_changed só para as células que mudaram, sem
+        trace; se nada mudou, uma imagem compartilhada continua compartilhada.
+        """
+        data = b"".join(pages)
+        if len(data) != len(self._bytes):
+            raise ValueError(f"Image has {len(data)} bytes, memory has {len(self._bytes)}")
+        current = bytes(self._bytes)
+        if data != current:
+            if self._shared: self._own(copy=False)
+            self._bytes[:] = data
+            if self.cell_changed.listeners:
+                old = array(self._typecode, current)
+                for cell_idx, (before, after) in enumerate(zip(old, self._words)):
+                    if before != after:
+                        self.cell_changed.invoke(self, cell_idx)
+        self._pages = tuple(pages)
+
+    def _ports(self) -> Ports:
+        triggers = []
+        if self._in_rd: triggers.append((self._in_rd, self._on_rd_signal_changed))
+        if self._in_wr: triggers.append((self._in_wr, self._on_wr_signal_changed))
+        return Ports([self._out], triggers=triggers, samples=[self._in_address, self._in_buffer])
 
     def reset(self):
-        for cell in self._cells:
-            cell.set_all(False)
+        if self._shared:
+            self._own(copy=False)
+        else:
+            self._bytes[:] = bytes(len(self._bytes))
         self.resetted.invoke(self, None)
 
+    def _own(self, copy: bool = True):
+        # Copy-on-write: troca a imagem compartilhada por um buffer próprio
+        words = array(self._typecode)
+        words.frombytes(self._bytes if copy else bytes(len(self._bytes)))
+        self._words = words
+        self._bytes = memoryview(words).cast("B")
+        self._shared = False
+
     def _on_rd_signal_changed(self, sender, _):
         if not self._in_rd.signal().has_all_set(): return
         address = self._in_address.signal().to_int32()
-        self._out.set_data(self._cells[address])
+        self._out.set_data(self.cell(address))
 
     def _on_wr_signal_changed(self, sender, _):
         if not self._in_wr.signal().has_all_set(): return
@@ -52,6 +211,14 @@ class Memory:
         self.set_cell(address, self._in_buffer.signal())
 
 class SlowMemory(Memory):
+    """
+    Memory cuja leitura/escrita acontece delay_rd/delay_wr trocas de fase do
+    clock depois da subida de RD/WR, com o endereço (e o dado) daquele
+    momento. Cada operação é um Timer do Clock agendado na subida e
+    cancelado na descida; uma subida com a operação anterior ainda em
+    andamento é ignorada. Sem operação pendente, o clock não chama a memória.
+    """
+
     def __init__(self, length: int, cell_length: int, clock: Clock,
                  delay_rd: int, delay_wr: int,
                  address_sender: ISignalSender, in_buffer_sender: ISignalSender,
@@ -60,34 +227,42 @@ class SlowMemory(Memory):
         super().__init__(length, cell_length, address_sender, in_buffer_sender, rd_sender, wr_sender, name)
         
         self._clock = clock
-        self._clock.stepped += self._on_clock_tick
         self._delay_rd = delay_rd
         self._delay_wr = delay_wr
-        self._counter_rd = delay_rd + 1
-        self._counter_wr = delay_wr + 1
+        self._timer_rd = clock.timer(self._complete_rd)
+        self._timer_wr = clock.timer(self._complete_wr)
+
+    @property
+    def counter_rd(self) -> int:
+        """Trocas de fase desde o início da leitura (delay_rd + 1 quando parada)."""
+        return self._counter(self._timer_rd, self._delay_rd)
+
+    @property
+    def counter_wr(self) -> int:
+        """Trocas de fase desde o início da escrita (delay_wr + 1 quando parada)."""
+        return self._counter(self._timer_wr, self._delay_wr)
+
+    def _counter(self, timer: Timer, delay: int) -> int:
+        if timer.due is None:
+            return delay + 1
+        return min(delay - (timer.due - self._clock.ticks), delay + 1)
 
     def _on_rd_signal_changed(self, sender, _):
         if not self._in_rd.signal().has_all_set():
-            self._counter_rd = self._delay_rd + 1
-            return
-        if self._counter_rd < self._delay_rd: return
-        self._counter_rd = 0
+            self._timer_rd.cancel()
+        elif not self._timer_rd.pending:
+            self._timer_rd.start(self._delay_rd)
 
     def _on_wr_signal_changed(self, sender, _):
         if not self._in_wr.signal().has_all_set():
-            self._counter_wr = self._delay_wr + 1
-            return
-        if self._counter_wr < self._delay_wr: return
-        self._counter_wr = 0
-
-    def _on_clock_tick(self, sender, _):
-        if self._counter_rd <= self._delay_rd: self._counter_rd += 1
-        if self._counter_wr <= self._delay_wr: self._counter_wr += 1
-
-        if self._counter_rd == self._delay_rd:
-            address = self._in_address.signal().to_int32()
-            self._out.set_data(self.cell(address))
-
-        if self._counter_wr == self._delay_wr:
-            address = self._in_address.signal().to_int32()
-            self.set_cell(address, self._in_buffer.signal())
\ No newline at end of file
+            self._timer_wr.cancel()
+        elif not self._timer_wr.pending:
+            self._timer_wr.start(self._delay_wr)
+
+    def _complete_rd(self):
+        address = self._in_address.signal().to_int32()
+        self._out.set_data(self.cell(address))
+
+    def _complete_wr(self):
+        address = self._in_address.signal().to_int32()
+        self.set_cell(address, self._in_buffer.signal())
@@ -1,16 +1,26 @@
 from typing import List
 from src.utils.bit_utils import BitArray
 from src.components.signals import ISignalSender, SignalSender
+from src.components.levelized import Ports
 
 class Multiplexer:
+    """
+    Copia para a saída a entrada escolhida pelo controle. Assina todas as
+    entradas uma vez, na construção: trocar a seleção só muda o índice, sem
+    mexer em listeners, e a mudança de uma entrada não selecionada é
+    descartada comparando o valor da selecionada com a saída.
+    """
     def __init__(self, length: int, input_senders: List[ISignalSender], control_sender: ISignalSender):
         self._in = input_senders
         self._in_ctrl = control_sender
         self._in_ctrl.signal_changed += self._on_control_change
-        
-        index = self._in_ctrl.signal().to_int32()
-        self._current = self._in[index]
-        self._current.signal_changed += self._on_current_change
+
+        self._current = self._in[self._in_ctrl.signal().to_int32()]
+        subscribed = set()
+        for sender in self._in:
+            if id(sender) in subscribed: continue
+            subscribed.add(id(sender))
+            sender.signal_changed += self._on_input_change
 
         self._out = SignalSender(length)
         self._out.set_data(self._current.signal())
@@ -19,14 +29,28 @@ class Multiplexer:
     def out_sig(self) -> ISignalSender: return self._out
 
     def set_output(self, index: int):
-        self._current.signal_changed -= self._on_current_change
         self._current = self._in[index]
-        self._current.signal_changed += self._on_current_change
         self._out.set_data(self._current.signal())
 
+    def _ports(self) -> Ports:
+        return Ports([self._out], inputs=[self._in_ctrl] + list(self._in), evaluate=self._evaluate)
+
+    def _evaluate(self):
+        # Modo levelizado: sem assinaturas, só seleciona e copia a entrada.
+        self._current = self._in[self._in_ctrl.signal().to_int32()]
+        self._out.set_data(self._current.signal())
+
+    def _resync(self):
+        # Depois de uma restauração de estado: reaponta a entrada selecionada
+        self._current = self._in[self._in_ctrl.signal().to_int32()]
+
     def _on_control_change(self, sender, _):
         index = self._in_ctrl.signal().to_int32()
         self.set_output(index)
 
-    def _on_current_change(self, sender, _):
-        self._out.set_data(self._current.signal())
\ No newline at end of file
+    def _on_input_change(self, sender, _):
+        # O `sender` repassado nem sempre é a entrada (um ProcessedSignalSender
+        # repassa o da origem); a seleção é conferida pelo valor
+        value = self._current.signal()
+        if value is not self._out.signal():
+            self._out.set_data(value)
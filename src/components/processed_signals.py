@@ -1,12 +1,26 @@
 from typing import List, Callable, Optional
-from src.utils.bit_utils import BitArray
+from src.utils.bit_utils import BitArray, SignalValue
 from src.components.signals import ISignalSender, EventHandler
+from src.components.levelized import Ports
 
 class ProcessedSignalSender(ISignalSender):
+    """
+    Sinal derivado de outro por uma função pura. Como os valores de sinal são
+    imutáveis, o resultado é memorizado pela identidade do valor de origem:
+    leituras repetidas sem mudança na origem não recalculam nem alocam.
+
+    Uma mudança na origem só é repassada se o valor derivado mudar (por
+    exemplo, um campo da MIR que continua igual entre microinstruções).
+    """
     def __init__(self, source: ISignalSender, func: Callable[[BitArray], BitArray]):
         self._source = source
         self._func = func
+        self._last_source = None
+        self._last = None
         self._signal_changed = EventHandler()
+        self.events_fired = 0
+        self.events_suppressed = 0
+        self._emitted = self.signal()
         # O setter agora permite que esta linha funcione
         self._source.signal_changed += self._on_signal_change
 
@@ -23,52 +37,63 @@ class ProcessedSignalSender(ISignalSender):
         return self.signal().length
 
     def signal(self) -> BitArray:
-        return self._func(self._source.signal())
+        source = self._source.signal()
+        if source is not self._last_source:
+            self._last = self._func(source).frozen()
+            self._last_source = source
+        return self._last
+
+    def _ports(self) -> Ports:
+        return Ports([self], inputs=[self._source])
+
+    def _resync(self):
+        # Depois de uma restauração de estado: o valor atual passa a ser o já repassado
+        self._emitted = self.signal()
 
     def _on_signal_change(self, sender, _):
-        self._signal_changed.invoke(sender, self._func(self._source.signal()))
+        value = self.signal()
+        if value is self._emitted or value == self._emitted:
+            self.events_suppressed += 1
+            return
+        self._emitted = value
+        self.events_fired += 1
+        self._signal_changed.invoke(sender, value)
 
     @staticmethod
     def interval(source: ISignalSender, offset: int, length: int) -> ISignalSender:
         def func(signal: BitArray) -> BitArray:
-            result = BitArray(length)
-            for i in range(length):
-                if (i + offset) < len(signal):
-                    result[i] = signal[i + offset]
-            return result
+            return SignalValue.of(signal.value >> offset, length)
         return ProcessedSignalSender(source, func)
 
     @staticmethod
     def increment(source: ISignalSender, increment_val: int = 1) -> ISignalSender:
         def func(signal: BitArray) -> BitArray:
-            value = signal.to_int32() + increment_val
-            inc_bits = BitArray.from_int(value, 32)
-            result = BitArray(len(signal))
-            for i in range(len(signal)):
-                if i < len(inc_bits):
-                    result[i] = inc_bits[i]
-            return result
+            # O C# soma em 32 bits e copia só os len(signal) bits de menor ordem
+            value = (signal.to_int32() + increment_val) & 0xFFFFFFFF
+            return SignalValue.of(value, len(signal))
         return ProcessedSignalSender(source, func)
 
     @staticmethod
     def decoder4to16(source: ISignalSender) -> ISignalSender:
         def func(input_sig: BitArray) -> BitArray:
-            value = 0
-            for i in range(4):
-                if i < len(input_sig) and input_sig[i]:
-                    value |= (1 << i)
-            
-            result = BitArray(16, False)
-            if 0 <= value < 16:
-                result[value] = True
-            return result
+            value = input_sig.value & 0b1111
+            return SignalValue.of(1 << value, 16)
         return ProcessedSignalSender(source, func)
 
 class CombinationalSignalSender(ISignalSender):
+    """
+    Sinal derivado de várias origens, memorizado pela identidade dos valores
+    de entrada; como o ProcessedSignalSender, só repassa mudanças reais.
+    """
     def __init__(self, sources: List[ISignalSender], func: Callable[[List[BitArray]], BitArray]):
         self._sources = sources
         self._func = func
+        self._last_signals = None
+        self._last = None
         self._signal_changed = EventHandler()
+        self.events_fired = 0
+        self.events_suppressed = 0
+        self._emitted = self.signal()
         for src in self._sources:
             src.signal_changed += self._on_signal_change
     
@@ -86,25 +111,37 @@ class CombinationalSignalSender(ISignalSender):
 
     def signal(self) -> BitArray:
         signals = [s.signal() for s in self._sources]
-        return self._func(signals)
+        last = self._last_signals
+        if last is None or any(new is not old for new, old in zip(signals, last)):
+            self._last = self._func(signals).frozen()
+            self._last_signals = signals
+        return self._last
+
+    def _ports(self) -> Ports:
+        return Ports([self], inputs=self._sources)
+
+    def _resync(self):
+        self._emitted = self.signal()
 
     def _on_signal_change(self, sender, _):
-        signals = [s.signal() for s in self._sources]
-        self._signal_changed.invoke(self, self._func(signals))
+        value = self.signal()
+        if value is self._emitted or value == self._emitted:
+            self.events_suppressed += 1
+            return
+        self._emitted = value
+        self.events_fired += 1
+        self._signal_changed.invoke(self, value)
 
     @staticmethod
     def and_op(sources: List[ISignalSender]) -> 'CombinationalSignalSender':
         def func(signals: List[BitArray]) -> BitArray:
             if not signals:
                 return BitArray(0)
-            
-            min_length = min(s.length for s in signals)
-            result = signals[0].clone()
-            result = result.trim_or_pad(min_length)
 
-            for i in range(1, len(signals)):
-                other = signals[i].clone().trim_or_pad(min_length)
-                result.and_op(other)
-            return result
+            min_length = min(s.length for s in signals)
+            value = (1 << min_length) - 1
+            for s in signals:
+                value &= s.value
+            return SignalValue.of(value, min_length)
         
         return CombinationalSignalSender(sources, func)
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import Optional
 from src.utils.bit_utils import BitArray
 from src.components.signals import ISignalSender, SignalSender, EventHandler
+from src.components.levelized import Ports
+from src.utils.trace import tracer, REGISTER, DEBUG
 
 class Register:
     def __init__(self, length: int, 
@@ -32,13 +34,19 @@ class Register:
 
     def set_data(self, data: BitArray):
         self._out.set_data(data)
-        if self.name:
-            print(f"{self.name}, changed: {self._out.signal().to_bit_string()}")
+        if tracer.register <= DEBUG and self.name:
+            value = self._out.signal()
+            tracer.emit(REGISTER, DEBUG, self.name, None, value.value, value.length)
         self.data_changed.invoke(self, self._out.signal())
 
     def reset(self):
         self.set_data(BitArray(len(self._out.signal()), False))
 
+    def _ports(self) -> Ports:
+        triggers = [(self._in_ctrl, self._on_control_change)] if self._in_ctrl else []
+        samples = [self._in] if self._in else []
+        return Ports([self._out], triggers=triggers, samples=samples)
+
     def _on_control_change(self, sender, _):
         if self._in is None: return
         if self._in_ctrl.signal().has_all_set():
@@ -0,0 +1,200 @@
+from typing import Dict, List, Optional, Sequence
+from src.utils.bit_utils import BitArray, SignalValue
+from src.components.signals import ISignalSender, SignalSender, EventHandler
+from src.components.levelized import Ports
+from src.utils.trace import tracer, REGISTER, DEBUG
+
+class _RegisterOutput(ISignalSender):
+    """Saída de um registrador do banco: lê a posição dele no armazenamento."""
+
+    def __init__(self, values: List[SignalValue], index: int):
+        self._values = values
+        self._index = index
+        self._signal_changed = EventHandler()
+        self.events_fired = 0
+        self.events_suppressed = 0
+
+    @property
+    def signal_changed(self):
+        return self._signal_changed
+
+    def signal(self) -> BitArray:
+        return self._values[self._index]
+
+    def _load(self, data: SignalValue):
+        # Restauração de estado (Mic1.restore): troca o valor sem eventos
+        self._values[self._index] = data
+
+class FileRegister:
+    """
+    Um registrador do RegisterFile com a interface de Register (name, out_sig,
+    data_changed, control_changed, set_data, reset), para quem inspeciona ou
+    escreve um registrador isolado. Nos constantes set_data levanta
+    ValueError. control_changed dispara True quando a porta de escrita grava
+    este registrador e False quando o controle dela desce de novo.
+
+    A entrada é a porta de escrita do banco, comum a todos: set_data_sender
+    e set_control_sender levantam ValueError (ligue o banco com
+    RegisterFile.set_write_port).
+    """
+    __slots__ = ("name", "index", "data_changed", "control_changed", "_file", "_out")
+
+    def __init__(self, file: 'RegisterFile', index: int, name: Optional[str]):
+        self.name = name
+        self.index = index
+        self.data_changed = EventHandler() # Event<BitArray>
+        self.control_changed = EventHandler() # Event<bool>
+        self._file = file
+        self._out = _RegisterOutput(file._values, index)
+
+    @property
+    def out_sig(self) -> ISignalSender: return self._out
+
+    @property
+    def read_only(self) -> bool: return self.index in self._file.constants
+
+    def set_data_sender(self, data_sender: ISignalSender):
+        raise ValueError(f"Register {self.name} is written through the register file's write port")
+
+    def set_control_sender(self, control_sender: ISignalSender):
+        raise ValueError(f"Register {self.name} is written through the register file's write port")
+
+    def set_data(self, data: BitArray):
+        self._file.write(self.index, data)
+
+    def reset(self):
+        """Volta ao valor inicial (zero, a não ser o dado em `initial`); nos constantes não faz nada."""
+        if self.read_only: return
+        self._file.write(self.index, self._file.initial_value(self.index))
+
+    def __str__(self):
+        return f"Register {self.name} ({self._out.signal().to_bit_string()})"
+
+class _ReadPort:
+    """Porta de leitura: copia para a saída o registrador escolhido pelo seletor."""
+
+    def __init__(self, file: 'RegisterFile', select_sender: ISignalSender):
+        self._file = file
+        self._select = select_sender
+        self._out = SignalSender(file.length)
+        self._out.set_data(file._values[select_sender.signal().to_int32()])
+        self._select.signal_changed += self._on_select_change
+
+    @property
+    def out_sig(self) -> ISignalSender: return self._out
+
+    def _ports(self) -> Ports:
+        return Ports([self._out], inputs=[self._select] + [r.out_sig for r in self._file.registers],
+                     evaluate=self._evaluate)
+
+    def _evaluate(self):
+        self._out.set_data(self._file._values[self._select.signal().to_int32()])
+
+    def _written(self, index: int):
+        if self._select.signal().to_int32() == index:
+            self._out.set_data(self._file._values[index])
+
+    def _on_select_change(self, sender, _):
+        self._evaluate()
+
+class RegisterFile:
+    """
+    Banco de registradores com armazenamento em uma lista de valores, no
+    lugar de um Register por posição com decodificador e portas AND na
+    entrada de controle de cada um.
+
+    Duas portas de leitura (out_a e out_b, selecionadas por select_a e
+    select_b) fazem o papel dos multiplexadores dos barramentos A e B. A
+    porta de escrita (set_write_port) grava o dado no registrador escolhido
+    pelo endereço quando o controle sobe com o enable alto, e só esse
+    registrador (e a porta de leitura que o seleciona) é atualizado.
+
+    Os registradores em `constants` são somente leitura: têm valor fixo, a
+    porta de escrita os ignora e write() levanta ValueError. `initial` dá o
+    valor de partida (e de reset) dos demais, zero por padrão.
+    """
+
+    def __init__(self, length: int, names: Sequence[str],
+                 select_a: ISignalSender, select_b: ISignalSender,
+                 initial: Optional[Dict[int, int]] = None, constants: Optional[Dict[int, int]] = None):
+        self.length = length
+        self._initial = dict(initial or {})
+        self.constants = dict(constants or {})
+        self._values: List[SignalValue] = [self.initial_value(index) for index in range(len(names))]
+        self.registers: List[FileRegister] = [FileRegister(self, i, name) for i, name in enumerate(names)]
+        self._outputs = [r.out_sig for r in self.registers]
+
+        self._in = None
+        self._address = None
+        self._enable = None
+        self._in_ctrl = None
+        self._enabled: Optional[FileRegister] = None
+
+        self._port_a = _ReadPort(self, select_a)
+        self._port_b = _ReadPort(self, select_b)
+        self._read_ports = (self._port_a, self._port_b)
+
+    @property
+    def out_a(self) -> ISignalSender: return self._port_a.out_sig
+    @property
+    def out_b(self) -> ISignalSender: return self._port_b.out_sig
+
+    def initial_value(self, index: int) -> SignalValue:
+        value = self.constants.get(index, self._initial.get(index, 0))
+        return SignalValue.of(value, self.length)
+
+    def set_write_port(self, data_sender: ISignalSender, address_sender: ISignalSender,
+                       enable_sender: ISignalSender, control_sender: ISignalSender):
+        if self._in_ctrl is not None:
+            self._in_ctrl.signal_changed -= self._on_control_change
+        self._in = data_sender
+        self._address = address_sender
+        self._enable = enable_sender
+        self._in_ctrl = control_sender
+        self._in_ctrl.signal_changed += self._on_control_change
+
+    def write(self, index: int, data: BitArray):
+        if index in self.constants:
+            raise ValueError(f"Register {self.registers[index].name} is read-only")
+        self._store(index, data)
+
+    def reset(self):
+        for index in range(len(self._values)):
+            if index not in self.constants:
+                self._store(index, self.initial_value(index))
+
+    def _ports(self) -> Ports:
+        triggers = [(self._in_ctrl, self._on_control_change)] if self._in_ctrl else []
+        samples = [self._in, self._address, self._enable] if self._in else []
+        return Ports(self._outputs, triggers=triggers, samples=samples)
+
+    def _on_control_change(self, sender, _):
+        if not self._in_ctrl.signal().has_all_set():
+            if self._enabled is not None:
+                register, self._enabled = self._enabled, None
+                register.control_changed.invoke(register, False)
+            return
+        if not self._enable.signal().has_all_set(): return
+        index = self._address.signal().to_int32()
+        if index not in self.constants:
+            self._store(index, self._in.signal())
+            self._enabled = register = self.registers[index]
+            register.control_changed.invoke(register, True)
+
+    def _store(self, index: int, data: BitArray):
+        old = self._values[index]
+        if data.length != self.length or type(data) is not SignalValue:
+            data = SignalValue.of(data.value, self.length)
+        out = self._outputs[index]
+        if data is old or data.value == old.value:
+            out.events_suppressed += 1
+        else:
+            self._values[index] = data
+            out.events_fired += 1
+            out.signal_changed.invoke(out, data)
+            for port in self._read_ports:
+                port._written(index)
+        register = self.registers[index]
+        if tracer.register <= DEBUG and register.name:
+            tracer.emit(REGISTER, DEBUG, register.name, None, data.value, data.length)
+        register.data_changed.invoke(register, data)
@@ -1,5 +1,6 @@
-from src.utils.bit_utils import BitArray
+from src.utils.bit_utils import SignalValue
 from src.components.signals import ISignalSender, SignalSender
+from src.components.levelized import Ports
 
 class Shifter:
     def __init__(self, input_sender: ISignalSender, in_control: ISignalSender):
@@ -12,15 +13,24 @@ class Shifter:
     @property
     def out_sig(self) -> ISignalSender: return self._out
 
+    def _ports(self) -> Ports:
+        return Ports([self._out], inputs=[self._in, self._in_control],
+                     evaluate=lambda: self._update(None, None))
+
     def _update(self, sender, _):
         input_bits = self._in.signal()
-        control = self._in_control.signal().to_int32()
-        
-        if control == 1:
-            result = input_bits.shift_left()
-        elif control == 2:
-            result = input_bits.shift_right()
-        else:
-            result = input_bits
-        
-        self._out.set_data(result)
\ No newline at end of file
+        length = input_bits.length
+        value = shift_kernel(self._in_control.signal().to_int32(), input_bits.value, (1 << length) - 1)
+        self._out.set_data(SignalValue.of(value, length))
+
+SHIFT_NONE, SHIFT_LEFT, SHIFT_RIGHT = range(3)
+
+def shift_kernel(function: int, value: int, mask: int) -> int:
+    """
+    O deslocamento do Shifter sobre inteiros, com os nomes de BitArray:
+    SHIFT_LEFT (1) é shift_left, que desloca o valor para a direita (>> 1), e
+    SHIFT_RIGHT (2) é shift_right (<< 1); as outras funções não deslocam.
+    """
+    if function == SHIFT_LEFT: return value >> 1
+    if function == SHIFT_RIGHT: return (value << 1) & mask
+    return value
@@ -1,23 +1,54 @@
 from abc import ABC, abstractmethod
 from typing import List, Callable
-from src.utils.bit_utils import BitArray
+from src.utils.bit_utils import BitArray, SignalValue
 
 class EventHandler:
-    """Simples implementação de C# events"""
+    """
+    Simples implementação de C# events.
+
+    Os listeners ficam em um dict (listener -> quantas vezes foi inscrito),
+    então -= é O(1); invoke percorre uma tupla com a lista do momento,
+    refeita só na primeira chamada depois de um += ou -=. Quem entra ou sai
+    durante um invoke só vale a partir do próximo. Um listener inscrito mais
+    de uma vez é chamado essas vezes seguidas, na posição da primeira.
+
+    Em event_profile.profiling, invoke é trocado na classe por uma versão
+    que mede cada listener; fora dele não há custo algum.
+    """
+    __slots__ = ("_listeners", "_snapshot")
+
     def __init__(self):
-        self._listeners = []
-    
+        self._listeners = {}
+        self._snapshot = ()
+
     def __iadd__(self, listener):
-        self._listeners.append(listener)
+        self._listeners[listener] = self._listeners.get(listener, 0) + 1
+        self._snapshot = None
         return self
-    
+
     def __isub__(self, listener):
-        if listener in self._listeners:
-            self._listeners.remove(listener)
+        count = self._listeners.get(listener)
+        if count is not None:
+            if count == 1:
+                del self._listeners[listener]
+            else:
+                self._listeners[listener] = count - 1
+            self._snapshot = None
         return self
-    
+
+    @property
+    def listeners(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = tuple(
+                listener for listener, count in self._listeners.items() for _ in range(count))
+        return snapshot
+
     def invoke(self, sender, args):
-        for listener in self._listeners:
+        listeners = self._snapshot
+        if listeners is None:
+            listeners = self.listeners
+        for listener in listeners:
             listener(sender, args)
 
 class ISignalSender(ABC):
@@ -31,12 +62,23 @@ class ISignalSender(ABC):
         pass
 
 class SignalSender(ISignalSender):
+    """
+    Guarda o valor atual como um SignalValue imutável: signal() devolve a
+    própria instância, sem cópia, e set_data só aloca quando recebe um
+    BitArray mutável ou de outra largura.
+
+    set_data só dispara signal_changed quando o valor realmente muda;
+    events_fired/events_suppressed contam as transições propagadas e as
+    escritas descartadas por não mudarem nada.
+    """
     def __init__(self, data_or_length):
         self._signal_changed = EventHandler()
+        self.events_fired = 0
+        self.events_suppressed = 0
         if isinstance(data_or_length, int):
-            self._data = BitArray(data_or_length)
+            self._data = SignalValue.of(0, data_or_length)
         elif isinstance(data_or_length, BitArray):
-            self._data = data_or_length
+            self._data = data_or_length.frozen()
         else:
             raise ValueError("Invalid argument for SignalSender")
 
@@ -49,23 +91,38 @@ class SignalSender(ISignalSender):
         self._signal_changed = value
 
     def set_data(self, data: BitArray):
-        self._data = data.trim_or_pad(self._data.length)
-        self._signal_changed.invoke(self, self._data)
+        old = self._data
+        length = old.length
+        if data.length != length or type(data) is not SignalValue:
+            data = SignalValue.of(data.value, length)
+        if data is old or data.value == old.value:
+            self.events_suppressed += 1
+            return
+        self._data = data
+        self.events_fired += 1
+        self._signal_changed.invoke(self, data)
 
     def signal(self) -> BitArray:
-        return BitArray(self._data)
+        return self._data
+
+    def _load(self, data: SignalValue):
+        # Restauração de estado (Mic1.restore): troca o valor sem eventos
+        self._data = data
+
+_LOW = SignalValue.of(0, 1)
+_HIGH = SignalValue.of(1, 1)
 
 class SingleSignalSender(SignalSender):
     def __init__(self, bit: bool = False):
-        super().__init__(BitArray([bit]))
+        super().__init__(_HIGH if bit else _LOW)
 
     def enable(self):
-        if self.signal().has_all_set(): return
-        self.set_data(BitArray([True]))
+        if self._data is _HIGH: return
+        self.set_data(_HIGH)
 
     def disable(self):
-        if not self.signal().has_all_set(): return
-        self.set_data(BitArray([False]))
+        if self._data is _LOW: return
+        self.set_data(_LOW)
 
     def set_enable(self, enable: bool):
         if enable: self.enable()
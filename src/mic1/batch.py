@@ -0,0 +1,181 @@
+"""
+Execução de muitos programas MAC-1 (ou entradas do mesmo programa) em
+paralelo, um Mic1 por job, em processos de trabalho.
+
+Cada job é montado com o AssemblerV2, recebe os patches de memória e roda
+com Mic1.run até parar (HALT, orçamento de ciclos ou tempo). run_batch
+devolve os resultados à medida que terminam. Um job que levanta exceção,
+estoura o tempo ou derruba o processo vira um JobResult com status de erro;
+os demais seguem, e o processo perdido é substituído por um novo.
+"""
+
+import multiprocessing
+import os
+import textwrap
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.mic1 import Mic1, STOP_UNTIL
+
+# source: código MAC-1; patches: {endereço: palavra} (ou pares) gravados depois
+# da montagem; max_cycles: orçamento de trocas de fase (None = até o HALT);
+# cells: endereços devolvidos no resultado; timeout: segundos (None = o de run_batch)
+Job = namedtuple("Job", ["source", "patches", "max_cycles", "cells", "timeout", "evaluation"],
+                 defaults=((), None, (), None, "event"))
+
+# index: posição do job na entrada; reason: o motivo de parada de Mic1.run (STOP_*),
+# ou None se o job não chegou ao fim; registers: {nome: valor} dos 16 registradores;
+# cells: {endereço: valor}; error: a exceção, como texto; elapsed: segundos no worker
+JobResult = namedtuple("JobResult", ["index", "status", "reason", "cycles", "micro_instructions",
+                                     "macro_instructions", "registers", "cells", "error", "elapsed"])
+
+STATUS_OK = "ok"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+STATUS_CRASHED = "crashed"
+
+# Folga, além do timeout do job, antes de matar um worker que não respondeu
+HARD_TIMEOUT_GRACE = 1.0
+
+def run_job(job: Job, index: int = 0, timeout: Optional[float] = None) -> JobResult:
+    """
+    Roda um job neste processo. O tempo é conferido entre instruções MAC-1:
+    ao estourar, o resultado tem status STATUS_TIMEOUT e o estado até ali.
+    """
+    timeout = job.timeout if job.timeout is not None else timeout
+    start = time.perf_counter()
+    try:
+        mic1 = Mic1(job.evaluation)
+        AssemblerV2.assemble(mic1.mp, textwrap.dedent(job.source))
+        patches = job.patches.items() if isinstance(job.patches, dict) else job.patches
+        for address, word in patches:
+            mic1.mp.load_words(address, [word])
+
+        until = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            until = lambda _: time.monotonic() > deadline
+        result = mic1.run(max_cycles=job.max_cycles, until=until)
+    except Exception as e:
+        return JobResult(index, STATUS_ERROR, None, 0, 0, 0, {}, {}, f"{type(e).__name__}: {e}",
+                         time.perf_counter() - start)
+
+    status = STATUS_TIMEOUT if result.reason == STOP_UNTIL else STATUS_OK
+    registers = {r.name: r.out_sig.signal().value for r in mic1.registers}
+    cells = {address: mic1.mp.cell(address).value for address in job.cells}
+    return JobResult(index, status, result.reason, result.cycles, result.micro_instructions,
+                     result.macro_instructions, registers, cells, None, time.perf_counter() - start)
+
+def _worker(connection):
+    # Recebe (índice, job, timeout) até receber None
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+        connection.send(run_job(message[1], message[0], message[2]))
+
+class _Worker:
+    __slots__ = ("process", "connection", "index", "hard_deadline")
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.index: Optional[int] = None
+        self.hard_deadline: Optional[float] = None
+
+    def submit(self, index: int, job: Job, timeout: Optional[float]):
+        timeout = job.timeout if job.timeout is not None else timeout
+        self.index = index
+        self.hard_deadline = None if timeout is None else time.monotonic() + timeout + HARD_TIMEOUT_GRACE
+        self.connection.send((index, job, timeout))
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(0.5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+def _failed(index: int, status: str, error: str, elapsed: float) -> JobResult:
+    return JobResult(index, status, None, 0, 0, 0, {}, {}, error, elapsed)
+
+def run_batch(jobs: Iterable[Job], workers: Optional[int] = None,
+              timeout: Optional[float] = None) -> Iterator[JobResult]:
+    """
+    Roda os jobs em `workers` processos (padrão: os.cpu_count()) e devolve
+    cada JobResult assim que termina, fora de ordem (use JobResult.index).
+    `timeout` vale para os jobs sem timeout próprio. Um job que não responde
+    até HARD_TIMEOUT_GRACE segundos depois do prazo tem o processo morto e
+    volta como STATUS_TIMEOUT, sem estado; um processo que morre devolve o
+    job como STATUS_CRASHED. Com workers=0 os jobs rodam neste processo,
+    em ordem e sem isolamento.
+    """
+    if workers == 0:
+        for index, job in enumerate(jobs):
+            yield run_job(job, index, timeout)
+        return
+
+    context = multiprocessing.get_context()
+    pending = deque(enumerate(jobs))
+    pool: List[_Worker] = [_Worker(context) for _ in range(min(workers or os.cpu_count() or 1, len(pending)))]
+    started: Dict[int, float] = {}
+    try:
+        while True:
+            for i, worker in enumerate(pool):
+                if worker.index is None and pending:
+                    index, job = pending.popleft()
+                    started[index] = time.monotonic()
+                    worker.submit(index, job, timeout)
+            busy = [worker for worker in pool if worker.index is not None]
+            if not busy:
+                return
+
+            deadlines = [w.hard_deadline for w in busy if w.hard_deadline is not None]
+            wait_for = None if not deadlines else max(0.0, min(deadlines) - time.monotonic())
+            ready = wait([w.connection for w in busy] + [w.process.sentinel for w in busy], wait_for)
+
+            now = time.monotonic()
+            for i, worker in enumerate(pool):
+                if worker.index is None: continue
+                index = worker.index
+                dead = worker.process.sentinel in ready
+                if worker.connection in ready:
+                    try:
+                        result = worker.connection.recv()
+                    except EOFError:
+                        dead = True
+                    else:
+                        worker.index = None
+                        yield result
+                        continue
+                if dead:
+                    # O pipe pode fechar um pouco antes de o processo terminar
+                    worker.process.join(0.5)
+                    exitcode = worker.process.exitcode
+                    worker.kill()
+                    pool[i] = _Worker(context)
+                    yield _failed(index, STATUS_CRASHED, f"worker exited with code {exitcode}", now - started[index])
+                elif worker.hard_deadline is not None and now >= worker.hard_deadline:
+                    worker.kill()
+                    pool[i] = _Worker(context)
+                    yield _failed(index, STATUS_TIMEOUT, "worker did not answer and was killed", now - started[index])
+    finally:
+        for worker in pool:
+            if worker.index is None:
+                worker.stop()
+            else:
+                worker.kill()
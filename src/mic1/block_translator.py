@@ -0,0 +1,327 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from src.mic1.isa_interpreter import (
+    IsaInterpreter, WORD_MASK, ADDRESS_MASK,
+    LODD, STOD, ADDD, SUBD, JPOS, JZER, JUMP, LOCO, LODL, STOL, ADDL, SUBL,
+    JNEG, JNZE, CALL, PSHI, POPI, PUSH, POP, RETN, SWAP, INSP, DESP,
+)
+
+MAX_BLOCK_LENGTH = 32
+
+# Limites dos laços compilados (blocos no ciclo e instruções por volta)
+MAX_LOOP_BLOCKS = 8
+MAX_LOOP_LENGTH = 128
+
+# Instruções que terminam um bloco básico (o próximo PC só é conhecido ao executar)
+TERMINATORS = {JPOS, JZER, JUMP, JNEG, JNZE, CALL, RETN}
+
+# Registradores que os blocos recebem como argumentos e devolvem, junto com
+# o número de instruções executadas, PC, IR e TIR (esses três só importam na
+# saída, com os valores da última instrução executada).
+_REGISTERS = "ac, sp, a, mbr_rd, mbr_wr"
+
+class Block:
+    __slots__ = ("start", "instructions", "addresses", "length", "function", "source", "links", "loop", "loops", "valid")
+
+    def __init__(self, start: int, instructions: List[Tuple[int, int, int, int, int]], function: Callable, source: str):
+        self.start = start
+        self.instructions = instructions # (PC, palavra, instrução, operando, TIR)
+        self.addresses = [pc & ADDRESS_MASK for pc, _, _, _, _ in instructions]
+        self.length = len(instructions)
+        self.function = function
+        self.source = source
+        self.links: Dict[int, 'Block'] = {}
+        self.loop: Optional['Loop'] = None     # laço que começa neste bloco
+        self.loops: List['Loop'] = []           # laços de que este bloco faz parte
+        self.valid = True
+
+class Loop:
+    """Ciclo de blocos ligados (o último volta ao primeiro) compilado em uma só função."""
+    __slots__ = ("head", "blocks", "length", "function", "source")
+
+    def __init__(self, blocks: List[Block], function: Callable, source: str):
+        self.head = blocks[0]
+        self.blocks = blocks
+        self.length = sum(block.length for block in blocks)
+        self.function = function
+        self.source = source
+
+class BlockTranslator(IsaInterpreter):
+    """
+    IsaInterpreter que traduz cada bloco básico do programa (uma sequência de
+    instruções terminada por um desvio, CALL ou RETN) em uma função Python e
+    guarda essas funções por endereço de início. Cada bloco devolve o próximo
+    PC, e o bloco seguinte fica ligado ao anterior (encadeamento), então o
+    despacho só consulta o dicionário de blocos na primeira passagem.
+
+    Quando uma ligação nova fecha um ciclo de blocos (um laço do programa),
+    os blocos do ciclo também são compilados juntos em uma função com um
+    `while`, que só volta ao despacho quando o laço sai por outro caminho ou
+    o orçamento de instruções acaba.
+
+    Toda escrita na memória feita pelos blocos (STOD, STOL, PSHI, POPI, PUSH,
+    CALL) confere se o endereço pertence a algum bloco traduzido; se sim, os
+    blocos que o cobrem (e os laços que os usam) são descartados e a execução
+    volta ao despacho logo depois da instrução que escreveu, para que código
+    automodificado seja retraduzido. Escritas feitas por fora devem usar
+    write().
+    """
+
+    def __init__(self, memory: Optional[List[int]] = None):
+        super().__init__(memory)
+        self._blocks: Dict[Tuple[int, int], Block] = {}
+        self._owners: Dict[int, Set[Tuple[int, int]]] = {}
+        self._code = bytearray(len(self.memory))
+        self.translations = 0
+        self.invalidations = 0
+        self.executions = 0
+        self.chain_hits = 0
+        self.cache_hits = 0
+        self.loops = 0
+        self.loop_executions = 0
+
+    def write(self, address: int, value: int):
+        address &= ADDRESS_MASK
+        self.memory[address] = value & WORD_MASK
+        if self._code[address]:
+            self._invalidate(address)
+
+    def invalidate_all(self):
+        for block in self._blocks.values():
+            block.valid = False
+            block.loop = None
+        self._blocks.clear()
+        self._owners.clear()
+        self._code[:] = bytes(len(self._code))
+
+    def statistics(self) -> Dict[str, float]:
+        return {
+            "blocks": len(self._blocks),
+            "translations": self.translations,
+            "invalidations": self.invalidations,
+            "executions": self.executions,
+            "chain_hits": self.chain_hits,
+            "cache_hits": self.cache_hits,
+            "chain_hit_rate": self.chain_hits / self.executions if self.executions else 0.0,
+            "loops": self.loops,
+            "loop_executions": self.loop_executions,
+        }
+
+    def block_source(self, pc: int) -> str:
+        """Código gerado para o bloco que começa em pc (traduzindo, se preciso)."""
+        return self._lookup(pc & WORD_MASK).source
+
+    def run(self, max_instructions: int) -> int:
+        memory = self.memory
+        pc, ac, sp, ir, tir, a, mbr_rd, mbr_wr = (
+            self.pc, self.ac, self.sp, self.ir, self.tir, self.a, self.mbr_rd, self.mbr_wr)
+        remaining = max_instructions
+        executions = chain_hits = loop_executions = 0
+        previous = block = None
+        while remaining > 0:
+            if block is None or not block.valid:
+                block = self._lookup(pc)
+                if previous is not None and previous.valid:
+                    previous.links[pc] = block
+                    self._close_loop(previous, block)
+            else:
+                chain_hits += 1
+                loop = block.loop
+                if loop is not None and loop.length <= remaining:
+                    executed, pc, ir, tir, ac, sp, a, mbr_rd, mbr_wr = loop.function(
+                        ac, sp, a, mbr_rd, mbr_wr, memory, remaining)
+                    remaining -= executed
+                    loop_executions += 1
+                    previous = None
+                    block = None
+                    continue
+            if block.length > remaining:
+                # O orçamento acaba no meio do bloco: segue instrução a instrução,
+                # sem ligar esses blocos de uma instrução aos demais
+                executed, pc, ir, tir, ac, sp, a, mbr_rd, mbr_wr = self._lookup(pc, 1).function(
+                    ac, sp, a, mbr_rd, mbr_wr, memory)
+                remaining -= executed
+                executions += 1
+                previous = block = None
+                continue
+            executed, pc, ir, tir, ac, sp, a, mbr_rd, mbr_wr = block.function(ac, sp, a, mbr_rd, mbr_wr, memory)
+            remaining -= executed
+            executions += 1
+            previous = block
+            block = block.links.get(pc)
+
+        self.pc, self.ac, self.sp, self.ir, self.tir, self.a, self.mbr_rd, self.mbr_wr = (
+            pc, ac, sp, ir, tir, a, mbr_rd, mbr_wr)
+        self.executions += executions
+        self.chain_hits += chain_hits
+        self.loop_executions += loop_executions
+        self.instructions += max_instructions
+        return max_instructions
+
+    # ------------------------------------------------------------------ tradução
+
+    def _lookup(self, pc: int, limit: int = MAX_BLOCK_LENGTH) -> Block:
+        key = (pc, limit)
+        block = self._blocks.get(key)
+        if block is not None:
+            self.cache_hits += 1
+            return block
+        block = self._blocks[key] = self._translate(pc, limit)
+        for address in block.addresses:
+            self._owners.setdefault(address, set()).add(key)
+            self._code[address] = 1
+        return block
+
+    def _invalidate(self, address: int):
+        for key in self._owners.pop(address, ()):
+            block = self._blocks.pop(key, None)
+            if block is None: continue
+            block.valid = False
+            for loop in block.loops:
+                loop.head.loop = None
+            self.invalidations += 1
+            for covered in block.addresses:
+                owners = self._owners.get(covered)
+                if owners is not None:
+                    owners.discard(key)
+                    if not owners:
+                        del self._owners[covered]
+                        self._code[covered] = 0
+        self._code[address] = 0
+
+    def _close_loop(self, previous: Block, head: Block):
+        """Se a ligação previous -> head fecha um ciclo de blocos, compila o laço."""
+        if head.loop is not None: return
+        path = _find_path(head, previous, MAX_LOOP_BLOCKS)
+        if path is None or sum(block.length for block in path) > MAX_LOOP_LENGTH: return
+
+        lines = [f"def loop_{head.start}({_REGISTERS}, memory, budget):", "    n = 0", "    while True:"]
+        done = 0
+        for index, block in enumerate(path):
+            following = path[(index + 1) % len(path)].start
+
+            def exit_lines(count: int, next_pc: str, word: int, tir: int, final: bool) -> List[str]:
+                if not final:
+                    return [f"return n + {done + count}, {next_pc}, {word}, {tir}, {_REGISTERS}"]
+                # Fim do bloco: segue no laço só se o desvio foi para o próximo bloco do ciclo
+                checked = [] if next_pc == str(following) else [
+                    f"pc = {next_pc}",
+                    f"if pc != {following}: return n + {done + count}, pc, {word}, {tir}, {_REGISTERS}",
+                ]
+                if index < len(path) - 1:
+                    return checked
+                return checked + [
+                    f"n += {done + count}",
+                    f"if n + {done + count} > budget: return n, {following}, {word}, {tir}, {_REGISTERS}",
+                ]
+
+            lines += ["        " + line for line in _block_lines(block.instructions, exit_lines)]
+            done += block.length
+
+        loop = Loop(path, *self._compile(lines, f"loop_{head.start}"))
+        for block in path:
+            block.loops.append(loop)
+        head.loop = loop
+        self.loops += 1
+
+    def _translate(self, start: int, limit: int) -> Block:
+        decode = self._decode
+        instructions = []
+        pc = start
+        while len(instructions) < limit:
+            word = self.memory[pc & ADDRESS_MASK]
+            instruction, operand, tir = decode[word]
+            instructions.append((pc, word, instruction, operand, tir))
+            pc = (pc + 1) & WORD_MASK
+            if instruction in TERMINATORS:
+                break
+
+        def exit_lines(count: int, next_pc: str, word: int, tir: int, final: bool) -> List[str]:
+            return [f"return {count}, {next_pc}, {word}, {tir}, {_REGISTERS}"]
+
+        lines = [f"def block_{start}({_REGISTERS}, memory):"]
+        lines += ["    " + line for line in _block_lines(instructions, exit_lines)]
+        self.translations += 1
+        return Block(start, instructions, *self._compile(lines, f"block_{start}"))
+
+    def _compile(self, lines: List[str], name: str) -> Tuple[Callable, str]:
+        source = "\n".join(lines) + "\n"
+        namespace = {"code": self._code, "invalidate": self._invalidate}
+        exec(compile(source, f"<MAC-1 {name}>", "exec"), namespace)
+        return namespace[name], source
+
+def _find_path(start: Block, end: Block, max_blocks: int) -> Optional[List[Block]]:
+    """Caminho de start até end seguindo as ligações entre blocos (busca em largura)."""
+    paths = [[start]]
+    while paths:
+        path = paths.pop(0)
+        if path[-1] is end:
+            return path
+        if len(path) == max_blocks: continue
+        for following in path[-1].links.values():
+            if following.valid and following not in path:
+                paths.append(path + [following])
+    return None
+
+def _block_lines(instructions: List[Tuple[int, int, int, int, int]], exit_lines) -> List[str]:
+    """
+    Linhas de um bloco. exit_lines(contagem, próximo PC, IR, TIR, final) gera
+    a saída depois de uma escrita em código traduzido (final falso) e a do fim
+    do bloco (final verdadeiro).
+    """
+    lines = []
+    for count, (pc, word, instruction, operand, tir) in enumerate(instructions, 1):
+        next_pc = (pc + 1) & WORD_MASK
+
+        def checked_write(target: str, value: str, resume: int = next_pc) -> List[str]:
+            # Escrita que pode atingir código traduzido (inclusive este bloco)
+            return [
+                f"t = {target}",
+                f"memory[t] = {value}",
+                "if code[t]:",
+                "    invalidate(t)",
+                *("    " + line for line in exit_lines(count, str(resume), word, tir, False)),
+            ]
+
+        body = _body(instruction, operand, word, next_pc, checked_write)
+        if instruction in TERMINATORS:
+            return lines + body[:-1] + exit_lines(count, body[-1], word, tir, True)
+        lines += body
+    return lines + exit_lines(len(instructions), str(next_pc), word, tir, True)
+
+def _body(instruction: int, x: int, word: int, next_pc: int, checked_write) -> List[str]:
+    """
+    Linhas de uma instrução, com o mesmo efeito de IsaInterpreter.run. Para os
+    terminadores, a última linha é a expressão do próximo PC.
+    """
+    M = WORD_MASK
+    fetched = [f"mbr_rd = {word}"] # o MBR_RD fica com a instrução se ela não ler a memória
+    if instruction == LODD: return [f"ac = mbr_rd = memory[{x}]"]
+    if instruction == STOD: return fetched + checked_write(str(x), "mbr_wr = ac")
+    if instruction == ADDD: return [f"mbr_rd = memory[{x}]", f"ac = (ac + mbr_rd) & {M}"]
+    if instruction == SUBD: return [f"mbr_rd = memory[{x}]", f"a = ~mbr_rd & {M}", f"ac = (ac + 1 + a) & {M}"]
+    if instruction == LOCO: return fetched + [f"ac = {x}"]
+    if instruction == LODL: return [f"a = (sp + {word}) & {M}", f"ac = mbr_rd = memory[a & {ADDRESS_MASK}]"]
+    if instruction == STOL: return fetched + [f"a = (sp + {word}) & {M}"] + checked_write(f"a & {ADDRESS_MASK}", "mbr_wr = ac")
+    if instruction == ADDL:
+        return [f"a = (sp + {word}) & {M}", f"mbr_rd = memory[a & {ADDRESS_MASK}]", f"ac = (ac + mbr_rd) & {M}"]
+    if instruction == SUBL:
+        return [f"mbr_rd = memory[(sp + {word}) & {ADDRESS_MASK}]", f"a = ~mbr_rd & {M}", f"ac = (ac + 1 + a) & {M}"]
+    if instruction == PSHI:
+        return [f"mbr_rd = memory[ac & {ADDRESS_MASK}]", f"sp = (sp - 1) & {M}"] + checked_write(f"sp & {ADDRESS_MASK}", "mbr_wr")
+    if instruction == POPI:
+        return [f"mbr_rd = memory[sp & {ADDRESS_MASK}]", f"sp = (sp + 1) & {M}"] + checked_write(f"ac & {ADDRESS_MASK}", "mbr_wr")
+    if instruction == PUSH: return fetched + [f"sp = (sp - 1) & {M}"] + checked_write(f"sp & {ADDRESS_MASK}", "mbr_wr = ac")
+    if instruction == POP: return [f"ac = mbr_rd = memory[sp & {ADDRESS_MASK}]", f"sp = (sp + 1) & {M}"]
+    if instruction == SWAP: return fetched + ["a = ac", "ac, sp = sp, a"]
+    if instruction == INSP: return fetched + [f"a = {x}", f"sp = (sp + a) & {M}"]
+    if instruction == DESP: return fetched + [f"a = {-x & M}", f"sp = (sp + a) & {M}"]
+
+    if instruction == JPOS: return fetched + [f"{x} if not ac & 0x8000 else {next_pc}"]
+    if instruction == JZER: return fetched + [f"{x} if ac == 0 else {next_pc}"]
+    if instruction == JUMP: return fetched + [str(x)]
+    if instruction == JNEG: return fetched + [f"{x} if ac & 0x8000 else {next_pc}"]
+    if instruction == JNZE: return fetched + [f"{x} if ac != 0 else {next_pc}"]
+    if instruction == CALL:
+        return fetched + [f"sp = (sp - 1) & {M}"] + checked_write(f"sp & {ADDRESS_MASK}", f"mbr_wr = {next_pc}", x) + [str(x)]
+    # RETN
+    return [f"pc = mbr_rd = memory[sp & {ADDRESS_MASK}]", f"sp = (sp + 1) & {M}", "pc"]
@@ -0,0 +1,171 @@
+"""
+Checkpoints em disco do estado completo de um Mic1 (um Snapshot), para
+retomar execuções interrompidas ou levar uma máquina "quente" para outro
+host sem reexecutar o prefixo.
+
+Formato (little-endian):
+
+    cabeçalho   CHECKPOINT_MAGIC, fase, ticks, número de timers e de sinais,
+                digest do layout dos sinais (Mic1.state_layout), palavras e
+                bytes por palavra da memória e do control store, e os
+                offsets das duas imagens
+    registros   o disparo agendado de cada timer (int64, -1 sem disparo) e
+                o valor de cada sinal com estado (uint64), na ordem do layout
+    imagens     o control store e, alinhada em PAGE_ALIGNMENT bytes, a memória
+
+Na carga a imagem da memória não é interpretada: o arquivo é mapeado
+(mmap) e a memória passa a ler direto do mapeamento (Memory.share_image),
+copiando-o só na primeira escrita.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Callable, Optional
+
+from src.utils.bit_utils import SignalValue
+from src.mic1.mic1 import Mic1, RunResult, Snapshot, STOP_UNTIL
+from src.mic1.exceptions.checkpoint_exceptions import CheckpointFormatException
+
+CHECKPOINT_MAGIC = b"MIC1CK01"
+PAGE_ALIGNMENT = 4096
+
+# magic, fase, ticks, timers, sinais, layout, palavras/bytes da memória,
+# palavras/bytes do control store, offset do control store, offset da memória
+_HEADER = struct.Struct("<8shqII16sIBIBQQ")
+
+def layout_digest(mic1: Mic1) -> bytes:
+    """Identifica a lista de sinais salvos; checkpoints só carregam em máquinas com o mesmo layout."""
+    text = ";".join(f"{name}:{width}" for name, width in mic1.state_layout())
+    return hashlib.sha256(text.encode("utf-8")).digest()[:16]
+
+def _little_endian(data: bytes, typecode: str) -> bytes:
+    if sys.byteorder == "little":
+        return data
+    words = array(typecode)
+    words.frombytes(data)
+    words.byteswap()
+    return words.tobytes()
+
+def save_checkpoint(mic1: Mic1, path: str, snapshot: Optional[Snapshot] = None):
+    """
+    Grava `snapshot` (por padrão, o estado atual de `mic1`) em `path`. O
+    arquivo é escrito em um temporário e renomeado, então um checkpoint
+    anterior no mesmo caminho nunca fica pela metade.
+    """
+    if snapshot is None:
+        snapshot = mic1.snapshot()
+    memory, control_store = mic1.mp, mic1.control_unit.control_store
+    phase, ticks, dues = snapshot.clock
+
+    registers = struct.pack(f"<{len(dues)}q{len(snapshot.signals)}Q",
+                            *[-1 if due is None else due for due in dues],
+                            *[value.value for value in snapshot.signals])
+    control_store_offset = _HEADER.size + len(registers)
+    control_store_image = _little_endian(b"".join(snapshot.control_store), control_store.words.format)
+    memory_offset = -(-(control_store_offset + len(control_store_image)) // PAGE_ALIGNMENT) * PAGE_ALIGNMENT
+    memory_image = _little_endian(b"".join(snapshot.memory), memory.words.format)
+
+    header = _HEADER.pack(CHECKPOINT_MAGIC, phase, ticks, len(dues), len(snapshot.signals), layout_digest(mic1),
+                          len(memory), memory.words.itemsize, len(control_store), control_store.words.itemsize,
+                          control_store_offset, memory_offset)
+    padding = bytes(memory_offset - control_store_offset - len(control_store_image))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(header + registers + control_store_image + padding + memory_image)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+def load_checkpoint(path: str, mic1: Optional[Mic1] = None, evaluation: str = "event",
+                    map_memory: bool = True) -> Mic1:
+    """
+    Restaura o checkpoint em `mic1` (ou em um Mic1 novo no modo `evaluation`)
+    e o devolve. Com map_memory a memória referencia o arquivo mapeado, sem
+    cópia (em máquinas big-endian, ou com map_memory=False, é copiada).
+    """
+    if mic1 is None:
+        mic1 = Mic1(evaluation)
+    memory, control_store = mic1.mp, mic1.control_unit.control_store
+
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise CheckpointFormatException(path, "empty file")
+    view = memoryview(mapped)
+    try:
+        if len(view) < _HEADER.size:
+            raise CheckpointFormatException(path, "truncated header")
+        (magic, phase, ticks, timer_count, signal_count, layout, memory_words, memory_itemsize,
+         control_store_words, control_store_itemsize, control_store_offset, memory_offset) = _HEADER.unpack_from(view)
+        if magic != CHECKPOINT_MAGIC:
+            raise CheckpointFormatException(path, f"bad magic {magic!r}")
+        if layout != layout_digest(mic1):
+            raise CheckpointFormatException(path, "saved by a machine with a different signal layout")
+        if (memory_words, memory_itemsize) != (len(memory), memory.words.itemsize) or \
+                (control_store_words, control_store_itemsize) != (len(control_store), control_store.words.itemsize):
+            raise CheckpointFormatException(path, "memory sizes do not match this machine")
+        memory_end = memory_offset + memory_words * memory_itemsize
+        if len(view) < memory_end:
+            raise CheckpointFormatException(path, f"truncated: {len(view)} bytes, expected {memory_end}")
+
+        registers = struct.unpack_from(f"<{timer_count}q{signal_count}Q", view, _HEADER.size)
+        dues = tuple(None if due < 0 else due for due in registers[:timer_count])
+        signals = tuple(SignalValue.of(value, width)
+                        for (_, width), value in zip(mic1.state_layout(), registers[timer_count:]))
+        control_store_end = control_store_offset + control_store_words * control_store_itemsize
+        control_store_image = _little_endian(bytes(view[control_store_offset:control_store_end]),
+                                             control_store.words.format)
+        mic1.restore(Snapshot((phase, ticks, dues), signals, None, (control_store_image,)))
+
+        image = view[memory_offset:memory_end]
+        if map_memory and sys.byteorder == "little":
+            # A memória passa a ser dona da visão; o mapeamento vive enquanto ela o usar
+            memory.share_image(image.cast(memory.words.format))
+            return mic1
+        memory.load_words(0, _little_endian(bytes(image), memory.words.format), raw=True)
+        image.release()
+    except BaseException:
+        view.release()
+        mapped.close()
+        raise
+    view.release()
+    mapped.close()
+    return mic1
+
+def run_with_checkpoints(mic1: Mic1, path: str, every: int, max_cycles: Optional[int] = None,
+                         until_pc: Optional[int] = None, until: Optional[Callable[[Mic1], bool]] = None,
+                         stop_on_halt: bool = True) -> RunResult:
+    """
+    Mic1.run que grava um checkpoint em `path` a cada `every` instruções
+    MAC-1 e outro ao parar. Os checkpoints caem entre instruções, onde
+    retomar com run() detecta as mesmas paradas que a execução contínua.
+    """
+    if every < 1:
+        raise ValueError(f"Checkpoint interval must be at least one instruction: {every}")
+    cycles = micro = macro = 0
+    while True:
+        count = 0
+        stopped = False
+
+        def boundary(machine: Mic1) -> bool:
+            nonlocal count, stopped
+            if until is not None and until(machine):
+                stopped = True
+                return True
+            count += 1
+            return count == every
+
+        limit = None if max_cycles is None else max_cycles - cycles
+        result = mic1.run(limit, until_pc, boundary, stop_on_halt)
+        cycles += result.cycles
+        micro += result.micro_instructions
+        macro += result.macro_instructions
+        save_checkpoint(mic1, path)
+        if result.reason != STOP_UNTIL or stopped:
+            return RunResult(result.reason, cycles, micro, macro)
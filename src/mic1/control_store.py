@@ -1,44 +1,155 @@
+import hashlib
 import os
-from typing import Optional, Tuple
+import sys
+from array import array
+from importlib import resources
+from typing import Dict, Optional, Tuple
 from src.components.memory import Memory
 from src.components.signals import ISignalSender
 from src.utils.bit_utils import BitArray
 from src.mic1.exceptions.control_store_exceptions import CtrlStoreSrcFileInvalidLineException
 
+_default_source_path: Optional[str] = None
+
+def default_source_path() -> str:
+    """control_store.txt do pacote src.mic1, independente do diretório atual."""
+    global _default_source_path
+    if _default_source_path is None:
+        _default_source_path = str(resources.files("src.mic1").joinpath("control_store.txt"))
+    return _default_source_path
+
 class ControlStore(Memory):
     def __init__(self, address_sender: ISignalSender, in_buffer_sender: ISignalSender,
                  rd_sender: Optional[ISignalSender], wr_sender: Optional[ISignalSender]):
         super().__init__(256, 32, address_sender, in_buffer_sender, rd_sender, wr_sender, None)
 
 class CtrlStoreTxtSrcFileLoader:
-    def __init__(self, source_file_path: str):
-        self._source_file_path = source_file_path
+    """
+    Carrega um control store em texto ("índice: bits" por linha). Cada fonte
+    interpretada vira uma imagem binária (as palavras em array('I')) guardada
+    por hash SHA-256 do texto, em memória e em
+    __pycache__/<nome>.<hash>.bin ao lado da fonte, como um .pyc. As cargas
+    seguintes do mesmo texto só copiam a imagem para a memória (o texto nem
+    é relido enquanto mtime e tamanho do arquivo não mudam); um texto
+    editado tem outro hash e é interpretado de novo.
+
+    A imagem cobre a memória inteira, então células que o texto não lista
+    ficam zeradas. `loaded_from` diz de onde veio a última carga: "text",
+    "disk" ou "memory".
+    """
+
+    CACHE_MAGIC = b"MIC1CS01"
+
+    # Imagens já interpretadas neste processo, por (hash, tamanho da memória),
+    # e o hash de cada fonte por (caminho, mtime, tamanho), para não reler o
+    # texto enquanto o arquivo não mudar
+    _images: Dict[Tuple[str, int], array] = {}
+    _digests: Dict[str, Tuple[int, int, str]] = {}
+
+    def __init__(self, source_file_path: Optional[str] = None, use_cache: bool = True):
+        self._source_file_path = source_file_path if source_file_path is not None else default_source_path()
+        self._use_cache = use_cache
+        self.loaded_from: Optional[str] = None
+
+    @classmethod
+    def clear_memory_cache(cls):
+        """Esquece as imagens deste processo (o cache em disco continua)."""
+        cls._images.clear()
+        cls._digests.clear()
+
+    @property
+    def source_file_path(self) -> str:
+        return self._source_file_path
+
+    def cache_path(self, digest: str) -> str:
+        directory, name = os.path.split(self._source_file_path)
+        return os.path.join(directory, "__pycache__", f"{os.path.splitext(name)[0]}.{digest}.bin")
 
     def load(self, memory: Memory):
+        """Copia a imagem do control store para `memory`."""
+        image = self._image(len(memory))
+        memory.load_words(0, image)
+
+    def shared_image(self, length: int) -> memoryview:
+        """
+        A imagem do processo para esta fonte, somente leitura, para
+        Memory.share_image: todas as memórias que a usam dividem o mesmo buffer.
+        """
+        return memoryview(self._image(length)).toreadonly()
+
+    def _image(self, length: int) -> array:
         if not os.path.exists(self._source_file_path):
             raise FileNotFoundError(f"control store source file not found: {self._source_file_path}")
-        
-        with open(self._source_file_path, 'r', encoding='utf-8') as f:
-            for line_idx, line in enumerate(f):
-                line = line.strip()
-                if not line: continue
-                
-                # C# logic uses 0-based index for logic but exception might use 1-based or 0-based?
-                # C# Code: lineIndex++; in loop. Exception uses lineIndex.
-                # Let's assume 1-based for user friendliness or match C# variable 'lineIndex' which usually starts at 0?
-                # C#: int lineIndex = 0; ... lineIndex++;
-                # So the first line is index 0.
-                
-                try:
-                    index, bits = self._interpret_line(line)
-                    memory.set_cell(index, bits)
-                except Exception as e:
-                    # Wrap generic errors if they aren't already our custom exception?
-                    # The C# code throws CtrlStoreSrcFIleInvalidLineException directly in InterpretLine.
-                    if isinstance(e, CtrlStoreSrcFileInvalidLineException):
-                        raise e
-                    # Else re-raise or wrap? C# doesn't catch in Load, so it propagates.
-                    raise e
+
+        if not self._use_cache:
+            self.loaded_from = "text"
+            return self._parse(self._read_source(), length)
+
+        status = os.stat(self._source_file_path)
+        known = self._digests.get(self._source_file_path)
+        source = None
+        if known is not None and known[:2] == (status.st_mtime_ns, status.st_size):
+            digest = known[2]
+        else:
+            source = self._read_source()
+            digest = hashlib.sha256(source).hexdigest()[:16]
+            self._digests[self._source_file_path] = (status.st_mtime_ns, status.st_size, digest)
+
+        key = (digest, length)
+        image = self._images.get(key)
+        self.loaded_from = "memory"
+        if image is None:
+            image = self._read_cache(digest, length)
+            self.loaded_from = "disk"
+        if image is None:
+            image = self._parse(source if source is not None else self._read_source(), length)
+            self._write_cache(digest, image)
+            self.loaded_from = "text"
+        self._images[key] = image
+        return image
+
+    def _read_source(self) -> bytes:
+        with open(self._source_file_path, "rb") as f:
+            return f.read()
+
+    def _parse(self, source: bytes, length: int) -> array:
+        image = array("I", bytes(4 * length))
+        for line in source.decode("utf-8").splitlines():
+            line = line.strip()
+            if not line: continue
+            index, bits = self._interpret_line(line)
+            image[index] = bits.value & 0xFFFFFFFF
+        return image
+
+    def _read_cache(self, digest: str, length: int) -> Optional[array]:
+        try:
+            with open(self.cache_path(digest), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        header = len(self.CACHE_MAGIC)
+        if data[:header] != self.CACHE_MAGIC or len(data) != header + 4 * length:
+            return None
+        image = array("I")
+        image.frombytes(data[header:])
+        if sys.byteorder == "big":
+            image.byteswap() # o arquivo é little-endian
+        return image
+
+    def _write_cache(self, digest: str, image: array):
+        data = array("I", image)
+        if sys.byteorder == "big":
+            data.byteswap()
+        path = self.cache_path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Grava em um temporário e renomeia, para outro processo nunca ler pela metade
+            temporary = f"{path}.{os.getpid()}.tmp"
+            with open(temporary, "wb") as f:
+                f.write(self.CACHE_MAGIC + data.tobytes())
+            os.replace(temporary, path)
+        except OSError:
+            pass # diretório sem permissão de escrita: segue só com o cache em memória
 
     def _interpret_line(self, line: str) -> Tuple[int, BitArray]:
         # C#: string[] parts = line.Replace(" ", "").Split(":");
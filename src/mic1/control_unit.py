@@ -21,17 +21,28 @@ class ControlUnit:
 
         self.control_store = ControlStore(self.mpc.out_sig, SignalSender(0), self.clock.signal(0), None)
         
-        # Loader expects file relative to execution or fixed path. 
-        # Using local path assumption for now.
-        loader = CtrlStoreTxtSrcFileLoader("src/mic1/control_store.txt") 
+        # control_store.txt vem do pacote e é interpretado uma vez por processo; todos
+        # os ControlStores referenciam a mesma imagem (copiada só se alguém escrever nela)
+        loader = CtrlStoreTxtSrcFileLoader()
         try:
-            loader.load(self.control_store)
+            self.control_store.share_image(loader.shared_image(len(self.control_store)))
         except FileNotFoundError:
-            print("WARNING: control_store.txt not found at src/mic1/control_store.txt. Running without microcode.")
+            print(f"WARNING: control_store.txt not found at {loader.source_file_path}. Running without microcode.")
 
         self.mir.set_data_sender(self.control_store.out_sig)
         self.mir.set_control_sender(self.clock.signal(0))
 
+    def signals(self):
+        """Sinais internos da unidade de controle, nomeados (veja Mic1.signals)."""
+        return [
+            ("flags", self._flags.out_sig), ("MPC+1", self._mpc_increment), ("M mux", self._m_mux.out_sig),
+            ("MPC", self.mpc.out_sig), ("control store", self.control_store.out_sig),
+        ]
+
+    def _resync(self):
+        # Veja Mic1.restore
+        self._m_mux._resync()
+
     def reset(self):
         self.clock.reset()
         self.mir.reset()
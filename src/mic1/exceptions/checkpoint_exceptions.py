@@ -0,0 +1,4 @@
+class CheckpointFormatException(Exception):
+    def __init__(self, path, message):
+        super().__init__(f"Invalid checkpoint file {path}: {message}")
+        self.path = path
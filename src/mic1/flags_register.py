@@ -1,5 +1,6 @@
 from src.components.signals import ISignalSender, SingleSignalSender
 from src.utils.bit_utils import BitArray
+from src.components.levelized import Ports
 
 class FlagsRegister:
     def __init__(self, in_n: ISignalSender, in_z: ISignalSender, in_cond: ISignalSender):
@@ -15,8 +16,11 @@ class FlagsRegister:
     @property
     def out_sig(self) -> ISignalSender: return self._out
 
+    def _ports(self) -> Ports:
+        return Ports([self._out], inputs=[self._in_n, self._in_z, self._in_cond],
+                     evaluate=lambda: self._update(None, None))
+
     def _update(self, sender, _):
-        self._out.disable()
         condition = self._in_cond.signal().to_int32()
         
         should_enable = False
@@ -26,6 +30,7 @@ class FlagsRegister:
             should_enable = self._in_z.signal().has_all_set()
         elif condition == 3:
             should_enable = True
-        
-        if should_enable:
-            self._out.enable()
\ No newline at end of file
+
+        # Calcula antes de escrever: desabilitar e reabilitar a saída geraria
+        # dois eventos (um glitch) a cada atualização.
+        self._out.set_enable(should_enable)
\ No newline at end of file
@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional, Tuple
+from src.mic1.assembler_v2 import AssemblerV2
+
+WORD_MASK = 0xFFFF
+ADDRESS_MASK = 0x0FFF
+SIGN_BIT = 0x8000
+MEMORY_SIZE = 4096
+
+# Índices das instruções na ordem de AssemblerV2.INSTRUCTION_SET
+(LODD, STOD, ADDD, SUBD, JPOS, JZER, JUMP, LOCO,
+ LODL, STOL, ADDL, SUBL, JNEG, JNZE, CALL,
+ PSHI, POPI, PUSH, POP, RETN, SWAP, INSP, DESP) = range(23)
+
+MNEMONICS = list(AssemblerV2.INSTRUCTION_SET)
+
+_decode_table: Optional[List[Tuple[int, int, int]]] = None
+
+def decode_table() -> List[Tuple[int, int, int]]:
+    """
+    Tabela com as 65536 palavras de instrução decodificadas, montada (uma vez)
+    a partir de AssemblerV2.INSTRUCTION_SET. Cada entrada é
+    (instrução, operando, TIR): o operando já vem mascarado como o
+    microprograma o usa (12 bits de endereço, ou 8 bits para INSP/DESP) e TIR
+    é o valor que o registrador fica depois dos deslocamentos da decodificação.
+    """
+    global _decode_table
+    if _decode_table is None:
+        by_prefix: Dict[Tuple[int, int], int] = {}
+        for index, code in enumerate(AssemblerV2.INSTRUCTION_SET.values()):
+            by_prefix[(len(code), int(code, 2))] = index
+
+        table = []
+        for word in range(1 << 16):
+            instruction = by_prefix.get((4, word >> 12))
+            if instruction is None:
+                instruction = by_prefix[(7, word >> 9)]
+            if instruction <= JNZE:
+                operand, shifts = word & ADDRESS_MASK, 3
+            elif instruction == CALL:
+                operand, shifts = word & ADDRESS_MASK, 4
+            else:
+                operand, shifts = word & 0xFF, 6
+            table.append((instruction, operand, (word << shifts) & WORD_MASK))
+        _decode_table = table
+    return _decode_table
+
+class IsaInterpreter:
+    """
+    Executa programas MAC-1 instrução a instrução, direto sobre inteiros,
+    sem simular o datapath: cada instrução produz o mesmo estado que o Mic1
+    tem depois de um step_macro com o microprograma de control_store.txt.
+
+    Isso inclui os detalhes desse microprograma que vão além do ISA: TIR e A
+    ficam com os valores intermediários da decodificação, MBR_RD guarda a
+    última leitura e, como PSHI e POPI escrevem sem carregar o MBR_WR, eles
+    gravam o último valor que passou por ele.
+    """
+
+    REGISTER_NAMES = ("PC", "AC", "SP", "IR", "TIR", "A", "MBR_RD", "MBR_WR")
+
+    def __init__(self, memory: Optional[List[int]] = None):
+        self.memory = [0] * MEMORY_SIZE
+        if memory is not None:
+            self.memory[:len(memory)] = [word & WORD_MASK for word in memory]
+        self.pc = 0
+        self.ac = 0
+        self.sp = 4096
+        self.ir = 0
+        self.tir = 0
+        self.a = 0
+        self.mbr_rd = 0
+        self.mbr_wr = 0
+        self.instructions = 0
+        self._decode = decode_table()
+
+    @classmethod
+    def from_mic1(cls, mic1) -> 'IsaInterpreter':
+        """Copia os registradores e a memória de um Mic1 parado no início de uma instrução."""
+        interpreter = cls(mic1.mp.dump_words(0, MEMORY_SIZE))
+        registers = {r.name: r.out_sig.signal().to_int32() for r in mic1.registers}
+        interpreter.pc = registers["PC"]
+        interpreter.ac = registers["AC"]
+        interpreter.sp = registers["SP"]
+        interpreter.ir = registers["IR"]
+        interpreter.tir = registers["TIR"]
+        interpreter.a = registers["A"]
+        interpreter.mbr_rd = mic1.mbr_rd.out_sig.signal().to_int32()
+        interpreter.mbr_wr = mic1.mbr_wr.out_sig.signal().to_int32()
+        return interpreter
+
+    def registers(self) -> Dict[str, int]:
+        return dict(zip(self.REGISTER_NAMES, (
+            self.pc, self.ac, self.sp, self.ir, self.tir, self.a, self.mbr_rd, self.mbr_wr)))
+
+    def step(self):
+        self.run(1)
+
+    def run(self, max_instructions: int) -> int:
+        """Executa até max_instructions instruções; devolve quantas executou."""
+        memory = self.memory
+        decode = self._decode
+        pc, ac, sp = self.pc, self.ac, self.sp
+        ir, tir, a = self.ir, self.tir, self.a
+        mbr_rd, mbr_wr = self.mbr_rd, self.mbr_wr
+
+        for _ in range(max_instructions):
+            ir = mbr_rd = memory[pc & ADDRESS_MASK]
+            pc = (pc + 1) & WORD_MASK
+            instruction, operand, tir = decode[ir]
+
+            if instruction == LODD:
+                ac = mbr_rd = memory[operand]
+            elif instruction == STOD:
+                memory[operand] = mbr_wr = ac
+            elif instruction == ADDD:
+                mbr_rd = memory[operand]
+                ac = (ac + mbr_rd) & WORD_MASK
+            elif instruction == SUBD:
+                mbr_rd = memory[operand]
+                a = ~mbr_rd & WORD_MASK
+                ac = (ac + 1 + a) & WORD_MASK
+            elif instruction == JPOS:
+                if not ac & SIGN_BIT: pc = operand
+            elif instruction == JZER:
+                if ac == 0: pc = operand
+            elif instruction == JUMP:
+                pc = operand
+            elif instruction == LOCO:
+                ac = operand
+            elif instruction == LODL:
+                a = (sp + ir) & WORD_MASK
+                ac = mbr_rd = memory[a & ADDRESS_MASK]
+            elif instruction == STOL:
+                a = (sp + ir) & WORD_MASK
+                memory[a & ADDRESS_MASK] = mbr_wr = ac
+            elif instruction == ADDL:
+                a = (sp + ir) & WORD_MASK
+                mbr_rd = memory[a & ADDRESS_MASK]
+                ac = (ac + mbr_rd) & WORD_MASK
+            elif instruction == SUBL:
+                mbr_rd = memory[(sp + ir) & ADDRESS_MASK]
+                a = ~mbr_rd & WORD_MASK
+                ac = (ac + 1 + a) & WORD_MASK
+            elif instruction == JNEG:
+                if ac & SIGN_BIT: pc = operand
+            elif instruction == JNZE:
+                if ac != 0: pc = operand
+            elif instruction == CALL:
+                sp = (sp - 1) & WORD_MASK
+                memory[sp & ADDRESS_MASK] = mbr_wr = pc
+                pc = operand
+            elif instruction == PSHI:
+                mbr_rd = memory[ac & ADDRESS_MASK]
+                sp = (sp - 1) & WORD_MASK
+                memory[sp & ADDRESS_MASK] = mbr_wr
+            elif instruction == POPI:
+                mbr_rd = memory[sp & ADDRESS_MASK]
+                sp = (sp + 1) & WORD_MASK
+                memory[ac & ADDRESS_MASK] = mbr_wr
+            elif instruction == PUSH:
+                sp = (sp - 1) & WORD_MASK
+                memory[sp & ADDRESS_MASK] = mbr_wr = ac
+            elif instruction == POP:
+                ac = mbr_rd = memory[sp & ADDRESS_MASK]
+                sp = (sp + 1) & WORD_MASK
+            elif instruction == RETN:
+                pc = mbr_rd = memory[sp & ADDRESS_MASK]
+                sp = (sp + 1) & WORD_MASK
+            elif instruction == SWAP:
+                a = ac
+                ac, sp = sp, a
+            elif instruction == INSP:
+                a = operand
+                sp = (sp + a) & WORD_MASK
+            else: # DESP
+                a = -operand & WORD_MASK
+                sp = (sp + a) & WORD_MASK
+
+        self.pc, self.ac, self.sp = pc, ac, sp
+        self.ir, self.tir, self.a = ir, tir, a
+        self.mbr_rd, self.mbr_wr = mbr_rd, mbr_wr
+        self.instructions += max_instructions
+        return max_instructions
@@ -1,20 +1,67 @@
+from collections import namedtuple
+from typing import Dict, Tuple
 from src.components.register import Register
 from src.components.processed_signals import ProcessedSignalSender
+from src.utils.bit_utils import BitArray, SignalValue
+
+# (campo, bit menos significativo, largura) de cada campo da microinstrução,
+# do MSB para o LSB. O MIRegister expõe cada um como out_<campo>.
+FIELDS = (
+    ("a_mux", 31, 1), ("cond", 29, 2), ("alu", 27, 2), ("shifter", 25, 2),
+    ("mbr", 24, 1), ("mar", 23, 1), ("rd", 22, 1), ("wr", 21, 1), ("enc", 20, 1),
+    ("c", 16, 4), ("b", 12, 4), ("a", 8, 4), ("addr", 0, 8),
+)
+
+MicroInstruction = namedtuple("MicroInstruction", [name for name, _, _ in FIELDS])
+
+def decode_microinstruction(word: int) -> MicroInstruction:
+    """Separa uma palavra de 32 bits do control store nos seus campos, como ints."""
+    return MicroInstruction(*[(word >> offset) & ((1 << length) - 1) for _, offset, length in FIELDS])
+
+# Palavras já decodificadas: os campos como ints e como valores de sinal. Com
+# um control store fixo há no máximo uma entrada por endereço (256); se
+# microcódigo automodificável gerar palavras demais, o cache recomeça.
+DECODE_CACHE_LIMIT = 4096
+_decoded: Dict[int, Tuple[MicroInstruction, Tuple[SignalValue, ...]]] = {}
+
+def _decode_cached(word: int) -> Tuple[MicroInstruction, Tuple[SignalValue, ...]]:
+    entry = _decoded.get(word)
+    if entry is None:
+        if len(_decoded) >= DECODE_CACHE_LIMIT:
+            _decoded.clear()
+        fields = decode_microinstruction(word)
+        entry = _decoded[word] = (fields, tuple(
+            SignalValue.of(value, length) for value, (_, _, length) in zip(fields, FIELDS)))
+    return entry
 
 class MIRegister(Register):
+    """
+    Registrador da microinstrução. Cada palavra carregada é decodificada uma
+    vez (e memorizada entre todos os MIRegisters) em `decoded`, com os campos
+    como ints; as saídas out_<campo> leem os valores prontos desse cache e
+    continuam sinais comuns, com signal_changed só quando o campo muda.
+    """
     def __init__(self):
         super().__init__(32)
-        
-        self.out_a_mux    = ProcessedSignalSender.interval(self.out_sig, 31, 1)
-        self.out_cond     = ProcessedSignalSender.interval(self.out_sig, 29, 2)
-        self.out_alu      = ProcessedSignalSender.interval(self.out_sig, 27, 2)
-        self.out_shifter  = ProcessedSignalSender.interval(self.out_sig, 25, 2)
-        self.out_mbr      = ProcessedSignalSender.interval(self.out_sig, 24, 1)
-        self.out_mar      = ProcessedSignalSender.interval(self.out_sig, 23, 1)
-        self.out_rd       = ProcessedSignalSender.interval(self.out_sig, 22, 1)
-        self.out_wr       = ProcessedSignalSender.interval(self.out_sig, 21, 1)
-        self.out_enc      = ProcessedSignalSender.interval(self.out_sig, 20, 1)
-        self.out_c        = ProcessedSignalSender.interval(self.out_sig, 16, 4)
-        self.out_b        = ProcessedSignalSender.interval(self.out_sig, 12, 4)
-        self.out_a        = ProcessedSignalSender.interval(self.out_sig, 8, 4)
-        self.out_addr     = ProcessedSignalSender.interval(self.out_sig, 0, 8)
\ No newline at end of file
+        self._last_word = None
+        self._last_entry = None
+
+        for index, (name, _, _) in enumerate(FIELDS):
+            setattr(self, f"out_{name}", ProcessedSignalSender(self.out_sig, self._field_reader(index)))
+
+    @property
+    def decoded(self) -> MicroInstruction:
+        """Os campos da palavra atual, como ints."""
+        return self._entry(self.out_sig.signal())[0]
+
+    def _entry(self, word: BitArray) -> Tuple[MicroInstruction, Tuple[SignalValue, ...]]:
+        # As 13 saídas pedem a mesma palavra logo depois de cada carga
+        if word is not self._last_word:
+            self._last_entry = _decode_cached(word.value)
+            self._last_word = word
+        return self._last_entry
+
+    def _field_reader(self, index: int):
+        def func(word: BitArray) -> SignalValue:
+            return self._entry(word)[1][index]
+        return func
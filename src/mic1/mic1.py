@@ -1,45 +1,65 @@
 from src.components.clock import Clock, ClockDelayedSignalSender
 from src.components.register import Register
+from src.components.register_file import RegisterFile
 from src.components.multiplexer import Multiplexer
 from src.components.latch import Latch
 from src.components.alu import Alu
 from src.components.shifter import Shifter
 from src.components.memory import SlowMemory
-from src.components.signals import ISignalSender, SignalSender
+from src.components.signals import ISignalSender
+from src.components.levelized import LevelizedSchedule
 from src.components.processed_signals import ProcessedSignalSender, CombinationalSignalSender
 from src.mic1.mi_register import MIRegister
 from src.mic1.control_unit import ControlUnit
-from src.utils.bit_utils import BitArray
-from typing import List
+from src.mic1.register_layout import REGISTER_NAMES, INITIAL_REGISTERS, CONSTANT_REGISTERS
+from src.utils.trace import tracer, MICROINSTRUCTION, MACROINSTRUCTION, DEBUG, INFO
+from collections import namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+import asyncio
+import inspect
+
+# Motivos de parada de Mic1.run
+STOP_MAX_CYCLES = "max_cycles"
+STOP_HALT = "halt"
+STOP_UNTIL_PC = "until_pc"
+STOP_UNTIL = "until"
+
+# cycles: trocas de fase do clock; micro_instructions/macro_instructions: quantas terminaram
+RunResult = namedtuple("RunResult", ["reason", "cycles", "micro_instructions", "macro_instructions"])
+
+# Estado completo de um Mic1 (Mic1.snapshot): clock é (fase, ticks, disparo de
+# cada timer); signals, os valores imutáveis de todos os sinais que guardam
+# estado, na ordem de Mic1.signals(); memory/control_store, as páginas das memórias.
+Snapshot = namedtuple("Snapshot", ["clock", "signals", "memory", "control_store"])
+
+# Opcodes de desvio (4 bits): um desvio para o próprio endereço que é tomado nunca sai dali
+_JUMP_OPCODES = frozenset((0b0100, 0b0101, 0b0110, 0b1100, 0b1101))
 
 class Mic1:
-    def __init__(self):
+    EVALUATION_MODES = ("event", "levelized")
+
+    def __init__(self, evaluation: str = "event"):
+        """
+        evaluation: "event" propaga cada mudança pelos callbacks dos sinais
+        (o modelo original); "levelized" compila o datapath em uma ordem
+        estática por fase (LevelizedSchedule) e avalia cada componente uma
+        vez por ciclo. Os dois modos produzem o mesmo estado a cada ciclo.
+        """
+        if evaluation not in self.EVALUATION_MODES:
+            raise ValueError(f"Unknown evaluation mode: {evaluation}")
+        self.evaluation = evaluation
         self.clock = Clock(4)
         self.mir = MIRegister()
         self.mir.set_control_sender(self.clock.signal(0))
         self.resetted = None # Placeholder for event if needed
 
-        self.registers = [
-            Register(16, name="PC"), Register(16, name="AC"), Register(16, name="SP"), Register(16, name="IR"),
-            Register(16, name="TIR"), Register(16, name="ZERO"), Register(16, name="PLUS1"), Register(16, name="MINUS1"),
-            Register(16, name="AMASk"), Register(16, name="SMASK"), Register(16, name="A"), Register(16, name="B"),
-            Register(16, name="C"), Register(16, name="D"), Register(16, name="E"), Register(16, name="F"),
-        ]
-
-        # Init Constants
-        self.registers[2].set_data(BitArray.from_bit_string("0001000000000000"))
-        self.registers[6].set_data(BitArray.from_bit_string("0000000000000001"))
-        self.registers[7].set_data(BitArray.from_bit_string("1111111111111111"))
-        self.registers[8].set_data(BitArray.from_bit_string("0000111111111111"))
-        self.registers[9].set_data(BitArray.from_bit_string("0000000011111111"))
+        self.register_file = RegisterFile(16, REGISTER_NAMES, self.mir.out_a, self.mir.out_b,
+                                          initial=INITIAL_REGISTERS, constants=CONSTANT_REGISTERS)
+        self.registers = self.register_file.registers
 
-        regs_out = [r.out_sig for r in self.registers]
-        self._a = Multiplexer(16, regs_out, self.mir.out_a)
-        self._b = Multiplexer(16, regs_out, self.mir.out_b)
-        self._c = ProcessedSignalSender.decoder4to16(self.mir.out_c)
-
-        self.latch_a = Latch(self._a.out_sig, self.clock.signal(1))
-        self.latch_b = Latch(self._b.out_sig, self.clock.signal(1))
+        self.latch_a = Latch(self.register_file.out_a, self.clock.signal(1))
+        self.latch_b = Latch(self.register_file.out_b, self.clock.signal(1))
 
         self.mbr_rd = Register(16, name="MBR_RD")
         self._a_mux = Multiplexer(16, [self.latch_a.out_sig, self.mbr_rd.out_sig], self.mir.out_a_mux)
@@ -47,48 +67,193 @@ class Mic1:
         self.alu = Alu(self._a_mux.out_sig, self.latch_b.out_sig, self.mir.out_alu)
         self.shifter = Shifter(self.alu.out_sig, self.mir.out_shifter)
 
-        for i in range(len(self.registers)):
-            self.registers[i].set_data_sender(self.shifter.out_sig)
-            
-            # Combinational AND logic: C[i] AND ENC AND Clock(3)
-            c_i = ProcessedSignalSender.interval(self._c, i, 1)
-            ctrl_sig = CombinationalSignalSender.and_op([
-                c_i,
-                self.mir.out_enc,
-                self.clock.signal(3)
-            ])
-            self.registers[i].set_control_sender(ctrl_sig)
-
-        mbr_wr_ctrl = CombinationalSignalSender.and_op([self.mir.out_mbr, self.mir.out_wr, self.clock.signal(3)])
-        self.mbr_wr = Register(16, data_sender=self.shifter.out_sig, control_sender=mbr_wr_ctrl, name="MBR_WR")
+        # Escrita em C quando ENC está alto, na subida da fase 3
+        self.register_file.set_write_port(self.shifter.out_sig, self.mir.out_c, self.mir.out_enc, self.clock.signal(3))
+
+        self._mbr_wr_ctrl = CombinationalSignalSender.and_op([self.mir.out_mbr, self.mir.out_wr, self.clock.signal(3)])
+        self.mbr_wr = Register(16, data_sender=self.shifter.out_sig, control_sender=self._mbr_wr_ctrl, name="MBR_WR")
         
         self.mar = Register(16, data_sender=self.latch_b.out_sig, control_sender=self.clock.signal(2), name="MAR")
 
         # Memory Address Logic: trim 16 bit MAR to 12 bit address for 4096 words
-        mem_addr = ProcessedSignalSender(self.mar.out_sig, lambda data: data.trim_or_pad(12))
+        self._mem_addr = ProcessedSignalSender(self.mar.out_sig, lambda data: data.trim_or_pad(12))
 
         self.mp = SlowMemory(4096, 16, self.clock, 6, 6,
-            mem_addr, self.mbr_wr.out_sig,
+            self._mem_addr, self.mbr_wr.out_sig,
             self.mir.out_rd, self.mir.out_wr, name="MP"
         )
 
         self.mbr_rd.set_data_sender(self.mp.out_sig)
         
         # MBR RD Control: Delayed RD AND Clock(3)
-        delayed_rd = ClockDelayedSignalSender(self.mir.out_rd, self.clock, 0)
-        mbr_rd_ctrl = CombinationalSignalSender.and_op([delayed_rd, self.clock.signal(3)])
-        self.mbr_rd.set_control_sender(mbr_rd_ctrl)
+        self._delayed_rd = ClockDelayedSignalSender(self.mir.out_rd, self.clock, 0)
+        self._mbr_rd_ctrl = CombinationalSignalSender.and_op([self._delayed_rd, self.clock.signal(3)])
+        self.mbr_rd.set_control_sender(self._mbr_rd_ctrl)
 
         self.control_unit = ControlUnit(self.alu.out_n, self.alu.out_z, self.clock, self.mir)
 
+        self._schedule = LevelizedSchedule(self.clock) if evaluation == "levelized" else None
+        self._stored = None
+        self._derived = None
+
+    def signals(self) -> List[Tuple[str, ISignalSender]]:
+        """Todos os sinais do datapath, com um nome legível para relatórios."""
+        named = [(f"clock[{i}]", self.clock.signal(i)) for i in range(4)]
+        named += [(f"MIR.{field}", getattr(self.mir, f"out_{field}")) for field in (
+            "a_mux", "cond", "alu", "shifter", "mbr", "mar", "rd", "wr", "enc", "c", "b", "a", "addr")]
+        named.append(("MIR", self.mir.out_sig))
+        named += [(r.name, r.out_sig) for r in self.registers]
+        named += [
+            ("A bus", self.register_file.out_a), ("B bus", self.register_file.out_b),
+            ("latch A", self.latch_a.out_sig), ("latch B", self.latch_b.out_sig),
+            ("AMUX", self._a_mux.out_sig), ("ALU", self.alu.out_sig), ("N", self.alu.out_n), ("Z", self.alu.out_z),
+            ("shifter", self.shifter.out_sig),
+            ("MBR_WR.ctrl", self._mbr_wr_ctrl), ("MBR_WR", self.mbr_wr.out_sig),
+            ("MAR", self.mar.out_sig), ("MP address", self._mem_addr), ("MP", self.mp.out_sig),
+            ("RD delayed", self._delayed_rd), ("MBR_RD.ctrl", self._mbr_rd_ctrl), ("MBR_RD", self.mbr_rd.out_sig),
+        ]
+        named += self.control_unit.signals()
+        return named
+
+    def signal_statistics(self) -> List[Tuple[str, int, int]]:
+        """(nome, eventos disparados, eventos suprimidos) de cada sinal, na ordem de signals()."""
+        return [(name, sender.events_fired, sender.events_suppressed) for name, sender in self.signals()]
+
+    def reset_signal_statistics(self):
+        for _, sender in self.signals():
+            sender.events_fired = 0
+            sender.events_suppressed = 0
+
+    async def run_async(self, max_cycles: Optional[int] = None, until_pc: Optional[int] = None,
+                        until: Optional[Callable[['Mic1'], bool]] = None, stop_on_halt: bool = True,
+                        yield_every: int = 10000,
+                        progress: Optional[Callable[[RunResult], Union[None, Awaitable[None]]]] = None,
+                        executor: Optional[Executor] = None) -> RunResult:
+        """
+        run() para código asyncio: executa fatias de pelo menos yield_every
+        trocas de fase, cada uma terminando na fronteira de instrução MAC-1
+        seguinte, e devolve o controle ao event loop entre elas. As paradas
+        e o RunResult final são os mesmos de uma chamada a run().
+
+        progress(RunResult) é chamado (e aguardado, se devolver um awaitable)
+        depois de cada fatia, com os totais até ali e reason None enquanto a
+        execução não parou. Cancelar a tarefa deixa a máquina entre duas
+        instruções, como ao fim de uma fatia.
+
+        executor: as fatias rodam nele em vez de no event loop. Em um
+        ThreadPoolExecutor a máquina é usada pela thread (um cancelamento
+        espera a fatia em andamento terminar); em um ProcessPoolExecutor cada
+        fatia parte de um snapshot e o resultado é restaurado aqui, então
+        `until` precisa ser serializável (pickle) e o trace das fatias fica
+        no processo de trabalho.
+        """
+        if yield_every < 1:
+            raise ValueError(f"yield_every must be at least one cycle: {yield_every}")
+        loop = asyncio.get_running_loop()
+        in_process = isinstance(executor, ProcessPoolExecutor)
+        cycles = micro = macro = 0
+        while True:
+            limit = None if max_cycles is None else max_cycles - cycles
+            args = (limit, until_pc, until, stop_on_halt, yield_every)
+            if executor is None:
+                result, stopped = self._run_slice(*args)
+            elif in_process:
+                snapshot, result, stopped = await loop.run_in_executor(
+                    executor, _run_slice_in_process, self.evaluation, self.snapshot(), *args)
+                self.restore(snapshot)
+            else:
+                future = loop.run_in_executor(executor, self._run_slice, *args)
+                try:
+                    result, stopped = await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    await asyncio.wait([future])
+                    raise
+
+            cycles += result.cycles
+            micro += result.micro_instructions
+            macro += result.macro_instructions
+            finished = result.reason != STOP_UNTIL or stopped
+            if progress is not None:
+                reported = progress(RunResult(result.reason if finished else None, cycles, micro, macro))
+                if inspect.isawaitable(reported):
+                    await reported
+            if finished:
+                return RunResult(result.reason, cycles, micro, macro)
+            await asyncio.sleep(0)
+
+    def _run_slice(self, max_cycles: Optional[int], until_pc: Optional[int],
+                   until: Optional[Callable[['Mic1'], bool]], stop_on_halt: bool,
+                   yield_every: int) -> Tuple[RunResult, bool]:
+        # Uma fatia de run_async; o bool diz se quem parou foi o `until` do chamador
+        start = self.clock.ticks
+        stopped = False
+
+        def boundary(mic1: 'Mic1') -> bool:
+            nonlocal stopped
+            if until is not None and until(mic1):
+                stopped = True
+                return True
+            return self.clock.ticks - start >= yield_every
+
+        return self.run(max_cycles, until_pc, boundary, stop_on_halt), stopped
+
+    def snapshot(self) -> Snapshot:
+        """
+        Captura o estado arquitetural e microarquitetural entre duas trocas de
+        fase: registradores, MAR, MBRs, latches, MPC, MIR, a fase do clock e
+        os disparos pendentes (as leituras/escritas em andamento da memória),
+        o conteúdo da memória e do control store.
+
+        Os valores de sinal são imutáveis e entram sem cópia; as memórias
+        entram como páginas (Memory.pages), compartilhadas com os snapshots
+        anteriores enquanto não forem escritas. Um snapshot vale para qualquer
+        Mic1, nos dois modos de avaliação.
+        """
+        if self._stored is None: self._collect_state()
+        return Snapshot(self.clock._state(), tuple(sender.signal() for sender in self._stored),
+                        self.mp.pages(), self.control_unit.control_store.pages())
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Volta ao estado de `snapshot` sem disparar eventos nem trace: a execução
+        segue exatamente como seguiria a da máquina que o capturou. Com
+        memory/control_store None o conteúdo atual daquela memória é mantido
+        (o checkpoint mapeia a imagem da memória em vez de copiá-la).
+        """
+        if self._stored is None: self._collect_state()
+        if len(snapshot.signals) != len(self._stored):
+            raise ValueError(f"Snapshot has {len(snapshot.signals)} signals, machine has {len(self._stored)}")
+        self.clock._load_state(snapshot.clock)
+        for sender, value in zip(self._stored, snapshot.signals):
+            sender._load(value)
+        if snapshot.memory is not None:
+            self.mp.load_pages(snapshot.memory)
+        if snapshot.control_store is not None:
+            self.control_unit.control_store.load_pages(snapshot.control_store)
+        # O resto é derivado: sinais combinacionais, entradas selecionadas e habilitações
+        for component in self._derived:
+            component._resync()
+        if self._schedule is not None:
+            self._schedule.resync()
+
+    def fork(self) -> 'Mic1':
+        """Um Mic1 novo, no mesmo modo de avaliação, a partir do estado atual deste."""
+        clone = Mic1(self.evaluation)
+        clone.restore(self.snapshot())
+        return clone
+
+    def state_layout(self) -> List[Tuple[str, int]]:
+        """(nome, largura) de cada valor em Snapshot.signals, na mesma ordem."""
+        return [(name, sender.signal().length) for name, sender in self.signals() if hasattr(sender, "_load")]
+
+    def _collect_state(self):
+        senders = [sender for _, sender in self.signals()]
+        self._stored = [sender for sender in senders if hasattr(sender, "_load")]
+        self._derived = [sender for sender in senders if hasattr(sender, "_resync")]
+        self._derived += [self._a_mux, self.latch_a, self.latch_b, self.control_unit]
+
     def reset(self):
-        for r in self.registers: r.reset()
-        # Restore constants
-        self.registers[2].set_data(BitArray.from_bit_string("0001000000000000"))
-        self.registers[6].set_data(BitArray.from_bit_string("0000000000000001"))
-        self.registers[7].set_data(BitArray.from_bit_string("1111111111111111"))
-        self.registers[8].set_data(BitArray.from_bit_string("0000111111111111"))
-        self.registers[9].set_data(BitArray.from_bit_string("0000000011111111"))
+        self.register_file.reset()
 
         self.control_unit.reset()
         self.latch_a.reset()
@@ -97,17 +262,101 @@ class Mic1:
         self.mbr_rd.reset()
         self.mbr_wr.reset()
         self.mar.reset()
+        if self._schedule is not None:
+            self._schedule.settle()
 
     def step_cycle(self):
         self.clock.step()
+        if self._schedule is not None:
+            self._schedule.run_phase(self.clock.current_cycle())
+        if (tracer.microinstruction <= DEBUG or tracer.macroinstruction <= INFO) and self.clock.current_cycle() == 0:
+            self._trace_load()
+
+    def _trace_load(self):
+        # Fase 0: a MIR acabou de receber a palavra do MPC; com MPC 0 começa uma instrução MAC-1
+        mpc = self.control_unit.mpc.out_sig.signal().value
+        if tracer.microinstruction <= DEBUG:
+            tracer.emit(MICROINSTRUCTION, DEBUG, "MIR", mpc, self.mir.out_sig.signal().value, 32)
+        if tracer.macroinstruction <= INFO and mpc == 0:
+            pc = self.registers[0].out_sig.signal().value
+            tracer.emit(MACROINSTRUCTION, INFO, "PC", pc, self.mp.cell(pc & 0x0FFF).value, 16)
 
     def step_micro(self):
         if self.clock.current_cycle() < 0: self.step_cycle()
         self.step_cycle()
         while self.clock.current_cycle() > 0:
-            self.clock.step()
+            self.step_cycle()
 
     def step_macro(self):
         self.step_micro()
         while self.control_unit.mpc.out_sig.signal().has_any_set():
-            self.step_micro()
\ No newline at end of file
+            self.step_micro()
+
+    def run(self, max_cycles: Optional[int] = None, until_pc: Optional[int] = None,
+            until: Optional[Callable[['Mic1'], bool]] = None, stop_on_halt: bool = True) -> RunResult:
+        """
+        Avança o clock até uma condição de parada e devolve um RunResult com
+        o motivo (STOP_*), os ciclos e as micro/macroinstruções completadas.
+
+        max_cycles limita as trocas de fase (a parada pode cair no meio de
+        uma microinstrução). As demais condições são conferidas ao fim de cada
+        instrução MAC-1 (MPC de volta a 0), nesta ordem: stop_on_halt para em
+        um desvio tomado para o próprio endereço (HALT: JUMP HALT, ou um
+        JZER/JPOS/JNEG/JNZE que não sai do lugar); until_pc para quando o PC
+        da próxima instrução é until_pc; until(mic1) para quando devolve True.
+        """
+        clock = self.clock
+        schedule = self._schedule
+        mpc = self.control_unit.mpc.out_sig
+        pc = self.registers[0].out_sig
+        ir = self.registers[3].out_sig
+        limit = -1 if max_cycles is None else max_cycles
+
+        phase = clock.current_cycle()
+        instruction_pc = pc.signal().to_int32()
+        cycles = micro = macro = 0
+        while True:
+            if cycles == limit:
+                reason = STOP_MAX_CYCLES
+                break
+            clock.step()
+            cycles += 1
+            if phase != 3:
+                phase += 1
+                if schedule is not None: schedule.run_phase(phase)
+                if phase == 0 and (tracer.microinstruction <= DEBUG or tracer.macroinstruction <= INFO): self._trace_load()
+                continue
+            phase = 0
+            if schedule is not None: schedule.run_phase(0)
+            if tracer.microinstruction <= DEBUG or tracer.macroinstruction <= INFO: self._trace_load()
+            micro += 1
+            if mpc.signal().has_any_set():
+                continue
+
+            macro += 1
+            current_pc = pc.signal().to_int32()
+            if stop_on_halt:
+                word = ir.signal().to_int32()
+                if word >> 12 in _JUMP_OPCODES and word & 0x0FFF == current_pc == instruction_pc:
+                    reason = STOP_HALT
+                    break
+            if current_pc == until_pc:
+                reason = STOP_UNTIL_PC
+                break
+            if until is not None and until(self):
+                reason = STOP_UNTIL
+                break
+            instruction_pc = current_pc
+
+        return RunResult(reason, cycles, micro, macro)
+
+# Uma máquina por modo de avaliação em cada processo de trabalho de run_async
+_slice_machines: Dict[str, Mic1] = {}
+
+def _run_slice_in_process(evaluation: str, snapshot: Snapshot, *args) -> Tuple[Snapshot, RunResult, bool]:
+    mic1 = _slice_machines.get(evaluation)
+    if mic1 is None:
+        mic1 = _slice_machines[evaluation] = Mic1(evaluation)
+    mic1.restore(snapshot)
+    result, stopped = mic1._run_slice(*args)
+    return mic1.snapshot(), result, stopped
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional, Sequence
+from src.components.alu import alu_kernel
+from src.components.shifter import shift_kernel
+from src.mic1.mi_register import MicroInstruction, decode_microinstruction
+from src.mic1.register_layout import REGISTER_NAMES, CONSTANT_INDICES, initial_registers
+
+WORD_MASK = 0xFFFF
+ADDRESS_MASK = 0x0FFF
+MEMORY_SIZE = 4096
+CONTROL_STORE_SIZE = 256
+
+class MicroEngine:
+    """
+    Executa o microprograma direto sobre inteiros. As 256 palavras do control
+    store são decodificadas uma vez (decode_microinstruction) e o laço do
+    microsequenciador (MPC, M-mux, flags N/Z) roda sem sinais nem eventos.
+
+    A semântica é a do Mic1 fase a fase: latches na fase 1, MAR na fase 2,
+    escritas nos registradores, MBR_WR, MBR_RD e MPC na fase 3 (nessa ordem,
+    então o MPC vê flags calculadas com o MBR_RD novo) e a MIR na fase 0. A
+    SlowMemory é reproduzida pelos mesmos contadores, avançados a cada troca
+    de fase, então step_micro/step_macro contam exatamente os mesmos passos.
+    """
+
+    def __init__(self, control_store: Sequence[int], memory: Optional[Sequence[int]] = None,
+                 delay_rd: int = 6, delay_wr: int = 6):
+        self.delay_rd = delay_rd
+        self.delay_wr = delay_wr
+        self.load_control_store(control_store)
+        self.memory = [0] * MEMORY_SIZE
+        if memory is not None:
+            self.memory[:len(memory)] = [word & WORD_MASK for word in memory]
+
+        self.registers = initial_registers()
+        self.mar = 0
+        self.mbr_rd = 0
+        self.mbr_wr = 0
+        self.mpc = 0
+        self.mir = 0
+        self.latch_a = 0
+        self.latch_b = 0
+        self.memory_out = 0
+        self.counter_rd = delay_rd + 1
+        self.counter_wr = delay_wr + 1
+        self.started = False # o clock do Mic1 começa antes da fase 0
+        self.micro_steps = 0
+
+    def load_control_store(self, words: Sequence[int]):
+        self.control_store = [word & 0xFFFFFFFF for word in words] + [0] * (CONTROL_STORE_SIZE - len(words))
+        self.decoded: List[MicroInstruction] = [decode_microinstruction(word) for word in self.control_store]
+
+    @classmethod
+    def from_mic1(cls, mic1) -> 'MicroEngine':
+        """Copia o estado de um Mic1 parado entre microinstruções (fase 0, ou antes do primeiro passo)."""
+        phase = mic1.clock.current_cycle()
+        if phase > 0:
+            raise ValueError(f"Mic1 must be stopped between microinstructions (clock phase {phase})")
+        control_store = mic1.control_unit.control_store
+        engine = cls(
+            control_store.dump_words(0, CONTROL_STORE_SIZE),
+            mic1.mp.dump_words(0, MEMORY_SIZE),
+            mic1.mp._delay_rd, mic1.mp._delay_wr,
+        )
+        engine.registers = [r.out_sig.signal().value for r in mic1.registers]
+        engine.mar = mic1.mar.out_sig.signal().value
+        engine.mbr_rd = mic1.mbr_rd.out_sig.signal().value
+        engine.mbr_wr = mic1.mbr_wr.out_sig.signal().value
+        engine.mpc = mic1.control_unit.mpc.out_sig.signal().value
+        engine.mir = mic1.mir.out_sig.signal().value
+        engine.latch_a = mic1.latch_a.out_sig.signal().value
+        engine.latch_b = mic1.latch_b.out_sig.signal().value
+        engine.memory_out = mic1.mp.out_sig.signal().value
+        engine.counter_rd = mic1.mp.counter_rd
+        engine.counter_wr = mic1.mp.counter_wr
+        engine.started = phase == 0
+        return engine
+
+    def named_registers(self) -> Dict[str, int]:
+        return dict(zip(REGISTER_NAMES, self.registers))
+
+    def step_micro(self):
+        self.run_micro(1)
+
+    def step_macro(self) -> int:
+        """Executa uma instrução MAC-1 (até o MPC voltar a 0); devolve quantos passos micro levou."""
+        return self.run_micro(-1)
+
+    def _start(self):
+        # Primeira fase 0: a MIR (zerada) recebe a palavra apontada pelo MPC
+        if self.started: return
+        self.started = True
+        self.mir = self.control_store[self.mpc]
+        mi = self.decoded[self.mpc]
+        if mi.rd and self.counter_rd >= self.delay_rd: self.counter_rd = 0
+        if mi.wr and self.counter_wr >= self.delay_wr: self.counter_wr = 0
+
+    def run_micro(self, max_steps: int) -> int:
+        """
+        Executa max_steps microinstruções (ou, com max_steps < 0, até o MPC
+        voltar a 0 depois de pelo menos uma). Devolve quantas executou.
+        """
+        self._start()
+        decoded = self.decoded
+        memory = self.memory
+        registers = self.registers
+        delay_rd, delay_wr = self.delay_rd, self.delay_wr
+        mar, mbr_rd, mbr_wr, mpc = self.mar, self.mbr_rd, self.mbr_wr, self.mpc
+        latch_a, latch_b, memory_out = self.latch_a, self.latch_b, self.memory_out
+        counter_rd, counter_wr = self.counter_rd, self.counter_wr
+        mi = decode_microinstruction(self.mir)
+
+        steps = 0
+        while steps != max_steps:
+            # Cada troca de fase avança os contadores da memória lenta; a
+            # leitura/escrita acontece quando o contador chega ao atraso,
+            # com o MAR daquele momento.
+            for phase in (1, 2, 3, 0):
+                if counter_rd <= delay_rd:
+                    counter_rd += 1
+                    if counter_rd == delay_rd:
+                        memory_out = memory[mar & ADDRESS_MASK]
+                if counter_wr <= delay_wr:
+                    counter_wr += 1
+                    if counter_wr == delay_wr:
+                        memory[mar & ADDRESS_MASK] = mbr_wr
+
+                if phase == 1:
+                    latch_a = registers[mi.a]
+                    latch_b = registers[mi.b]
+                elif phase == 2:
+                    mar = latch_b
+                elif phase == 3:
+                    result = alu_kernel(mi.alu, mbr_rd if mi.a_mux else latch_a, latch_b, WORD_MASK)
+                    shifted = shift_kernel(mi.shifter, result, WORD_MASK)
+                    if mi.enc and mi.c not in CONSTANT_INDICES:
+                        registers[mi.c] = shifted
+                    if mi.mbr and mi.wr:
+                        mbr_wr = shifted
+                    if mi.rd:
+                        mbr_rd = memory_out
+                        if mi.a_mux:
+                            result = alu_kernel(mi.alu, mbr_rd, latch_b, WORD_MASK)
+                    cond = mi.cond
+                    if cond == 3 or (cond == 1 and result & 0x8000) or (cond == 2 and result == 0):
+                        mpc = mi.addr
+                    else:
+                        mpc = (mpc + 1) & 0xFF
+                else:
+                    following = decoded[mpc]
+                    if following.rd != mi.rd:
+                        if not following.rd: counter_rd = delay_rd + 1
+                        elif counter_rd >= delay_rd: counter_rd = 0
+                    if following.wr != mi.wr:
+                        if not following.wr: counter_wr = delay_wr + 1
+                        elif counter_wr >= delay_wr: counter_wr = 0
+                    mi = following
+            steps += 1
+            if max_steps < 0 and mpc == 0:
+                break
+
+        self.mir = self.control_store[mpc]
+        self.mar, self.mbr_rd, self.mbr_wr, self.mpc = mar, mbr_rd, mbr_wr, mpc
+        self.latch_a, self.latch_b, self.memory_out = latch_a, latch_b, memory_out
+        self.counter_rd, self.counter_wr = counter_rd, counter_wr
+        self.micro_steps += steps
+        return steps
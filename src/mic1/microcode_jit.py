@@ -0,0 +1,165 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+from src.mic1.mi_register import MicroInstruction, decode_microinstruction
+from src.mic1.micro_engine import MicroEngine
+from src.mic1.register_layout import CONSTANT_INDICES
+
+# Posições do estado compartilhado pelas rotinas compiladas (uma lista, que
+# é bem mais barata de indexar que atributos de objeto). RD e WR guardam os
+# bits da MIR anterior, para as bordas que disparam a SlowMemory.
+MAR, MBR_RD, MBR_WR, LATCH_A, LATCH_B, MEMORY_OUT, COUNTER_RD, COUNTER_WR, RD, WR = range(10)
+
+_ALU_EXPRESSIONS = ("({a} + b) & 0xFFFF", "{a} & b", "{a}", "~{a} & 0xFFFF")
+_SHIFTER_EXPRESSIONS = ("v", "v >> 1", "(v << 1) & 0xFFFF", "v")
+
+Routine = Callable[[List[int], List[int], List[int]], int]
+
+# Rotinas já compiladas, por (endereço, palavra, atraso de leitura, atraso de
+# escrita): recarregar um control store editado só recompila as palavras que
+# mudaram de conteúdo.
+_routine_cache: Dict[Tuple[int, int, int, int], Tuple[Routine, str]] = {}
+
+def _edge_lines(active: int, flag: int, counter: str, delay: int) -> List[str]:
+    # Fase 0: a MIR nova liga ou desliga RD/WR (SlowMemory._on_*_signal_changed)
+    if active:
+        return [f"if not s[{flag}]:", f"    s[{flag}] = 1", f"    if {counter} >= {delay}: {counter} = 0"]
+    return [f"if s[{flag}]:", f"    s[{flag}] = 0", f"    {counter} = {delay + 1}"]
+
+def _tick_lines(count: int, delay_rd: int, delay_wr: int) -> List[str]:
+    """
+    `count` trocas de fase da SlowMemory, inline. Cada troca soma 1 ao contador
+    ativo (até delay + 1, parado) e a operação acontece na troca em que ele
+    chega ao atraso, então basta ver se isso cai dentro das `count` trocas.
+    """
+    lines = []
+    for counter, delay, action in (
+        ("crd", delay_rd, f"s[{MEMORY_OUT}] = memory[s[{MAR}] & 0x0FFF]"),
+        ("cwr", delay_wr, f"memory[s[{MAR}] & 0x0FFF] = s[{MBR_WR}]"),
+    ):
+        lines += [
+            f"if {counter} <= {delay}:",
+            f"    if {delay - count} <= {counter} < {delay}: {action}",
+            f"    {counter} = {counter} + {count} if {counter} < {delay + 1 - count} else {delay + 1}",
+        ]
+    return lines
+
+def generate_source(address: int, mi: MicroInstruction, delay_rd: int, delay_wr: int) -> str:
+    """
+    Código Python de uma microinstrução, da carga na MIR (fase 0) até o fim da
+    fase 3, com só as operações que a palavra usa. A rotina recebe
+    (registradores, estado, memória) e devolve o próximo MPC.
+    """
+    a_source = f"s[{MBR_RD}]" if mi.a_mux else "a"
+    alu = _ALU_EXPRESSIONS[mi.alu].format(a=a_source)
+    writes_mbr = mi.mbr and mi.wr
+    uses_flags = mi.cond in (1, 2)
+    writes_register = mi.enc and mi.c not in CONSTANT_INDICES
+    uses_result = writes_register or writes_mbr or uses_flags
+    increment = (address + 1) & 0xFF
+
+    body = [f"crd = s[{COUNTER_RD}]", f"cwr = s[{COUNTER_WR}]"]
+    body += _edge_lines(mi.rd, RD, "crd", delay_rd)
+    body += _edge_lines(mi.wr, WR, "cwr", delay_wr)
+    body += _tick_lines(2, delay_rd, delay_wr) # 0->1 e 1->2, com o MAR antigo
+    body.append(f"s[{LATCH_A}] = a = r[{mi.a}]")
+    body.append(f"s[{LATCH_B}] = s[{MAR}] = b = r[{mi.b}]")
+    body += _tick_lines(1, delay_rd, delay_wr) # 2->3, já com o MAR novo
+    if uses_result:
+        body.append(f"v = {alu}")
+    if writes_register or writes_mbr:
+        body.append(f"h = {_SHIFTER_EXPRESSIONS[mi.shifter]}")
+    if writes_register:
+        body.append(f"r[{mi.c}] = h")
+    if writes_mbr:
+        body.append(f"s[{MBR_WR}] = h")
+    if mi.rd:
+        body.append(f"s[{MBR_RD}] = s[{MEMORY_OUT}]")
+        if mi.a_mux and uses_flags:
+            body.append(f"v = {alu}") # o MPC vê as flags com o MBR_RD novo
+    body += _tick_lines(1, delay_rd, delay_wr) # 3->0
+    body.append(f"s[{COUNTER_RD}] = crd")
+    body.append(f"s[{COUNTER_WR}] = cwr")
+    if mi.cond == 0:
+        body.append(f"return {increment}")
+    elif mi.cond == 3:
+        body.append(f"return {mi.addr}")
+    elif mi.cond == 1:
+        body.append(f"return {mi.addr} if v & 0x8000 else {increment}")
+    else:
+        body.append(f"return {mi.addr} if v == 0 else {increment}")
+    return f"def micro_{address}(r, s, memory):\n" + "".join(f"    {line}\n" for line in body)
+
+def compile_routine(address: int, word: int, delay_rd: int, delay_wr: int) -> Tuple[Routine, str]:
+    key = (address, word, delay_rd, delay_wr)
+    cached = _routine_cache.get(key)
+    if cached is None:
+        source = generate_source(address, decode_microinstruction(word), delay_rd, delay_wr)
+        namespace = {}
+        exec(compile(source, f"<microcode {address}: {word:032b}>", "exec"), namespace)
+        cached = _routine_cache[key] = (namespace[f"micro_{address}"], source)
+    return cached
+
+class MicrocodeJit(MicroEngine):
+    """
+    MicroEngine que compila cada endereço do control store em uma função
+    Python especializada: o shifter só aparece quando algum destino usa a
+    saída dele, o barramento C só com ENC, as flags só em desvios
+    condicionais, e o MPC+1 já vem calculado. O resultado é o mesmo do
+    MicroEngine, passo micro a passo.
+
+    As rotinas ficam em um cache do módulo indexado pelo conteúdo de cada
+    palavra, então load_control_store com um control_store.txt editado só
+    recompila as palavras alteradas (veja compiled/reused).
+    """
+
+    def load_control_store(self, words: Sequence[int]):
+        super().load_control_store(words)
+        self.compiled = 0
+        self.reused = 0
+        self.routines: List[Routine] = []
+        for address, word in enumerate(self.control_store):
+            known = (address, word, self.delay_rd, self.delay_wr) in _routine_cache
+            self.routines.append(compile_routine(address, word, self.delay_rd, self.delay_wr)[0])
+            if known: self.reused += 1
+            else: self.compiled += 1
+
+    def source(self, address: int) -> str:
+        """Código gerado para o endereço (para inspeção)."""
+        return compile_routine(address, self.control_store[address], self.delay_rd, self.delay_wr)[1]
+
+    def run_micro(self, max_steps: int) -> int:
+        self._start()
+        routines = self.routines
+        registers = self.registers
+        memory = self.memory
+        current = decode_microinstruction(self.mir)
+        s = [self.mar, self.mbr_rd, self.mbr_wr, self.latch_a, self.latch_b,
+             self.memory_out, self.counter_rd, self.counter_wr, current.rd, current.wr]
+        mpc = self.mpc
+
+        steps = 0
+        if max_steps < 0:
+            mpc = routines[mpc](registers, s, memory)
+            steps = 1
+            while mpc != 0:
+                mpc = routines[mpc](registers, s, memory)
+                steps += 1
+        else:
+            for _ in range(max_steps):
+                mpc = routines[mpc](registers, s, memory)
+            steps = max_steps
+
+        (self.mar, self.mbr_rd, self.mbr_wr, self.latch_a, self.latch_b,
+         self.memory_out, self.counter_rd, self.counter_wr) = s[:8]
+        self.mpc = mpc
+        self.mir = self.control_store[mpc]
+        # A rotina faz as bordas de RD/WR da própria palavra ao começar; entre
+        # chamadas a MIR já está carregada, então elas são aplicadas aqui.
+        following = self.decoded[mpc]
+        if following.rd != s[RD]:
+            if not following.rd: self.counter_rd = self.delay_rd + 1
+            elif self.counter_rd >= self.delay_rd: self.counter_rd = 0
+        if following.wr != s[WR]:
+            if not following.wr: self.counter_wr = self.delay_wr + 1
+            elif self.counter_wr >= self.delay_wr: self.counter_wr = 0
+        self.micro_steps += steps
+        return steps
@@ -0,0 +1,50 @@
+"""Programas MAC-1 de exemplo, usados pelos testes e pelos benchmarks."""
+
+# x * y por somas sucessivas: o programa do teste de integração, com as
+# variáveis declaradas como variáveis ("x = 0") para que os STOD gravem fora
+# da área de código. As palavras 0 e 2 são LOCO x e LOCO y; final fica no 21.
+MULTIPLICATION = """
+LOCO 5
+STOD x
+LOCO 4
+STOD y
+LOCO 0
+STOD res
+
+LOOP: LODD x
+JZER END
+SUBD c1
+STOD x
+LODD res
+ADDD y
+STOD res
+JUMP LOOP
+
+END: LODD res
+STOD final
+HALT: JUMP HALT
+
+x = 0
+y = 0
+res = 0
+final = 0
+c1 = 1
+"""
+
+# Conta x de 3 até 0, empilhando cada valor (LOOP no endereço 2, END no 8,
+# HALT no 9, x no 10); usado nos testes de execução, histórico e lote.
+COUNTDOWN = """
+LOCO 3
+STOD x
+LOOP: LODD x
+JZER END
+SUBD c1
+STOD x
+PUSH
+JUMP LOOP
+END: LODD x
+HALT: JUMP HALT
+
+x = 0
+c1 = 1
+"""
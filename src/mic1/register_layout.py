@@ -0,0 +1,20 @@
+"""
+Os 16 registradores do Mic1 (na ordem dos campos A, B e C da microinstrução),
+usados pelo Mic1 e pelos engines que o reproduzem sobre inteiros.
+"""
+from typing import List
+
+REGISTER_NAMES = ("PC", "AC", "SP", "IR", "TIR", "ZERO", "PLUS1", "MINUS1",
+                  "AMASk", "SMASK", "A", "B", "C", "D", "E", "F")
+# SP começa no topo da memória; os demais graváveis começam em zero
+INITIAL_REGISTERS = {2: 0b0001000000000000}
+# ZERO, PLUS1, MINUS1, AMASK e SMASK: somente leitura, com valor fixo
+CONSTANT_REGISTERS = {5: 0, 6: 1, 7: 0xFFFF, 8: 0b0000111111111111, 9: 0b0000000011111111}
+CONSTANT_INDICES = frozenset(CONSTANT_REGISTERS)
+
+def initial_registers() -> List[int]:
+    """Os 16 registradores do Mic1 logo depois de construído (SP e as constantes)."""
+    registers = [0] * len(REGISTER_NAMES)
+    for index, value in {**INITIAL_REGISTERS, **CONSTANT_REGISTERS}.items():
+        registers[index] = value
+    return registers
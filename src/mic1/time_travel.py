@@ -0,0 +1,316 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.components.memory import Memory
+from src.components.register import Register
+from src.components.register_file import FileRegister
+from src.mic1.mic1 import Mic1, RunResult, Snapshot
+
+# Uma escrita registrada: address é a célula, ou None para registradores
+Change = namedtuple("Change", ["cycle", "source", "address", "value"])
+
+class _Track:
+    """
+    Escritas de uma fonte em colunas compactas, em ordem de ciclo. Na
+    memória, `index` guarda para cada célula as posições das suas escritas
+    nas colunas, contadas desde o início do log (`dropped` é quantas já
+    saíram pela frente), para achar a última escrita de uma célula por bisect.
+    """
+    __slots__ = ("source", "cycles", "addresses", "values", "base", "current", "index", "dropped")
+
+    def __init__(self, source: str, base: int, memory: bool = False):
+        self.source = source
+        self.cycles = array("q")
+        self.addresses = array("l") if memory else None
+        self.values = array("Q")
+        # Valor no keyframe mais antigo (registradores) e o último valor visto
+        self.base = base
+        self.current = base
+        self.index: Optional[Dict[int, array]] = {} if memory else None
+        self.dropped = 0
+
+    def append(self, cycle: int, address: Optional[int], value: int):
+        if self.addresses is not None:
+            positions = self.index.get(address)
+            if positions is None:
+                positions = self.index[address] = array("q")
+            positions.append(self.dropped + len(self.cycles))
+            self.addresses.append(address)
+        self.cycles.append(cycle)
+        self.values.append(value)
+        self.current = value
+
+    def last_write(self, address: int, cycle: int) -> Optional[int]:
+        """Posição nas colunas da última escrita na célula até o ciclo, ou None."""
+        positions = self.index.get(address)
+        if not positions: return None
+        k = bisect_left(positions, self.dropped + bisect_right(self.cycles, cycle))
+        return positions[k - 1] - self.dropped if k else None
+
+    def drop_after(self, cycle: int):
+        keep = bisect_right(self.cycles, cycle)
+        if self.addresses is not None:
+            limit = self.dropped + keep
+            for address in set(self.addresses[keep:]):
+                positions = self.index[address]
+                del positions[bisect_left(positions, limit):]
+            del self.addresses[keep:]
+        del self.cycles[keep:]
+        del self.values[keep:]
+        self.current = self.values[-1] if self.values else self.base
+
+    def drop_until(self, cycle: int):
+        drop = bisect_right(self.cycles, cycle)
+        if drop and self.addresses is None:
+            self.base = self.values[drop - 1]
+        if self.addresses is not None:
+            limit = self.dropped + drop
+            for address in set(self.addresses[:drop]):
+                positions = self.index[address]
+                del positions[:bisect_left(positions, limit)]
+                if not positions:
+                    del self.index[address]
+            del self.addresses[:drop]
+            self.dropped = limit
+        del self.cycles[:drop]
+        del self.values[:drop]
+
+class TimeTravel:
+    """
+    Execução reversível de um Mic1. Avance a máquina pelos métodos desta
+    classe (step_cycle/step_micro/step_macro/run); para voltar, use
+    step_back_micro, step_back_macro ou seek(ciclo).
+
+    A cada keyframe_interval ciclos guarda um keyframe (Mic1.snapshot, que
+    divide as páginas de memória não escritas com os anteriores) e, entre
+    eles, um log das escritas nos registradores (só as que mudam o valor) e
+    na memória, ouvido do data_changed de cada registrador (os do RegisterFile
+    e os avulsos, como MAR e MBRs) e de Memory.cell_changed. Voltar
+    restaura o keyframe mais próximo antes do alvo e reexecuta até ele. O log
+    responde sem reexecutar qual era um valor em um ciclo (value_at) e onde
+    estão as fronteiras de instrução MAC-1 (pelo MPC).
+
+    Ciclos são trocas de fase contadas desde a criação do clock (o primeiro
+    step_cycle leva ao ciclo 1). Com max_keyframes, quando um keyframe novo
+    passa do limite o mais antigo é descartado junto com o log anterior a
+    ele: a história disponível é uma janela de cerca de
+    keyframe_interval * max_keyframes ciclos.
+
+    Escritas feitas fora destes métodos (por exemplo, carregar uma entrada
+    na memória depois de voltar no tempo) descartam a história posterior ao
+    ciclo atual, que deixa de ser a que a máquina vai executar.
+    """
+
+    def __init__(self, mic1: Mic1, keyframe_interval: int = 1024, max_keyframes: Optional[int] = 64):
+        if keyframe_interval < 1:
+            raise ValueError(f"Keyframe interval must be at least one cycle: {keyframe_interval}")
+        if max_keyframes is not None and max_keyframes < 1:
+            raise ValueError(f"At least one keyframe must be kept: {max_keyframes}")
+        self._mic1 = mic1
+        self.keyframe_interval = keyframe_interval
+        self.max_keyframes = max_keyframes
+        self._keyframe_cycles: List[int] = []
+        self._keyframes: List[Snapshot] = []
+        self._stepping = False
+        self._keyframe_due = False
+
+        self._registers: List[Tuple[Union[FileRegister, Register], str]] = [(r, r.name) for r in mic1.registers] + [
+            (mic1.mar, "MAR"), (mic1.mbr_rd, "MBR_RD"), (mic1.mbr_wr, "MBR_WR"),
+            (mic1.control_unit.mpc, "MPC"), (mic1.mir, "MIR"),
+        ]
+        self._tracks: Dict[str, _Track] = {}
+        self._by_register: Dict[int, _Track] = {}
+        for register, name in self._registers:
+            track = _Track(name, register.out_sig.signal().value)
+            self._tracks[name] = track
+            self._by_register[id(register)] = track
+            register.data_changed += self._on_register_write
+        self._memory_track = self._tracks[mic1.mp.name] = _Track(mic1.mp.name, 0, memory=True)
+        mic1.mp.cell_changed += self._on_memory_write
+
+        self._end = self.cycle
+        self._take_keyframe()
+
+    @property
+    def mic1(self) -> Mic1:
+        return self._mic1
+
+    @property
+    def cycle(self) -> int:
+        clock = self._mic1.clock
+        return clock.ticks + (clock.current_cycle() >= 0)
+
+    @property
+    def oldest(self) -> int:
+        """Primeiro ciclo ainda alcançável (o keyframe mais antigo)."""
+        self._flush()
+        return self._keyframe_cycles[0]
+
+    @property
+    def newest(self) -> int:
+        """Último ciclo já executado; ciclos até ele são refeitos sem registrar de novo."""
+        return self._end
+
+    @property
+    def keyframe_count(self) -> int:
+        return len(self._keyframes)
+
+    def detach(self):
+        for register, _ in self._registers:
+            register.data_changed -= self._on_register_write
+        self._mic1.mp.cell_changed -= self._on_memory_write
+
+    # ------------------------------------------------------------------ avanço
+
+    def step_cycle(self):
+        with self._advancing():
+            self._mic1.step_cycle()
+
+    def step_micro(self):
+        with self._advancing():
+            self._mic1.step_micro()
+
+    def step_macro(self):
+        with self._advancing():
+            self._mic1.step_macro()
+
+    def run(self, max_cycles: Optional[int] = None, until_pc: Optional[int] = None,
+            until: Optional[Callable[[Mic1], bool]] = None, stop_on_halt: bool = True) -> RunResult:
+        """Mic1.run, com keyframes nas fronteiras de instrução (a cada keyframe_interval ciclos ou mais)."""
+        def boundary(mic1: Mic1) -> bool:
+            self._maybe_keyframe()
+            return until is not None and until(mic1)
+
+        with self._advancing():
+            return self._mic1.run(max_cycles, until_pc, boundary, stop_on_halt)
+
+    # ------------------------------------------------------------------ volta
+
+    def seek(self, cycle: int):
+        """Leva a máquina ao estado que tinha (ou terá) depois de `cycle` trocas de fase."""
+        self._flush()
+        if cycle < self._keyframe_cycles[0]:
+            raise ValueError(f"Cycle {cycle} is before the oldest kept keyframe ({self._keyframe_cycles[0]})")
+        with self._advancing(keyframes=False):
+            if cycle < self.cycle:
+                # As células que o restore muda disparam cell_changed; como a
+                # história até _end já está registrada, não contam como escritas
+                index = bisect_right(self._keyframe_cycles, cycle) - 1
+                self._mic1.restore(self._keyframes[index])
+            for _ in range(cycle - self.cycle):
+                self._mic1.step_cycle()
+                self._maybe_keyframe()
+
+    def step_back_micro(self):
+        """Volta ao início da microinstrução anterior (a carga da MIR, fase 0)."""
+        self.seek(self._previous_micro(self.cycle))
+
+    def step_back_macro(self):
+        """Volta ao início da instrução MAC-1 anterior (fase 0 com MPC 0), como o step_macro para."""
+        self._flush()
+        cycle = self._previous_micro(self.cycle)
+        while self.value_at("MPC", cycle) != 0:
+            cycle = self._previous_micro(cycle)
+        self.seek(cycle)
+
+    # ------------------------------------------------------------------ consulta
+
+    def value_at(self, source: str, cycle: int, address: Optional[int] = None) -> int:
+        """
+        Valor de um registrador (pelo nome) ou de uma célula da memória
+        (source = nome da memória e address) depois do ciclo, sem reexecutar.
+        """
+        self._flush()
+        if cycle < self._keyframe_cycles[0]:
+            raise ValueError(f"Cycle {cycle} is before the oldest kept keyframe ({self._keyframe_cycles[0]})")
+        if cycle > self._end:
+            raise ValueError(f"Cycle {cycle} was not executed yet (newest is {self._end})")
+        track = self._tracks[source]
+        if track.addresses is None:
+            end = bisect_right(track.cycles, cycle)
+            return track.values[end - 1] if end else track.base
+        k = track.last_write(address, cycle)
+        if k is not None:
+            return track.values[k]
+        pages = self._keyframes[0].memory
+        words = memoryview(pages[address // Memory.PAGE_WORDS]).cast(self._mic1.mp.words.format)
+        return words[address % Memory.PAGE_WORDS]
+
+    def changes(self, start: Optional[int] = None, end: Optional[int] = None) -> List[Change]:
+        """Escritas registradas nos ciclos start..end (inclusive), em ordem de ciclo."""
+        self._flush()
+        start = self._keyframe_cycles[0] if start is None else start
+        end = self._end if end is None else end
+        found = []
+        for track in self._tracks.values():
+            first, last = bisect_left(track.cycles, start), bisect_right(track.cycles, end)
+            for k in range(first, last):
+                address = track.addresses[k] if track.addresses is not None else None
+                found.append(Change(track.cycles[k], track.source, address, track.values[k]))
+        found.sort(key=lambda change: change.cycle)
+        return found
+
+    # ------------------------------------------------------------------ internos
+
+    @contextmanager
+    def _advancing(self, keyframes: bool = True) -> Iterator[None]:
+        self._flush()
+        self._stepping = True
+        try:
+            yield
+        finally:
+            self._stepping = False
+            self._end = max(self._end, self.cycle)
+        if keyframes:
+            self._maybe_keyframe()
+
+    @staticmethod
+    def _previous_micro(cycle: int) -> int:
+        # A fase 0 cai nos ciclos 1, 5, 9, ... (o primeiro step sai da fase -1)
+        if cycle < 2:
+            raise ValueError("There is no earlier microinstruction")
+        return cycle - 1 - (cycle - 2) % 4
+
+    def _maybe_keyframe(self):
+        if self.cycle - self._keyframe_cycles[-1] >= self.keyframe_interval:
+            self._take_keyframe()
+
+    def _take_keyframe(self):
+        self._keyframe_cycles.append(self.cycle)
+        self._keyframes.append(self._mic1.snapshot())
+        self._keyframe_due = False
+        if self.max_keyframes is not None and len(self._keyframes) > self.max_keyframes:
+            del self._keyframe_cycles[0]
+            del self._keyframes[0]
+            for track in self._tracks.values():
+                track.drop_until(self._keyframe_cycles[0])
+
+    def _flush(self):
+        # Keyframe pendente de uma escrita externa: o estado atual passa a ser o do ciclo
+        if self._keyframe_due:
+            self._take_keyframe()
+
+    def _written(self, track: _Track, address: Optional[int], value: int):
+        cycle = self.cycle
+        if self._stepping:
+            if cycle <= self._end: return # reexecução de um trecho já registrado
+        else:
+            # Escrita externa: a história depois deste ciclo (e o keyframe dele) não vale mais
+            keep = bisect_left(self._keyframe_cycles, cycle)
+            del self._keyframe_cycles[keep:]
+            del self._keyframes[keep:]
+            for other in self._tracks.values():
+                other.drop_after(cycle)
+            self._end = cycle
+            self._keyframe_due = True
+        if address is None and value == track.current: return
+        track.append(cycle, address, value)
+
+    def _on_register_write(self, sender: Union[FileRegister, Register], value):
+        self._written(self._by_register[id(sender)], None, value.value)
+
+    def _on_memory_write(self, sender: Memory, cell_idx: int):
+        self._written(self._memory_track, cell_idx, sender.words[cell_idx])
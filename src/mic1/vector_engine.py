@@ -0,0 +1,264 @@
+"""
+Execução em lote, com NumPy, de K máquinas MAC-1 que rodam o mesmo tipo de
+trabalho (tipicamente o mesmo programa sobre entradas diferentes).
+
+Os registradores das K máquinas ficam em uma matriz K×16 (na ordem de
+Mic1.registers) e as memórias em uma matriz K×4096. Cada step executa uma
+instrução MAC-1 em todas as máquinas ainda ativas de uma vez: busca e
+decodificação são vetoriais e, para cada instrução presente no passo, as
+máquinas (lanes) que a executam são separadas por máscara, então desvios
+divergentes só fazem cada lane seguir o seu PC. O resultado de cada lane é
+o mesmo do IsaInterpreter (e do Mic1) com a mesma memória inicial.
+
+Requer numpy, que não é dependência do resto do simulador.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.mic1.isa_interpreter import (
+    ADDRESS_MASK, MEMORY_SIZE, SIGN_BIT, WORD_MASK, JPOS, JZER, JUMP, JNEG, JNZE, DESP, decode_table,
+)
+from src.mic1.register_layout import REGISTER_NAMES, initial_registers
+
+PC, AC, SP, IR, TIR = range(5)
+A = REGISTER_NAMES.index("A")
+
+# Desvios que, tomados para o próprio endereço, param a lane (como o STOP_HALT de Mic1.run)
+_IS_JUMP = np.zeros(DESP + 1, dtype=bool)
+_IS_JUMP[[JPOS, JZER, JUMP, JNEG, JNZE]] = True
+
+_decode_arrays = None
+
+def _decode():
+    global _decode_arrays
+    if _decode_arrays is None:
+        table = np.array(decode_table(), dtype=np.int64)
+        _decode_arrays = (table[:, 0].copy(), table[:, 1].copy(), table[:, 2].copy())
+    return _decode_arrays
+
+class VectorEngine:
+    """
+    K máquinas MAC-1 em lock-step. `memories` é uma sequência de K memórias
+    (ou uma matriz K×4096); os registradores começam como os de um Mic1 novo.
+    Os estados ficam expostos como arrays para serem preenchidos e lidos em
+    bloco: registers (K×16), mbr_rd e mbr_wr (K), memory (K×4096),
+    instructions (instruções executadas por lane) e halted.
+
+    Por dentro, registers é uma visão de uma matriz 16×K (cada registrador
+    contíguo) e a memória é acessada como um vetor só, pelo índice
+    lane * 4096 + endereço: os dois evitam a indexação 2D, que custa o dobro.
+    """
+
+    def __init__(self, memories):
+        memory = np.zeros((len(memories), MEMORY_SIZE), dtype=np.uint16)
+        for lane, words in enumerate(memories):
+            words = np.asarray(words, dtype=np.int64)
+            memory[lane, :len(words)] = words & WORD_MASK
+        self._memory = memory
+        self._cells = memory.reshape(-1)
+        lanes = len(memory)
+        self._columns = np.repeat(np.array(initial_registers(), dtype=np.int64)[:, None], lanes, axis=1)
+        self._pc, self._ac, self._sp, self._ir, self._tir = self._columns[:5]
+        self._a = self._columns[A]
+        self.mbr_rd = np.zeros(lanes, dtype=np.int64)
+        self.mbr_wr = np.zeros(lanes, dtype=np.int64)
+        self.instructions = np.zeros(lanes, dtype=np.int64)
+        self.halted = np.zeros(lanes, dtype=bool)
+
+    @classmethod
+    def from_mic1(cls, mic1, lanes: int) -> 'VectorEngine':
+        """K cópias do estado de um Mic1 parado no início de uma instrução; mude as entradas em engine.memory."""
+        return cls.from_mic1s([mic1] * lanes)
+
+    @classmethod
+    def from_mic1s(cls, machines: Sequence) -> 'VectorEngine':
+        """Uma lane por Mic1, cada um parado no início de uma instrução."""
+        engine = cls([mic1.mp.dump_words(0, MEMORY_SIZE) for mic1 in machines])
+        for lane, mic1 in enumerate(machines):
+            engine.registers[lane] = [r.out_sig.signal().to_int32() for r in mic1.registers]
+            engine.mbr_rd[lane] = mic1.mbr_rd.out_sig.signal().to_int32()
+            engine.mbr_wr[lane] = mic1.mbr_wr.out_sig.signal().to_int32()
+        return engine
+
+    @property
+    def lanes(self) -> int:
+        return len(self._memory)
+
+    @property
+    def registers(self):
+        return self._columns.T
+
+    @property
+    def memory(self):
+        return self._memory
+
+    def lane_registers(self, lane: int) -> Dict[str, int]:
+        """Os 16 registradores, MBR_RD e MBR_WR de uma lane, pelo nome."""
+        registers = dict(zip(REGISTER_NAMES, self._columns[:, lane].tolist()))
+        registers["MBR_RD"] = int(self.mbr_rd[lane])
+        registers["MBR_WR"] = int(self.mbr_wr[lane])
+        return registers
+
+    def run(self, max_instructions: Optional[int] = None, stop_on_halt: bool = True) -> int:
+        """
+        Executa até max_instructions passos (None = até todas pararem, o que
+        exige stop_on_halt). Com stop_on_halt uma lane para, depois de
+        executá-lo, em um desvio tomado para o próprio endereço, e sai dos
+        passos seguintes. Devolve quantos passos foram dados.
+        """
+        if max_instructions is None and not stop_on_halt:
+            raise ValueError("Running without a step limit needs stop_on_halt")
+        steps = 0
+        while steps != max_instructions and not (stop_on_halt and self.halted.all()):
+            self.step(stop_on_halt)
+            steps += 1
+        return steps
+
+    def step(self, stop_on_halt: bool = True):
+        """Uma instrução MAC-1 em cada lane ativa (todas, sem stop_on_halt)."""
+        lanes = np.flatnonzero(~self.halted) if stop_on_halt else np.arange(self.lanes)
+        if not len(lanes):
+            return
+        instruction_set, operands, tirs = _decode()
+        rows = lanes * MEMORY_SIZE
+
+        start_pc = self._pc[lanes]
+        ir = self._cells[rows + (start_pc & ADDRESS_MASK)]
+        self._ir[lanes] = ir
+        self.mbr_rd[lanes] = ir
+        self._pc[lanes] = (start_pc + 1) & WORD_MASK
+        self._tir[lanes] = tirs[ir]
+        instruction = instruction_set[ir]
+        operand = operands[ir]
+
+        present = np.flatnonzero(np.bincount(instruction, minlength=len(_HANDLERS)))
+        if len(present) == 1:
+            # Todas as lanes na mesma instrução: sem máscaras
+            _HANDLERS[present[0]](self, lanes, rows, operand)
+        else:
+            for opcode in present:
+                selected = instruction == opcode
+                _HANDLERS[opcode](self, lanes[selected], rows[selected], operand[selected])
+
+        self.instructions[lanes] += 1
+        if stop_on_halt:
+            pc = self._pc[lanes]
+            self.halted[lanes] = _IS_JUMP[instruction] & (operand == pc) & (pc == start_pc)
+
+    # Uma função por instrução: `lanes` são as lanes que a executam, `rows` o
+    # início da memória de cada uma em _cells, e PC já aponta para a seguinte
+
+    def _lodd(self, lanes, rows, operand):
+        self._ac[lanes] = self.mbr_rd[lanes] = self._cells[rows + operand]
+
+    def _stod(self, lanes, rows, operand):
+        self._cells[rows + operand] = self.mbr_wr[lanes] = self._ac[lanes]
+
+    def _addd(self, lanes, rows, operand):
+        self.mbr_rd[lanes] = value = self._cells[rows + operand]
+        self._ac[lanes] = (self._ac[lanes] + value) & WORD_MASK
+
+    def _subd(self, lanes, rows, operand):
+        self.mbr_rd[lanes] = value = self._cells[rows + operand]
+        self._a[lanes] = a = ~value & WORD_MASK
+        self._ac[lanes] = (self._ac[lanes] + 1 + a) & WORD_MASK
+
+    def _jump_if(self, lanes, operand, taken):
+        self._pc[lanes[taken]] = operand[taken]
+
+    def _jpos(self, lanes, rows, operand):
+        self._jump_if(lanes, operand, self._ac[lanes] & SIGN_BIT == 0)
+
+    def _jzer(self, lanes, rows, operand):
+        self._jump_if(lanes, operand, self._ac[lanes] == 0)
+
+    def _jump(self, lanes, rows, operand):
+        self._pc[lanes] = operand
+
+    def _loco(self, lanes, rows, operand):
+        self._ac[lanes] = operand
+
+    def _local(self, lanes):
+        # SP + deslocamento; o deslocamento está nos bits baixos do IR, somado como palavra inteira
+        return (self._sp[lanes] + self._ir[lanes]) & WORD_MASK
+
+    def _lodl(self, lanes, rows, operand):
+        self._a[lanes] = a = self._local(lanes)
+        self._lodd(lanes, rows, a & ADDRESS_MASK)
+
+    def _stol(self, lanes, rows, operand):
+        self._a[lanes] = a = self._local(lanes)
+        self._stod(lanes, rows, a & ADDRESS_MASK)
+
+    def _addl(self, lanes, rows, operand):
+        self._a[lanes] = a = self._local(lanes)
+        self._addd(lanes, rows, a & ADDRESS_MASK)
+
+    def _subl(self, lanes, rows, operand):
+        self._subd(lanes, rows, self._local(lanes) & ADDRESS_MASK)
+
+    def _jneg(self, lanes, rows, operand):
+        self._jump_if(lanes, operand, self._ac[lanes] & SIGN_BIT != 0)
+
+    def _jnze(self, lanes, rows, operand):
+        self._jump_if(lanes, operand, self._ac[lanes] != 0)
+
+    def _push_word(self, lanes, rows, value):
+        self._sp[lanes] = sp = (self._sp[lanes] - 1) & WORD_MASK
+        self._cells[rows + (sp & ADDRESS_MASK)] = value
+
+    def _pop_word(self, lanes, rows):
+        sp = self._sp[lanes]
+        self.mbr_rd[lanes] = value = self._cells[rows + (sp & ADDRESS_MASK)]
+        self._sp[lanes] = (sp + 1) & WORD_MASK
+        return value
+
+    def _call(self, lanes, rows, operand):
+        self.mbr_wr[lanes] = pc = self._pc[lanes]
+        self._push_word(lanes, rows, pc)
+        self._pc[lanes] = operand
+
+    def _pshi(self, lanes, rows, operand):
+        # Grava o último valor do MBR_WR, não o lido (veja IsaInterpreter)
+        self.mbr_rd[lanes] = self._cells[rows + (self._ac[lanes] & ADDRESS_MASK)]
+        self._push_word(lanes, rows, self.mbr_wr[lanes])
+
+    def _popi(self, lanes, rows, operand):
+        self._pop_word(lanes, rows)
+        self._cells[rows + (self._ac[lanes] & ADDRESS_MASK)] = self.mbr_wr[lanes]
+
+    def _push(self, lanes, rows, operand):
+        self.mbr_wr[lanes] = ac = self._ac[lanes]
+        self._push_word(lanes, rows, ac)
+
+    def _pop(self, lanes, rows, operand):
+        self._ac[lanes] = self._pop_word(lanes, rows)
+
+    def _retn(self, lanes, rows, operand):
+        self._pc[lanes] = self._pop_word(lanes, rows)
+
+    def _swap(self, lanes, rows, operand):
+        ac, sp = self._ac[lanes], self._sp[lanes]
+        self._a[lanes] = ac
+        self._ac[lanes] = sp
+        self._sp[lanes] = ac
+
+    def _insp(self, lanes, rows, operand):
+        self._a[lanes] = operand
+        self._sp[lanes] = (self._sp[lanes] + operand) & WORD_MASK
+
+    def _desp(self, lanes, rows, operand):
+        self._a[lanes] = a = -operand & WORD_MASK
+        self._sp[lanes] = (self._sp[lanes] + a) & WORD_MASK
+
+# Indexado pelo número da instrução (a ordem de AssemblerV2.INSTRUCTION_SET)
+_HANDLERS = (
+    VectorEngine._lodd, VectorEngine._stod, VectorEngine._addd, VectorEngine._subd,
+    VectorEngine._jpos, VectorEngine._jzer, VectorEngine._jump, VectorEngine._loco,
+    VectorEngine._lodl, VectorEngine._stol, VectorEngine._addl, VectorEngine._subl,
+    VectorEngine._jneg, VectorEngine._jnze, VectorEngine._call,
+    VectorEngine._pshi, VectorEngine._popi, VectorEngine._push, VectorEngine._pop,
+    VectorEngine._retn, VectorEngine._swap, VectorEngine._insp, VectorEngine._desp,
+)
@@ -4,128 +4,218 @@ class BitArray:
     """
     Simula o comportamento do System.Collections.BitArray do C#
     Index 0 é o bit menos significativo (LSB) se criado via from_int.
+
+    Internamente os bits ficam em um único int (``_value``) mascarado pela
+    largura (``length``), então as operações são aritmética inteira O(1)
+    em vez de laços bit a bit.
     """
+    __slots__ = ("length", "_value")
+
     def __init__(self, length_or_bits: Union[int, List[bool], 'BitArray'], default: bool = False):
         if isinstance(length_or_bits, int):
             self.length = length_or_bits
-            self.bits = [default] * self.length
+            self._value = ((1 << self.length) - 1) if default else 0
         elif isinstance(length_or_bits, list):
-            self.bits = list(length_or_bits) # Copy
-            self.length = len(self.bits)
+            self.length = len(length_or_bits)
+            value = 0
+            for i, bit in enumerate(length_or_bits):
+                if bit:
+                    value |= (1 << i)
+            self._value = value
         elif isinstance(length_or_bits, BitArray):
-            self.bits = list(length_or_bits.bits)
             self.length = length_or_bits.length
+            self._value = length_or_bits._value
         else:
             raise ValueError("Invalid initializer for BitArray")
 
+    @property
+    def value(self) -> int:
+        """Valor sem sinal dos bits (sem o limite de 32 bits de to_int32)."""
+        return self._value
+
+    @property
+    def bits(self) -> List[bool]:
+        """Cópia dos bits como lista (LSB primeiro), mantida por compatibilidade."""
+        value = self._value
+        return [bool((value >> i) & 1) for i in range(self.length)]
+
     def __getitem__(self, index: int) -> bool:
         if index < 0 or index >= self.length:
              raise IndexError("BitArray index out of range")
-        return self.bits[index]
+        return bool((self._value >> index) & 1)
 
     def __setitem__(self, index: int, value: bool):
         if index < 0 or index >= self.length:
              raise IndexError("BitArray index out of range")
-        self.bits[index] = value
+        if value:
+            self._value |= (1 << index)
+        else:
+            self._value &= ~(1 << index)
 
     def __len__(self) -> int:
         return self.length
 
     def set_all(self, value: bool):
-        for i in range(self.length):
-            self.bits[i] = value
+        self._value = ((1 << self.length) - 1) if value else 0
 
     def clone(self) -> 'BitArray':
         return BitArray(self)
 
+    def frozen(self) -> 'SignalValue':
+        """Versão imutável (compartilhável) destes bits."""
+        return SignalValue.of(self._value, self.length)
+
     def copy_to(self, array: List[int], index: int):
         # Implementação simplificada para ToInt32
         val = self.to_int32()
         array[index] = val
 
     def and_op(self, other: 'BitArray') -> 'BitArray':
+        # Só os primeiros min(len) bits participam; os bits acima ficam intactos.
         length = min(self.length, other.length)
-        for i in range(length):
-            self.bits[i] = self.bits[i] and other.bits[i]
+        self._value &= other._value | ~((1 << length) - 1)
         return self
 
     def not_op(self) -> 'BitArray':
-        for i in range(self.length):
-            self.bits[i] = not self.bits[i]
+        self._value ^= (1 << self.length) - 1
         return self
 
     def has_all_set(self) -> bool:
-        return all(self.bits)
+        return self._value == (1 << self.length) - 1
 
     def has_any_set(self) -> bool:
-        return any(self.bits)
-    
+        return self._value != 0
+
     def get(self, index: int) -> bool:
         return self[index]
 
     def to_int32(self) -> int:
         if self.length > 32:
             raise ValueError("BitArray length must be at most 32 bits.")
-        value = 0
-        for i in range(self.length):
-            if self.bits[i]:
-                value |= (1 << i)
-        return value
+        return self._value
 
     def to_bit_string(self) -> str:
         # C# ToBitString: chars[bits.Length - 1 - i] = bits[i]
         # Mostra MSB à esquerda
-        chars = ['1' if self.bits[i] else '0' for i in range(self.length)]
-        return "".join(reversed(chars))
+        if self.length == 0:
+            return ""
+        return format(self._value, f"0{self.length}b")
 
     @staticmethod
     def from_int(value: int, length: int) -> 'BitArray':
         bits = BitArray(length)
-        for i in range(length):
-            bits[i] = (value & (1 << i)) != 0
+        bits._value = value & ((1 << length) - 1)
         return bits
 
     @staticmethod
     def from_bit_string(bit_string: str, lmsb: bool = True) -> 'BitArray':
         length = len(bit_string)
+        if bit_string.count('0') + bit_string.count('1') != length:
+            raise ValueError("bitString must contain only '0's and '1's.")
         bits = BitArray(length)
-        for i in range(length):
-            c = bit_string[length - 1 - i] if lmsb else bit_string[i]
-            if c == '1':
-                bits[i] = True
-            elif c == '0':
-                bits[i] = False
-            else:
-                raise ValueError("bitString must contain only '0's and '1's.")
+        if length:
+            bits._value = int(bit_string if lmsb else bit_string[::-1], 2)
         return bits
 
     def trim_or_pad(self, target_length: int) -> 'BitArray':
         result = BitArray(target_length)
-        l = min(self.length, target_length)
-        for i in range(l):
-            result[i] = self.bits[i]
+        result._value = self._value & ((1 << target_length) - 1)
         return result
 
     def shift_left(self) -> 'BitArray':
-        # C#: shifted[i] = input[i+1] (shift lógico para direita na representação array, 
-        # mas "Left" no valor numérico visual MSB..LSB? 
+        # C#: shifted[i] = input[i+1] (shift lógico para direita na representação array,
+        # mas "Left" no valor numérico visual MSB..LSB?
         # Vamos seguir a lógica exata do C# code fornecido:
         # shifted[i] = input[i + 1];
         # Isso significa que o bit 0 recebe o bit 1. O bit N-1 fica false.
         # Isso é um shift right aritmético se index 0 for LSB.
         # Mas o nome é ShiftLeft. Vamos confiar no código C#.
         shifted = BitArray(self.length)
-        for i in range(self.length - 1):
-            shifted[i] = self.bits[i+1]
+        shifted._value = self._value >> 1
         return shifted
 
     def shift_right(self) -> 'BitArray':
-        # C#: shifted[i] = input[i - 1]; 
+        # C#: shifted[i] = input[i - 1];
         shifted = BitArray(self.length)
-        for i in range(1, self.length):
-            shifted[i] = self.bits[i-1]
+        shifted._value = (self._value << 1) & ((1 << self.length) - 1)
         return shifted
 
     def compare(self, other: 'BitArray') -> bool:
         if self.length != other.length: return False
-        return self.bits == other.bits
\ No newline at end of file
+        return self._value == other._value
+
+
+_object_new = object.__new__
+_set_length = BitArray.length.__set__
+_set_value = BitArray._value.__set__
+
+def _new_value(value: int, length: int) -> 'SignalValue':
+    obj = _object_new(SignalValue)
+    _set_length(obj, length)
+    _set_value(obj, value)
+    return obj
+
+class SignalValue(BitArray):
+    """
+    BitArray imutável e hashable usado como valor de sinal.
+
+    Como ninguém pode alterá-lo, os SignalSenders entregam a mesma instância
+    a todos os listeners em vez de copiar a cada signal(). Qualquer operação
+    que altere bits (__setitem__, set_all, and_op, not_op) levanta TypeError;
+    use clone() para obter um BitArray mutável. Valores de até
+    INTERN_MAX_WIDTH bits são internados: SignalValue.of(v, n) devolve sempre
+    o mesmo objeto.
+    """
+    __slots__ = ()
+
+    INTERN_MAX_WIDTH = 8
+
+    def __new__(cls, length_or_bits: Union[int, List[bool], BitArray], default: bool = False):
+        bits = BitArray(length_or_bits, default)
+        return SignalValue.of(bits._value, bits.length)
+
+    def __init__(self, *args, **kwargs):
+        pass # Já inicializado em __new__
+
+    @staticmethod
+    def of(value: int, length: int) -> 'SignalValue':
+        value &= (1 << length) - 1
+        if length <= SignalValue.INTERN_MAX_WIDTH:
+            return _INTERNED[length][value]
+        return _new_value(value, length)
+
+    def frozen(self) -> 'SignalValue':
+        return self
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SignalValue is immutable")
+
+    def __reduce__(self):
+        return (SignalValue.of, (self._value, self.length))
+
+    def __eq__(self, other):
+        if not isinstance(other, BitArray): return NotImplemented
+        return self.length == other.length and self._value == other._value
+
+    def __ne__(self, other):
+        if not isinstance(other, BitArray): return NotImplemented
+        return self.length != other.length or self._value != other._value
+
+    def __hash__(self):
+        return hash((self.length, self._value))
+
+    def __repr__(self):
+        return f"SignalValue('{self.to_bit_string()}')"
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("SignalValue is immutable; use clone() to get a mutable BitArray")
+
+    __setitem__ = _immutable
+    set_all = _immutable
+    and_op = _immutable
+    not_op = _immutable
+
+_INTERNED = [
+    [_new_value(value, length) for value in range(1 << length)]
+    for length in range(SignalValue.INTERN_MAX_WIDTH + 1)
+]
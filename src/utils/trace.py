@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO, Union
+
+# Níveis, na mesma escala do módulo logging
+DEBUG = 10
+INFO = 20
+# Acima de qualquer nível: o valor dos atributos do tracer sem sink para a categoria
+OFF = 100
+
+# Categorias de evento
+REGISTER = "register"
+MEMORY = "memory"
+MICROINSTRUCTION = "microinstruction"
+MACROINSTRUCTION = "macroinstruction"
+CATEGORIES = (REGISTER, MEMORY, MICROINSTRUCTION, MACROINSTRUCTION)
+
+# source: nome do registrador/memória; address: célula, MPC ou PC (None para
+# registradores); value/width: a palavra escrita ou carregada.
+_Record = namedtuple("TraceRecord", ["category", "level", "source", "address", "value", "width"])
+
+class TraceRecord(_Record):
+    __slots__ = ()
+
+    def bits(self) -> str:
+        return format(self.value, f"0{self.width}b")
+
+    def __str__(self):
+        if self.category == REGISTER:
+            return f"{self.source}, changed: {self.bits()}"
+        if self.category == MEMORY:
+            return f"MEMORY ({self.source}) changing cell ({self.address}) to {self.bits()}"
+        return f"{self.source} ({self.address}): {self.bits()}"
+
+class TraceSink(ABC):
+    """Destino de eventos; filtra por categorias e nível mínimo."""
+
+    def __init__(self, categories: Iterable[str] = CATEGORIES, level: int = DEBUG):
+        self.categories = frozenset(categories)
+        unknown = self.categories - set(CATEGORIES)
+        if unknown:
+            raise ValueError(f"Unknown trace categories: {sorted(unknown)}")
+        self.level = level
+
+    def accepts(self, record: TraceRecord) -> bool:
+        return record.category in self.categories and record.level >= self.level
+
+    @abstractmethod
+    def write(self, record: TraceRecord):
+        pass
+
+class RingBufferSink(TraceSink):
+    """Guarda os últimos `capacity` eventos em memória."""
+
+    def __init__(self, capacity: int = 4096, categories: Iterable[str] = CATEGORIES, level: int = DEBUG):
+        super().__init__(categories, level)
+        self._records = deque(maxlen=capacity)
+
+    def records(self) -> List[TraceRecord]:
+        return list(self._records)
+
+    def clear(self):
+        self._records.clear()
+
+    def write(self, record: TraceRecord):
+        self._records.append(record)
+
+class FileSink(TraceSink):
+    """Escreve uma linha por evento em um caminho (aberto para anexar) ou arquivo já aberto."""
+
+    def __init__(self, file: Union[str, TextIO], categories: Iterable[str] = CATEGORIES, level: int = DEBUG):
+        super().__init__(categories, level)
+        self._owned = isinstance(file, str)
+        self._file = open(file, "a", encoding="utf-8") if self._owned else file
+
+    def write(self, record: TraceRecord):
+        self._file.write(f"{record}\n")
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+class CallbackSink(TraceSink):
+    def __init__(self, callback: Callable[[TraceRecord], None],
+                 categories: Iterable[str] = CATEGORIES, level: int = DEBUG):
+        super().__init__(categories, level)
+        self._callback = callback
+
+    def write(self, record: TraceRecord):
+        self._callback(record)
+
+class Tracer:
+    """
+    Distribui eventos para os sinks. Para cada categoria há um atributo
+    (tracer.register, tracer.memory, ...) com o menor nível que algum sink
+    aceita nela, ou OFF se nenhum a aceita; quem emite compara o nível do
+    evento com esse atributo (`if tracer.register <= DEBUG:`) antes de
+    montar o evento. Assim, sem sinks ou com sinks que filtram o nível, o
+    custo é um teste de atributo, sem formatação de texto nem I/O.
+    """
+
+    def __init__(self):
+        self._sinks: List[TraceSink] = []
+        self._update()
+
+    @property
+    def sinks(self) -> List[TraceSink]:
+        return list(self._sinks)
+
+    def add_sink(self, sink: TraceSink) -> TraceSink:
+        self._sinks.append(sink)
+        self._update()
+        return sink
+
+    def remove_sink(self, sink: TraceSink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+        self._update()
+
+    def emit(self, category: str, level: int, source: Optional[str], address: Optional[int], value: int, width: int):
+        record = TraceRecord(category, level, source, address, value, width)
+        for sink in self._sinks:
+            if sink.accepts(record):
+                sink.write(record)
+
+    def _update(self):
+        for category in CATEGORIES:
+            levels = [sink.level for sink in self._sinks if category in sink.categories]
+            setattr(self, category, min(levels, default=OFF))
+
+@contextmanager
+def tracing(sink: TraceSink) -> Iterator[TraceSink]:
+    """Liga um sink no tracer global durante um bloco `with`."""
+    tracer.add_sink(sink)
+    try:
+        yield sink
+    finally:
+        tracer.remove_sink(sink)
+
+# Tracer usado pelos componentes
+tracer = Tracer()
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import time
+import pytest
+from src.mic1 import batch
+from src.mic1.batch import Job, run_batch, STATUS_CRASHED, STATUS_ERROR, STATUS_OK, STATUS_TIMEOUT
+from src.mic1.mic1 import STOP_HALT, STOP_MAX_CYCLES
+from src.mic1.programs import COUNTDOWN
+
+PROGRAM = COUNTDOWN
+X = 10
+
+fork_only = pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                               reason="the patched run_job only reaches workers started with fork")
+
+def test_results_match_running_in_process():
+    # O patch troca o LOCO 3 por LOCO 2: uma volta a menos, um PUSH a menos
+    jobs = [Job(PROGRAM, cells=(X,)), Job(PROGRAM, {0: 0x7002}, cells=(X,)), Job(PROGRAM, max_cycles=100)]
+    results = sorted(run_batch(jobs, workers=2), key=lambda result: result.index)
+    inline = list(run_batch(jobs, workers=0))
+    strip = lambda result: result._replace(elapsed=None)
+    assert [strip(r) for r in results] == [strip(r) for r in inline]
+
+    assert [r.status for r in results] == [STATUS_OK] * 3
+    assert [r.reason for r in results] == [STOP_HALT, STOP_HALT, STOP_MAX_CYCLES]
+    assert results[0].registers["SP"] == 4096 - 3 and results[1].registers["SP"] == 4096 - 2
+    assert results[0].cells == {X: 0}
+    assert results[2].cycles == 100
+
+def test_failures_are_isolated():
+    jobs = [Job("FOO 3"), Job("A: LOCO 1\nJUMP A", timeout=0.2), Job(PROGRAM)]
+    results = {result.index: result for result in run_batch(jobs, workers=2)}
+    assert results[0].status == STATUS_ERROR and "FOO" in results[0].error
+    assert results[1].status == STATUS_TIMEOUT and results[1].macro_instructions > 0
+    assert results[2].status == STATUS_OK
+
+def _misbehaving_run_job(job, index=0, timeout=None):
+    if job.source == "crash":
+        os._exit(3)
+    if job.source == "hang":
+        time.sleep(60)
+    return _original_run_job(job, index, timeout)
+
+_original_run_job = batch.run_job
+
+@fork_only
+def test_dead_and_stuck_workers_are_replaced(monkeypatch):
+    monkeypatch.setattr(batch, "HARD_TIMEOUT_GRACE", 0.2)
+    monkeypatch.setattr(batch, "run_job", _misbehaving_run_job)
+    jobs = [Job("crash"), Job("hang", timeout=0.1)] + [Job(PROGRAM)] * 3
+    results = {result.index: result for result in run_batch(jobs, workers=2)}
+    assert results[0].status == STATUS_CRASHED and "3" in results[0].error
+    assert results[1].status == STATUS_TIMEOUT
+    assert [results[i].status for i in (2, 3, 4)] == [STATUS_OK] * 3
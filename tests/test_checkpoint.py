@@ -0,0 +1,69 @@
+import pytest
+import textwrap
+from src.mic1.mic1 import Mic1, STOP_HALT
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.checkpoint import CHECKPOINT_MAGIC, load_checkpoint, run_with_checkpoints, save_checkpoint
+from src.mic1.exceptions.checkpoint_exceptions import CheckpointFormatException
+from src.utils.bit_utils import BitArray
+from src.mic1.programs import COUNTDOWN
+
+PROGRAM = COUNTDOWN
+
+def loaded(evaluation="event"):
+    mic1 = Mic1(evaluation)
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(PROGRAM))
+    return mic1
+
+def trace(mic1, cycles):
+    states = []
+    for _ in range(cycles):
+        mic1.step_cycle()
+        states.append(([s.signal().value for _, s in mic1.signals()], mic1.mp.dump_words()))
+    return states
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "mic1.ckpt")
+
+def test_reload_continues_identically(path):
+    for evaluation in Mic1.EVALUATION_MODES:
+        mic1 = loaded(evaluation)
+        mic1.run(max_cycles=55) # escrita na memória em andamento
+        save_checkpoint(mic1, path)
+        expected = trace(mic1, 300)
+        for map_memory in (True, False):
+            restored = load_checkpoint(path, evaluation=evaluation, map_memory=map_memory)
+            assert restored.mp.shared == map_memory
+            assert trace(restored, 300) == expected
+
+def test_mapped_memory_is_copied_on_write(path):
+    mic1 = loaded()
+    save_checkpoint(mic1, path)
+    restored = load_checkpoint(path)
+    restored.mp.set_cell(10, BitArray.from_int(7, 16))
+    assert not restored.mp.shared
+    assert load_checkpoint(path).mp.cell(10).to_int32() == 0
+
+def test_invalid_files_are_rejected(path, tmp_path):
+    save_checkpoint(loaded(), path)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.startswith(CHECKPOINT_MAGIC)
+
+    for name, content, message in (("empty", b"", "empty"), ("magic", b"X" + data[1:], "bad magic"),
+                                   ("truncated", data[:-2], "truncated")):
+        bad = tmp_path / name
+        bad.write_bytes(content)
+        with pytest.raises(CheckpointFormatException, match=message):
+            load_checkpoint(str(bad))
+
+def test_run_with_checkpoints_resumes_where_it_stopped(path):
+    reference = loaded()
+    result = reference.run()
+    assert run_with_checkpoints(loaded(), path, every=5) == result
+
+    run_with_checkpoints(loaded(), path, every=5, max_cycles=300)
+    resumed = load_checkpoint(path)
+    assert resumed.run().reason == STOP_HALT
+    assert resumed.clock.ticks == reference.clock.ticks
+    assert trace(resumed, 8) == trace(reference, 8)
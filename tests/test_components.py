@@ -1,8 +1,17 @@
 import pytest
+from array import array
 from src.components.register import Register
-from src.components.memory import Memory
-from src.components.signals import SignalSender, SingleSignalSender
-from src.utils.bit_utils import BitArray
+from src.components.register_file import RegisterFile
+from src.components.multiplexer import Multiplexer
+from src.components.memory import Memory, SlowMemory
+from src.components.clock import Clock, ClockDelayedSignalSender
+from src.components.alu import Alu, alu_kernel
+from src.components.shifter import Shifter, shift_kernel
+from src.mic1.microcode_jit import _ALU_EXPRESSIONS, _SHIFTER_EXPRESSIONS
+from src.components.signals import EventHandler, SignalSender, SingleSignalSender
+from src.components.event_profile import EventProfile, profiling
+from src.components.processed_signals import ProcessedSignalSender
+from src.utils.bit_utils import BitArray, SignalValue
 
 class TestRegister:
     def test_register_1(self):
@@ -28,6 +37,137 @@ class TestRegister:
         control_sender.enable()
         assert register.out_sig.signal().to_bit_string() == "1111111111111111"
 
+class TestRegisterFile:
+    def register_file(self):
+        select_a, select_b = SignalSender(2), SignalSender(2)
+        file = RegisterFile(16, ["R0", "R1", "ONE", "R3"], select_a, select_b, initial={3: 7}, constants={2: 1})
+        data, address, enable, control = SignalSender(16), SignalSender(2), SingleSignalSender(), SingleSignalSender()
+        file.set_write_port(data, address, enable, control)
+        return file, select_a, select_b, data, address, enable, control
+
+    def test_read_ports_follow_selectors_and_writes(self):
+        file, select_a, select_b, data, address, enable, control = self.register_file()
+        select_b.set_data(BitArray.from_int(3, 2))
+        assert [file.out_a.signal().value, file.out_b.signal().value] == [0, 7]
+
+        data.set_data(BitArray.from_int(42, 16))
+        address.set_data(BitArray.from_int(3, 2))
+        control.enable() # sem enable não grava
+        control.disable()
+        enable.enable()
+        control.enable()
+        assert file.out_b.signal().value == 42 and file.out_a.signal().value == 0
+        select_a.set_data(BitArray.from_int(3, 2))
+        assert file.out_a.signal().value == 42
+
+    def test_write_port_updates_only_the_selected_register(self):
+        file, _, _, data, address, enable, control = self.register_file()
+        writes = []
+        for register in file.registers:
+            register.data_changed += lambda sender, value: writes.append((sender.name, value.value))
+        data.set_data(BitArray.from_int(5, 16))
+        address.set_data(BitArray.from_int(1, 2))
+        enable.enable()
+        control.enable()
+        assert writes == [("R1", 5)]
+        assert [r.out_sig.events_fired for r in file.registers] == [0, 1, 0, 0]
+
+    def test_file_registers_report_control_and_refuse_rewiring(self):
+        file, _, _, data, address, enable, control = self.register_file()
+        changes = []
+        for register in file.registers:
+            register.control_changed += lambda sender, value: changes.append((sender.name, value))
+        address.set_data(BitArray.from_int(3, 2))
+        enable.enable()
+        control.enable()
+        control.disable()
+        address.set_data(BitArray.from_int(2, 2)) # constante: não grava
+        control.enable()
+        control.disable()
+        assert changes == [("R3", True), ("R3", False)]
+        with pytest.raises(ValueError):
+            file.registers[1].set_data_sender(data)
+        with pytest.raises(ValueError):
+            file.registers[1].set_control_sender(control)
+
+    def test_constants_are_read_only(self):
+        file, _, _, data, address, enable, control = self.register_file()
+        data.set_data(BitArray.from_int(9, 16))
+        address.set_data(BitArray.from_int(2, 2))
+        enable.enable()
+        control.enable()
+        assert file.registers[2].out_sig.signal().value == 1 and file.registers[2].read_only
+        with pytest.raises(ValueError):
+            file.registers[2].set_data(BitArray.from_int(0, 16))
+
+        file.registers[3].set_data(BitArray.from_int(8, 16))
+        file.reset()
+        assert [r.out_sig.signal().value for r in file.registers] == [0, 0, 1, 7]
+
+class TestMultiplexer:
+    def test_selection_changes_do_not_touch_listeners(self):
+        inputs = [SignalSender(BitArray.from_int(10 + i, 16)) for i in range(4)]
+        control = SignalSender(2)
+        mux = Multiplexer(16, inputs, control)
+        listeners = [sender.signal_changed.listeners for sender in inputs]
+        for index in (2, 1, 3, 0, 2):
+            control.set_data(BitArray.from_int(index, 2))
+            assert mux.out_sig.signal().value == 10 + index
+        assert [sender.signal_changed.listeners for sender in inputs] == listeners
+
+        fired = mux.out_sig.events_fired
+        inputs[1].set_data(BitArray.from_int(99, 16)) # não selecionada
+        assert mux.out_sig.signal().value == 12 and mux.out_sig.events_fired == fired
+        inputs[2].set_data(BitArray.from_int(7, 16))
+        assert mux.out_sig.signal().value == 7
+        control.set_data(BitArray.from_int(1, 2))
+        assert mux.out_sig.signal().value == 99
+
+class TestEventHandler:
+    def test_changes_during_invoke_apply_to_the_next_one(self):
+        handler = EventHandler()
+        calls = []
+        def first(sender, args):
+            nonlocal handler
+            calls.append("first")
+            handler -= second
+            handler += third
+        second = lambda sender, args: calls.append("second")
+        third = lambda sender, args: calls.append("third")
+        handler += first
+        handler += second
+        handler.invoke(None, None)
+        assert calls == ["first", "second"]
+        assert handler.listeners == (first, third)
+
+        handler -= first
+        handler -= first # já saiu: ignorado
+        handler += third
+        calls.clear()
+        handler.invoke(None, None)
+        assert calls == ["third", "third"]
+
+    def test_profiling_counts_listeners_per_component(self):
+        register = Register(16)
+        source, control = SignalSender(16), SingleSignalSender()
+        register.set_data_sender(source)
+        register.set_control_sender(control)
+        profile = EventProfile()
+        profile.name(register, "reg")
+        with profiling(profile):
+            with pytest.raises(RuntimeError):
+                with profiling():
+                    pass
+            source.set_data(BitArray.from_int(3, 16))
+            control.pulse()
+        assert EventHandler.invoke.__name__ == "invoke" and register.out_sig.signal().value == 3
+        control.pulse() # fora do perfil
+        [row] = profile.listeners()
+        assert (row.component, row.listener, row.calls) == ("reg", "Register._on_control_change", 2)
+        assert 0 <= row.own <= row.total
+        assert profile.components()[0].calls == 2
+        assert "Register._on_control_change" in profile.table()
+
 class TestMemory:
     def test_memory_1(self):
         addr_sender = SignalSender(16)
@@ -44,4 +184,255 @@ class TestMemory:
         rd_sender.enable()
         
         assert mem.cell(10).to_int32() == 21
-        assert mem.out_sig.signal().to_int32() == 21
\ No newline at end of file
+        assert mem.out_sig.signal().to_int32() == 21
+
+    def memory(self, length=4096, cell_length=16):
+        return Memory(length, cell_length, SignalSender(12), SignalSender(cell_length), None, None)
+
+    def test_bulk_load_and_dump(self):
+        mem = self.memory()
+        mem.load_words(100, [1, 2, 0x1FFFF]) # mascarado em 16 bits
+        assert mem.dump_words(99, 104) == [0, 1, 2, 0xFFFF, 0]
+        assert mem.cell(101).to_int32() == 2
+
+        mem.load_words(0, array("H", [7, 8]))
+        mem.load_words(2, bytes(array("H", [9])), raw=True)
+        assert mem.dump_words(0, 3) == [7, 8, 9]
+        with pytest.raises(ValueError):
+            mem.load_words(4095, [1, 2])
+        with pytest.raises(ValueError):
+            mem.load_words(0, b"\x01", raw=True)
+
+    def test_bulk_load_converts_other_formats(self):
+        mem = self.memory()
+        mem.load_words(0, array("I", [1, 0x12345]))
+        mem.load_words(2, b"\x03\x04") # sem raw, bytes são inteiros
+        assert mem.dump_words(0, 5) == [1, 0x2345, 3, 4, 0]
+
+        wide = self.memory(cell_length=32)
+        wide.load_words(0, array("H", [0xFFFF, 1]))
+        assert wide.dump_words(0, 3) == [0xFFFF, 1, 0]
+
+    def test_words_view_is_shared_and_reset_clears_it(self):
+        mem = self.memory()
+        changed = []
+        mem.cell_changed += lambda sender, index: changed.append(index)
+        view = mem.words
+        mem.set_cell(5, BitArray.from_int(42, 16))
+        assert view[5] == 42 and changed == [5]
+        view[6] = 43
+        assert mem.cell(6).to_int32() == 43
+
+        mem.reset()
+        assert view[5] == 0 and mem.dump_words() == [0] * 4096
+
+    def test_pages_share_unchanged_pages(self):
+        mem = self.memory()
+        empty = mem.pages()
+        assert len(empty) == 4096 // Memory.PAGE_WORDS
+        assert all(page is empty[0] for page in empty) # uma só página zerada
+
+        mem.set_cell(300, BitArray.from_int(7, 16))
+        first = mem.pages()
+        mem.set_cell(301, BitArray.from_int(8, 16))
+        second = mem.pages()
+        changed = [i for i, (a, b) in enumerate(zip(first, second)) if a is not b]
+        assert changed == [300 // Memory.PAGE_WORDS]
+
+        other = self.memory()
+        cells = []
+        other.cell_changed += lambda sender, index: cells.append(index)
+        other.load_pages(second)
+        assert other.dump_words() == mem.dump_words() and cells == [300, 301]
+        assert other.pages()[1] is second[1]
+        with pytest.raises(ValueError):
+            other.load_pages(second[1:])
+
+    def test_control_store_cells_have_32_bits(self):
+        mem = self.memory(256, 32)
+        mem.load_words(0, [0xFFFFFFFF])
+        assert mem.words.itemsize >= 4
+        assert mem.cell(0).to_bit_string() == "1" * 32
+
+class TestSignalValue:
+    def test_signal_is_shared_and_immutable(self):
+        sender = SignalSender(16)
+        sender.set_data(BitArray.from_int(1234, 16))
+        value = sender.signal()
+        assert value is sender.signal()
+        assert isinstance(value, SignalValue)
+        with pytest.raises(TypeError):
+            value[0] = False
+        with pytest.raises(TypeError):
+            value.not_op()
+
+        copy = value.clone()
+        copy.not_op()
+        assert sender.signal().to_int32() == 1234
+        assert type(copy) is BitArray
+
+    def test_small_values_are_interned(self):
+        assert SignalValue.of(5, 4) is SignalValue.of(21, 4)
+        assert SignalValue.of(300, 16) == BitArray.from_int(300, 16)
+        assert hash(SignalValue.of(300, 16)) == hash(SignalValue.of(300, 16))
+
+    def test_processed_signal_is_memoized_on_source_value(self):
+        source = SignalSender(16)
+        source.set_data(BitArray.from_int(0b1011_0000, 16))
+        field = ProcessedSignalSender.interval(source, 4, 4)
+        assert field.signal().to_int32() == 0b1011
+        assert field.signal() is field.signal()
+        source.set_data(BitArray.from_int(0b0110_0000, 16))
+        assert field.signal().to_int32() == 0b0110
+
+class TestChangeSuppression:
+    def test_set_data_only_fires_on_change(self):
+        sender = SignalSender(8)
+        fired = []
+        sender.signal_changed += lambda s, v: fired.append(v.to_int32())
+
+        sender.set_data(BitArray.from_int(3, 8))
+        sender.set_data(BitArray.from_int(3, 8))
+        sender.set_data(BitArray.from_int(3 + 256, 16))
+        sender.set_data(BitArray.from_int(4, 8))
+
+        assert fired == [3, 4]
+        assert (sender.events_fired, sender.events_suppressed) == (2, 2)
+
+    def test_processed_signal_suppresses_unchanged_slice(self):
+        source = SignalSender(8)
+        low = ProcessedSignalSender.interval(source, 0, 4)
+        fired = []
+        low.signal_changed += lambda s, v: fired.append(v.to_int32())
+
+        source.set_data(BitArray.from_int(0x15, 8))
+        source.set_data(BitArray.from_int(0x25, 8)) # Só o nibble alto muda
+        source.set_data(BitArray.from_int(0x26, 8))
+
+        assert fired == [5, 6]
+        assert low.events_suppressed == 1
+
+# Referências bit a bit (a implementação antiga da ALU e do Shifter)
+def ripple_sum(a, b):
+    result, carry = 0, 0
+    for i in range(16):
+        bit_a, bit_b = a >> i & 1, b >> i & 1
+        result |= (bit_a ^ bit_b ^ carry) << i
+        carry = (bit_a & bit_b) | (bit_a & carry) | (bit_b & carry)
+    return result
+
+WORDS = range(1 << 16)
+OPERANDS = (0, 1, 0x7FFF, 0x8000, 0xFFFF)
+
+class TestAluShifterKernels:
+    def test_unary_functions_over_every_word(self):
+        for a in WORDS:
+            assert alu_kernel(2, a, 0, 0xFFFF) == a
+            assert alu_kernel(3, a, 0, 0xFFFF) == sum((1 - (a >> i & 1)) << i for i in range(16))
+            # shift_left: o bit i recebe o bit i + 1; shift_right: o bit i recebe o bit i - 1
+            assert shift_kernel(0, a, 0xFFFF) == shift_kernel(3, a, 0xFFFF) == a
+            assert shift_kernel(1, a, 0xFFFF) == sum((a >> (i + 1) & 1) << i for i in range(15))
+            assert shift_kernel(2, a, 0xFFFF) == sum((a >> (i - 1) & 1) << i for i in range(1, 16))
+
+    def test_binary_functions_over_every_word(self):
+        for b in OPERANDS:
+            for a in WORDS:
+                assert alu_kernel(0, a, b, 0xFFFF) == alu_kernel(0, b, a, 0xFFFF) == ripple_sum(a, b)
+                assert alu_kernel(1, a, b, 0xFFFF) == sum((a >> i & b >> i & 1) << i for i in range(16))
+
+    def test_components_match_the_bit_methods(self):
+        a, b, control = SignalSender(16), SignalSender(16), SignalSender(2)
+        alu = Alu(a, b, control)
+        shift_control = SignalSender(2)
+        shifter = Shifter(alu.out_sig, shift_control)
+        b.set_data(BitArray.from_int(0x00FF, 16))
+        for function, method in enumerate((Alu.sum_op, Alu.and_op, Alu.identity_op, Alu.inverse_op)):
+            control.set_data(BitArray.from_int(function, 2))
+            for word in range(0, 1 << 16, 7):
+                a.set_data(BitArray.from_int(word, 16))
+                expected = method(BitArray.from_int(word, 16), BitArray.from_int(0x00FF, 16))
+                assert alu.out_sig.signal() == expected
+                assert alu.out_n.signal().value == expected[15]
+                assert alu.out_z.signal().value == (not expected.has_any_set())
+                for shift, bits in ((0, expected), (1, expected.shift_left()), (2, expected.shift_right())):
+                    shift_control.set_data(BitArray.from_int(shift, 2))
+                    assert shifter.out_sig.signal() == bits
+
+    def test_jit_expressions_match_the_kernels(self):
+        # As rotinas do MicrocodeJit embutem a ALU e o shifter como texto
+        alu = [eval(f"lambda a, b: {expression.format(a='a')}") for expression in _ALU_EXPRESSIONS]
+        shift = [eval(f"lambda v: {expression}") for expression in _SHIFTER_EXPRESSIONS]
+        for b in OPERANDS:
+            for a in WORDS:
+                assert [f(a, b) for f in alu] == [alu_kernel(function, a, b, 0xFFFF) for function in range(4)]
+        for v in WORDS:
+            assert [f(v) for f in shift] == [shift_kernel(function, v, 0xFFFF) for function in range(4)]
+
+class TestClockTimers:
+    def test_timers_fire_in_creation_order_and_can_be_cancelled(self):
+        clock = Clock(4)
+        fired = []
+        first = clock.timer(lambda: fired.append("first"))
+        second = clock.timer(lambda: fired.append("second"))
+        clock.step()
+        second.start(2)
+        first.start(2)
+        cancelled = clock.timer(lambda: fired.append("cancelled"))
+        cancelled.start(1)
+        cancelled.cancel()
+        clock.step()
+        assert fired == [] and first.pending
+        clock.step()
+        assert fired == ["first", "second"] and not first.pending
+
+    def test_restart_replaces_pending_event(self):
+        clock = Clock(4)
+        fired = []
+        timer = clock.timer(lambda: fired.append(clock.ticks))
+        clock.step()
+        timer.start(3)
+        clock.step()
+        timer.start(3)
+        for _ in range(5):
+            clock.step()
+        assert fired == [4]
+
+    def slow_memory(self, clock):
+        address, data = SignalSender(12), SignalSender(16)
+        rd, wr = SingleSignalSender(), SingleSignalSender()
+        memory = SlowMemory(4096, 16, clock, 6, 6, address, data, rd, wr)
+        return memory, address, data, rd, wr
+
+    def test_slow_memory_completes_after_six_phases(self):
+        clock = Clock(4)
+        memory, address, data, rd, wr = self.slow_memory(clock)
+        clock.step()
+        address.set_data(BitArray.from_int(7, 12))
+        data.set_data(BitArray.from_int(99, 16))
+        wr.enable()
+        for _ in range(5):
+            clock.step()
+            assert memory.cell(7).to_int32() == 0
+        clock.step()
+        assert memory.cell(7).to_int32() == 99
+        assert (memory.counter_wr, memory.counter_rd) == (6, 7)
+
+        memory.set_cell(8, BitArray.from_int(55, 16))
+        address.set_data(BitArray.from_int(8, 12))
+        rd.enable()
+        wr.disable()
+        for _ in range(5):
+            clock.step()
+        assert memory.out_sig.signal().to_int32() == 0 and memory.counter_rd == 5
+        clock.step()
+        assert memory.out_sig.signal().to_int32() == 55
+        assert (memory.counter_rd, memory.counter_wr) == (6, 7)
+
+    def test_idle_components_do_not_listen_to_the_clock(self):
+        clock = Clock(4)
+        self.slow_memory(clock)
+        ClockDelayedSignalSender(SingleSignalSender(), clock, 0)
+        assert clock.stepped.listeners == ()
+        for _ in range(10):
+            clock.step()
+        assert clock._events == []
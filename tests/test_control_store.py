@@ -2,6 +2,8 @@ import pytest
 import os
 from src.mic1.control_store import CtrlStoreTxtSrcFileLoader, ControlStore
 from src.components.signals import SignalSender
+from src.mic1.mic1 import Mic1
+from src.utils.bit_utils import BitArray
 from src.mic1.exceptions.control_store_exceptions import CtrlStoreSrcFileInvalidLineException
 
 # Fixture para criar arquivo temporário
@@ -43,5 +45,62 @@ def test_loader_file_not_found():
     with pytest.raises(FileNotFoundError):
         loader.load(store)
 
+def test_binary_cache_is_keyed_by_source_hash(sample_control_store_file):
+    CtrlStoreTxtSrcFileLoader.clear_memory_cache()
+    sources = []
+    for _ in range(2):
+        store = ControlStore(SignalSender(0), SignalSender(0), SignalSender(0), None)
+        loader = CtrlStoreTxtSrcFileLoader(sample_control_store_file)
+        loader.load(store)
+        sources.append(loader.loaded_from)
+        assert store.cell(10).to_bit_string() == "11110000000000000000000000001111"
+    CtrlStoreTxtSrcFileLoader.clear_memory_cache()
+    loader.load(store)
+    assert sources + [loader.loaded_from] == ["text", "memory", "disk"]
+    assert len(os.listdir(os.path.join(os.path.dirname(sample_control_store_file), "__pycache__"))) == 1
+
+    with open(sample_control_store_file, "a") as f:
+        f.write("\n11: 00000000000000000000000000000111")
+    loader.load(store)
+    assert loader.loaded_from == "text"
+    assert store.cell(11).to_int32() == 7
+
+def test_corrupted_cache_falls_back_to_text(sample_control_store_file):
+    CtrlStoreTxtSrcFileLoader.clear_memory_cache()
+    store = ControlStore(SignalSender(0), SignalSender(0), SignalSender(0), None)
+    loader = CtrlStoreTxtSrcFileLoader(sample_control_store_file)
+    loader.load(store)
+    cache = os.path.join(os.path.dirname(sample_control_store_file), "__pycache__")
+    for name in os.listdir(cache):
+        with open(os.path.join(cache, name), "wb") as f:
+            f.write(b"garbage")
+    CtrlStoreTxtSrcFileLoader.clear_memory_cache()
+    loader.load(store)
+    assert loader.loaded_from == "text"
+    assert store.cell(10).to_bit_string() == "11110000000000000000000000001111"
+
+def test_default_source_is_a_package_resource():
+    loader = CtrlStoreTxtSrcFileLoader()
+    assert os.path.isabs(loader.source_file_path)
+    assert os.path.exists(loader.source_file_path)
+
+def test_control_units_share_one_image():
+    first, second = Mic1(), Mic1()
+    a, b = first.control_unit.control_store, second.control_unit.control_store
+    assert a.shared and b.shared
+    assert a.words.obj is b.words.obj
+    with pytest.raises(TypeError):
+        a.words[0] = 1
+    original = b.cell(5)
+
+    a.set_cell(5, BitArray.from_int(1, 32)) # copy-on-write
+    assert not a.shared and b.shared
+    assert a.cell(5).to_int32() == 1 and b.cell(5) == original
+    assert a.dump_words(6) == b.dump_words(6)
+
+    b.reset()
+    assert not b.shared and b.dump_words() == [0] * 256
+    assert Mic1().control_unit.control_store.cell(5) == original
+
 if __name__ == "__main__":
     pytest.main()
\ No newline at end of file
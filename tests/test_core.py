@@ -30,6 +30,32 @@ def test_bitarray_ops():
     # b1 is 1010 (val 10). Expect 0101 (val 5).
     assert shifted.to_bit_string() == "0101"
 
+def test_bitarray_int_backing_matches_bit_semantics():
+    b = BitArray.from_bit_string("1010000000000011")
+    assert b.to_int32() == 0b1010000000000011
+    assert b.bits[0] and b.bits[1] and not b.bits[2]
+    assert b.shift_left().to_bit_string() == "0101000000000001"
+    assert b.shift_right().to_bit_string() == "0100000000000110"
+    assert b.trim_or_pad(4).to_bit_string() == "0011"
+    assert b.trim_or_pad(20).to_bit_string() == "00001010000000000011"
+    assert BitArray.from_bit_string("0011", lmsb=False).to_bit_string() == "1100"
+    assert BitArray.from_int(-1, 8).to_bit_string() == "11111111"
+    assert BitArray(0).to_bit_string() == "" and BitArray(0).has_all_set()
+
+    # and_op só combina os min(len) bits de menor ordem
+    wide = BitArray.from_bit_string("11111111")
+    wide.and_op(BitArray.from_bit_string("0101"))
+    assert wide.to_bit_string() == "11110101"
+
+    b[15] = False
+    b[2] = True
+    assert b.to_bit_string() == "0010000000000111"
+    assert b.clone().not_op().to_bit_string() == "1101111111111000"
+    with pytest.raises(IndexError):
+        b[16]
+    with pytest.raises(ValueError):
+        BitArray.from_bit_string("10_1")
+
 def test_mic1_instantiation():
     machine = Mic1()
     # Check Constant Registers
@@ -48,4 +74,4 @@ def test_alu_sum():
     assert res.to_int32() == 8
 
 if __name__ == "__main__":
-    pytest.main()
\ No newline at end of file
+    pytest.main()
@@ -0,0 +1,274 @@
+import random
+import textwrap
+import pytest
+from src.mic1.mic1 import Mic1
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.isa_interpreter import IsaInterpreter, decode_table, MNEMONICS
+from src.mic1.block_translator import BlockTranslator
+from src.mic1.micro_engine import MicroEngine
+from src.mic1.microcode_jit import MicrocodeJit
+from src.mic1.mi_register import MIRegister, FIELDS, decode_microinstruction
+from src.utils.bit_utils import BitArray
+from src.mic1.programs import MULTIPLICATION
+
+
+# Usa as 23 instruções, inclusive as de pilha e os desvios nos dois sentidos.
+STACK = """
+LOCO 7
+PUSH
+LOCO 3
+PUSH
+CALL SUB
+INSP 2
+STOD r1
+LOCO r1
+PSHI
+LOCO r2
+POPI
+LODD r2
+SUBD big
+JNEG NEG
+LOCO 99
+NEG: JNZE NZ
+LOCO 1
+NZ: DESP 3
+SWAP
+STOD r3
+SWAP
+INSP 3
+LOCO 0
+JZER Z
+LOCO 55
+Z: JPOS P
+LOCO 66
+P: STOD r4
+LODD neg
+ADDD neg
+JNEG N2
+LOCO 5
+N2: STOD r5
+LODD r1
+JUMP HALT
+SUB: LODL 1
+ADDL 2
+STOL 2
+LODL 2
+SUBL 1
+RETN
+HALT: JUMP HALT
+r1 = 0
+r2 = 0
+r3 = 0
+r4 = 0
+r5 = 0
+big = 1000
+neg = 40000
+"""
+
+def mic1_state(mic1):
+    registers = {r.name: r.out_sig.signal().to_int32() for r in mic1.registers}
+    registers["MBR_RD"] = mic1.mbr_rd.out_sig.signal().to_int32()
+    registers["MBR_WR"] = mic1.mbr_wr.out_sig.signal().to_int32()
+    registers = {name: registers[name] for name in IsaInterpreter.REGISTER_NAMES}
+    return registers, [mic1.mp.cell(i).to_int32() for i in range(4096)]
+
+def loaded_mic1(code=None, seed=None):
+    mic1 = Mic1()
+    if code is not None:
+        AssemblerV2.assemble(mic1.mp, textwrap.dedent(code))
+    else:
+        rnd = random.Random(seed)
+        for i in range(4096):
+            mic1.mp.set_cell(i, BitArray.from_int(rnd.randrange(1 << 16), 16))
+    return mic1
+
+class TestIsaInterpreter:
+    def test_decode_table_covers_every_word(self):
+        table = decode_table()
+        assert len(table) == 1 << 16
+        assert MNEMONICS[table[0x0123][0]] == "LODD" and table[0x0123][1] == 0x123
+        assert MNEMONICS[table[0xE456][0]] == "CALL" and table[0xE456][1] == 0x456
+        assert MNEMONICS[table[0xFC05][0]] == "INSP" and table[0xFC05][1] == 5
+        assert {MNEMONICS[entry[0]] for entry in table} == set(AssemblerV2.INSTRUCTION_SET)
+
+    def check_against_mic1(self, mic1, steps):
+        interpreter = IsaInterpreter.from_mic1(mic1)
+        for _ in range(steps):
+            mic1.step_macro()
+            interpreter.step()
+            registers, memory = mic1_state(mic1)
+            assert interpreter.registers() == registers
+            assert interpreter.memory == memory
+
+    def test_multiplication_matches_step_macro(self):
+        self.check_against_mic1(loaded_mic1(MULTIPLICATION), 60)
+
+    def test_all_instructions_match_step_macro(self):
+        self.check_against_mic1(loaded_mic1(STACK), 60)
+
+    def test_random_memory_matches_step_macro(self):
+        self.check_against_mic1(loaded_mic1(seed=1), 60)
+
+    def test_run_computes_multiplication(self):
+        interpreter = IsaInterpreter.from_mic1(loaded_mic1(MULTIPLICATION))
+        assert interpreter.run(1000) == 1000
+        assert interpreter.ac == 20
+        assert interpreter.memory[21] == 20 # final: x, y, res, c1 e final ficam a partir do endereço 17
+
+def mic1_micro_state(mic1):
+    return ([r.out_sig.signal().value for r in mic1.registers],
+            [s.signal().value for s in (mic1.mar.out_sig, mic1.mbr_rd.out_sig, mic1.mbr_wr.out_sig,
+                                        mic1.control_unit.mpc.out_sig, mic1.mir.out_sig)],
+            [mic1.mp.cell(i).value for i in range(4096)])
+
+def engine_micro_state(engine):
+    return (engine.registers, [engine.mar, engine.mbr_rd, engine.mbr_wr, engine.mpc, engine.mir], engine.memory)
+
+class TestMIRegister:
+    def test_fields_come_from_the_decoded_word(self):
+        mir = MIRegister()
+        changes = []
+        mir.out_alu.signal_changed += lambda sender, value: changes.append(value.value)
+        rnd = random.Random(5)
+        for _ in range(200):
+            word = rnd.getrandbits(32)
+            mir.set_data(BitArray.from_int(word, 32))
+            mi = decode_microinstruction(word)
+            assert mir.decoded == mi
+            assert [getattr(mir, f"out_{name}").signal() for name, _, _ in FIELDS] == \
+                [BitArray.from_int(value, length) for value, (_, _, length) in zip(mi, FIELDS)]
+        # Só as mudanças do campo chegam aos assinantes
+        assert changes and all(a != b for a, b in zip(changes, changes[1:]))
+
+    def test_decoding_is_shared_between_registers(self):
+        first, second = MIRegister(), MIRegister()
+        word = BitArray.from_int(0b1_01_10_00_0_0_0_0_1_0011_0000_0000_00011100, 32)
+        first.set_data(word)
+        second.set_data(word)
+        assert first.decoded is second.decoded
+        assert first.out_addr.signal() is second.out_addr.signal()
+
+class TestMicroEngine:
+    def test_decode_microinstruction_fields(self):
+        word = 0b1_01_10_00_0_0_0_0_1_0011_0000_0000_00011100 # 2: ir:=mbr; if n goto 28
+        mi = decode_microinstruction(word)
+        assert (mi.a_mux, mi.cond, mi.alu, mi.enc, mi.c, mi.addr) == (1, 1, 2, 1, 3, 28)
+        assert (mi.shifter, mi.mbr, mi.mar, mi.rd, mi.wr, mi.b, mi.a) == (0, 0, 0, 0, 0, 0, 0)
+
+    def test_micro_steps_match_step_micro(self):
+        mic1 = loaded_mic1(MULTIPLICATION)
+        engine = MicroEngine.from_mic1(mic1)
+        for _ in range(300):
+            mic1.step_micro()
+            engine.step_micro()
+            assert engine_micro_state(engine) == mic1_micro_state(mic1)
+
+    def test_macro_step_counts_match(self):
+        for mic1 in (loaded_mic1(STACK), loaded_mic1(seed=2)):
+            engine = MicroEngine.from_mic1(mic1)
+            for _ in range(40):
+                steps = 1
+                mic1.step_micro()
+                while mic1.control_unit.mpc.out_sig.signal().value != 0:
+                    mic1.step_micro()
+                    steps += 1
+                assert engine.step_macro() == steps
+                assert engine_micro_state(engine) == mic1_micro_state(mic1)
+
+    def test_requires_microinstruction_boundary(self):
+        mic1 = Mic1()
+        mic1.step_cycle()
+        mic1.step_cycle()
+        with pytest.raises(ValueError):
+            MicroEngine.from_mic1(mic1)
+
+class TestMicrocodeJit:
+    def test_micro_steps_match_step_micro(self):
+        mic1 = loaded_mic1(STACK)
+        engine = MicrocodeJit.from_mic1(mic1)
+        for _ in range(400):
+            mic1.step_micro()
+            engine.step_micro()
+            assert engine_micro_state(engine) == mic1_micro_state(mic1)
+
+    def test_macro_step_counts_match_micro_engine(self):
+        reference = MicroEngine.from_mic1(loaded_mic1(seed=3))
+        engine = MicrocodeJit.from_mic1(loaded_mic1(seed=3))
+        for _ in range(200):
+            assert engine.step_macro() == reference.step_macro()
+            assert engine_micro_state(engine) == engine_micro_state(reference)
+
+    def test_routines_only_contain_used_operations(self):
+        engine = MicrocodeJit.from_mic1(Mic1())
+        fetch = engine.source(0) # alu:=pc; mar:=pc; rd (sem ENC, sem desvio)
+        assert "h =" not in fetch and "v =" not in fetch and "return 1" in fetch
+        assert "r[3] = h" in engine.source(2) # ir:=mbr
+
+    def test_reload_recompiles_only_changed_words(self):
+        words = list(MicrocodeJit.from_mic1(Mic1()).control_store)
+        engine = MicrocodeJit(words)
+        assert engine.reused == 256
+        words[5] ^= 0b0110_0000_0000_0000_0000_0000_0000_0001
+        engine.load_control_store(words)
+        assert (engine.compiled, engine.reused) == (1, 255)
+
+# Laço que reescreve o próprio código: incrementa o operando do LOCO em INC.
+SELF_MODIFYING = """
+LOOP: LODD INC
+ADDD c1
+STOD INC
+INC: LOCO 0
+SUBD lim
+JNEG LOOP
+HALT: JUMP HALT
+c1 = 1
+lim = 10
+"""
+
+class TestBlockTranslator:
+    def check_against_interpreter(self, mic1, chunks):
+        reference = IsaInterpreter.from_mic1(mic1)
+        translator = BlockTranslator.from_mic1(mic1)
+        for chunk in chunks:
+            assert translator.run(chunk) == reference.run(chunk)
+            assert translator.registers() == reference.registers()
+            assert translator.memory == reference.memory
+        return translator
+
+    def test_programs_match_interpreter(self):
+        for program in (MULTIPLICATION, STACK, SELF_MODIFYING):
+            self.check_against_interpreter(loaded_mic1(program), [1, 2, 3, 50, 7, 1000, 33])
+
+    def test_random_memory_matches_interpreter(self):
+        rnd = random.Random(4)
+        for seed in range(5):
+            self.check_against_interpreter(loaded_mic1(seed=seed), [rnd.randrange(1, 100) for _ in range(20)])
+
+    def test_matches_step_macro(self):
+        mic1 = loaded_mic1(STACK)
+        translator = BlockTranslator.from_mic1(mic1)
+        for _ in range(60):
+            mic1.step_macro()
+            translator.step()
+            assert (translator.registers(), translator.memory) == mic1_state(mic1)
+
+    def test_writes_to_code_invalidate_blocks(self):
+        translator = self.check_against_interpreter(loaded_mic1(SELF_MODIFYING), [500])
+        assert translator.ac == 0
+        assert translator.memory[3] == 0x700A # LOCO 10
+        assert translator.invalidations >= 10
+
+        translator.write(0, 0x7000 | 42) # LOCO 42 no lugar de LODD INC
+        translator.pc = 0
+        translator.run(1)
+        assert translator.ac == 42
+
+    def test_loops_are_chained(self):
+        translator = BlockTranslator.from_mic1(loaded_mic1(MULTIPLICATION))
+        translator.run(1000)
+        assert translator.ac == 20
+        statistics = translator.statistics()
+        assert statistics["loops"] == 2 and statistics["invalidations"] == 0 # LOOP e HALT: JUMP HALT
+        assert statistics["translations"] == statistics["blocks"]
+        assert 0 < statistics["chain_hit_rate"] <= 1
+        assert statistics["loop_executions"] > 0
@@ -1,7 +1,11 @@
+import asyncio
 import pytest
 import textwrap
-from src.mic1.mic1 import Mic1
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from src.mic1.mic1 import Mic1, STOP_HALT, STOP_MAX_CYCLES, STOP_UNTIL, STOP_UNTIL_PC
 from src.mic1.assembler_v2 import AssemblerV2
+from src.utils.bit_utils import BitArray
+from src.mic1.programs import COUNTDOWN
 
 class TestControlUnit:
     def test_control_unit_initial_state(self):
@@ -45,8 +49,162 @@ class TestMic1Full:
         """
         self.assemble_and_load(mic1, code)
         
-        # 3000 ciclos para garantir que SlowMemory (delay=6) tenha tempo
-        for _ in range(10000):
-            mic1.step_macro()
-            
-        assert mic1.registers[1].out_sig.signal().to_int32() == 20
\ No newline at end of file
+        result = mic1.run(max_cycles=100000)
+
+        assert result.reason == STOP_HALT
+        assert mic1.registers[1].out_sig.signal().to_int32() == 20
+
+class TestEvaluationModes:
+    PROGRAM = COUNTDOWN
+
+    @staticmethod
+    def state(mic1):
+        values = [r.out_sig.signal().to_int32() for r in mic1.registers]
+        values += [s.signal().to_int32() for s in (
+            mic1.mar.out_sig, mic1.mbr_rd.out_sig, mic1.mbr_wr.out_sig, mic1.mir.out_sig,
+            mic1.control_unit.mpc.out_sig, mic1.alu.out_sig, mic1.shifter.out_sig, mic1.mp.out_sig)]
+        cells = [mic1.mp.cell(i).to_int32() for i in range(4096)]
+        return values, cells
+
+    def test_levelized_matches_event_mode(self):
+        machines = [Mic1(evaluation=mode) for mode in ("event", "levelized")]
+        for mic1 in machines:
+            AssemblerV2.assemble(mic1.mp, textwrap.dedent(self.PROGRAM))
+        for _ in range(300):
+            for mic1 in machines:
+                mic1.step_micro()
+            assert self.state(machines[0]) == self.state(machines[1])
+
+    def test_unknown_evaluation_mode(self):
+        with pytest.raises(ValueError):
+            Mic1(evaluation="lazy")
+
+class TestRun:
+    PROGRAM = TestEvaluationModes.PROGRAM # HALT no endereço 9, END no 8
+
+    def loaded(self, evaluation="event"):
+        mic1 = Mic1(evaluation=evaluation)
+        AssemblerV2.assemble(mic1.mp, textwrap.dedent(self.PROGRAM))
+        return mic1
+
+    def test_stops_on_halt(self):
+        for evaluation in Mic1.EVALUATION_MODES:
+            mic1 = self.loaded(evaluation)
+            result = mic1.run()
+            assert result.reason == STOP_HALT
+            assert result.macro_instructions == 2 + 3 * 6 + 2 + 1 + 1 # o JUMP HALT roda uma vez
+            assert result.cycles == 1 + 4 * result.micro_instructions
+            assert mic1.registers[0].out_sig.signal().to_int32() == 9
+
+    def test_until_pc_and_until(self):
+        mic1 = self.loaded()
+        assert mic1.run(until_pc=8).reason == STOP_UNTIL_PC
+        assert mic1.registers[1].out_sig.signal().to_int32() == 0
+
+        mic1 = self.loaded()
+        result = mic1.run(until=lambda m: m.mp.cell(10).to_int32() == 1) # x
+        assert result.reason == STOP_UNTIL
+        assert mic1.registers[2].out_sig.signal().to_int32() == 4096 - 1 # um PUSH ainda não rodou
+
+    def test_max_cycles_matches_step_cycle(self):
+        mic1, reference = self.loaded(), self.loaded()
+        assert mic1.run(max_cycles=7) == (STOP_MAX_CYCLES, 7, 1, 0)
+        assert mic1.run(max_cycles=50, stop_on_halt=False).reason == STOP_MAX_CYCLES
+        for _ in range(57):
+            reference.step_cycle()
+        assert TestEvaluationModes.state(mic1) == TestEvaluationModes.state(reference)
+
+class TestSnapshot:
+    PROGRAM = TestEvaluationModes.PROGRAM # LOOP no endereço 2, x no 10
+
+    @staticmethod
+    def trace(mic1, cycles):
+        states = []
+        for _ in range(cycles):
+            mic1.step_cycle()
+            states.append(([s.signal().value for _, s in mic1.signals()], mic1.mp.dump_words()))
+        return states
+
+    def test_restore_and_fork_continue_identically(self):
+        for evaluation in Mic1.EVALUATION_MODES:
+            # 55 trocas de fase: no meio de uma microinstrução, com uma escrita na memória em andamento
+            mic1 = TestRun().loaded(evaluation)
+            assert mic1.run(max_cycles=55).reason == STOP_MAX_CYCLES
+            assert mic1.mp.counter_wr < 6
+            snapshot = mic1.snapshot()
+            clone = mic1.fork()
+            expected = self.trace(mic1, 300)
+
+            assert self.trace(clone, 300) == expected
+            mic1.restore(snapshot)
+            assert self.trace(mic1, 300) == expected
+            other = Mic1("levelized" if evaluation == "event" else "event")
+            other.restore(snapshot)
+            assert self.trace(other, 300) == expected
+
+    def test_forks_branch_on_input_variants(self):
+        mic1 = TestRun().loaded()
+        assert mic1.run(until_pc=2).reason == STOP_UNTIL_PC
+        snapshot = mic1.snapshot()
+        for x in (1, 5, 2):
+            variant = mic1.fork()
+            variant.mp.set_cell(10, BitArray.from_int(x, 16))
+            assert variant.run().reason == STOP_HALT
+            assert variant.registers[2].out_sig.signal().to_int32() == 4096 - x # um PUSH por volta
+        assert mic1.mp.cell(10).to_int32() == 3
+        assert mic1.snapshot().signals == snapshot.signals
+
+    def test_snapshots_share_memory_pages(self):
+        mic1 = TestRun().loaded()
+        first = mic1.snapshot()
+        mic1.run()
+        second = mic1.snapshot()
+        changed = [i for i, (a, b) in enumerate(zip(first.memory, second.memory)) if a is not b]
+        assert changed == [len(first.memory) - 1] # a pilha; x terminou de volta em 0
+        assert second.control_store[0] is first.control_store[0]
+
+class TestRunAsync:
+    def test_matches_run_and_reports_progress(self):
+        expected = TestRun().loaded().run()
+        mic1 = TestRun().loaded()
+        progress = []
+        result = asyncio.run(mic1.run_async(yield_every=64, progress=progress.append))
+        assert result == expected
+        assert [p.reason for p in progress] == [None] * (len(progress) - 1) + [STOP_HALT]
+        assert all(a.cycles < b.cycles for a, b in zip(progress, progress[1:]))
+        assert asyncio.run(TestRun().loaded().run_async(max_cycles=333, yield_every=50)) == \
+            TestRun().loaded().run(max_cycles=333)
+
+    def test_machines_take_turns_and_can_be_cancelled(self):
+        order = []
+
+        async def main():
+            machines = [TestRun().loaded() for _ in range(2)]
+
+            def progress(k):
+                order.append(k)
+                if order.count(0) == 3:
+                    tasks[1].cancel()
+
+            tasks = [asyncio.create_task(m.run_async(yield_every=32, progress=lambda p, k=k: progress(k)))
+                     for k, m in enumerate(machines)]
+            with pytest.raises(asyncio.CancelledError):
+                await tasks[1]
+            await tasks[0]
+            return machines
+
+        machines = asyncio.run(main())
+        assert order[:5] == [0, 1, 0, 1, 0] and order.count(1) == 2
+        # Cancelada entre instruções: run() continua até o mesmo estado final
+        assert machines[1].control_unit.mpc.out_sig.signal().to_int32() == 0
+        assert machines[1].run().reason == STOP_HALT
+        assert TestEvaluationModes.state(machines[1]) == TestEvaluationModes.state(machines[0])
+
+    def test_executors(self):
+        expected = TestRun().loaded()
+        result = expected.run()
+        for executor in (ThreadPoolExecutor(1), ProcessPoolExecutor(1)):
+            with executor:
+                mic1 = TestRun().loaded()
+                assert asyncio.run(mic1.run_async(yield_every=100, executor=executor)) == result
+                assert TestEvaluationModes.state(mic1) == TestEvaluationModes.state(expected)
@@ -0,0 +1,107 @@
+import pytest
+import textwrap
+from src.mic1.mic1 import Mic1
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.time_travel import TimeTravel
+from src.utils.bit_utils import BitArray
+from src.mic1.programs import COUNTDOWN
+
+PROGRAM = COUNTDOWN
+X = 10
+
+def loaded(evaluation="event"):
+    mic1 = Mic1(evaluation)
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(PROGRAM))
+    return mic1
+
+def state(mic1):
+    return [s.signal().value for _, s in mic1.signals()], mic1.mp.dump_words()
+
+def reference(cycles, evaluation="event"):
+    mic1 = loaded(evaluation)
+    states = [state(mic1)]
+    for _ in range(cycles):
+        mic1.step_cycle()
+        states.append(state(mic1))
+    return states
+
+def test_seek_reproduces_every_cycle():
+    for evaluation in Mic1.EVALUATION_MODES:
+        states = reference(400, evaluation)
+        mic1 = loaded(evaluation)
+        history = TimeTravel(mic1, keyframe_interval=37, max_keyframes=None)
+        history.run(max_cycles=400)
+        for cycle in (399, 0, 250, 37, 38, 1, 400, 123, 74):
+            history.seek(cycle)
+            assert history.cycle == cycle
+            assert state(mic1) == states[cycle]
+
+def test_step_back_stops_where_stepping_forward_stops():
+    mic1 = loaded()
+    boundaries = []
+    for _ in range(12):
+        mic1.step_macro()
+        boundaries.append(mic1.clock.ticks + 1)
+
+    history = TimeTravel(loaded(), keyframe_interval=16)
+    for _ in range(12):
+        history.step_macro()
+    for expected in reversed(boundaries[:-1]):
+        history.step_back_macro()
+        assert history.cycle == expected
+        assert history.mic1.control_unit.mpc.out_sig.signal().to_int32() == 0
+
+    history.step_back_micro()
+    assert history.cycle == boundaries[0] - 4
+    assert history.mic1.clock.current_cycle() == 0
+
+def test_log_answers_without_replaying():
+    states = reference(300)
+    history = TimeTravel(loaded(), keyframe_interval=64)
+    history.run(max_cycles=300)
+    names = [name for name, _ in history.mic1.signals()]
+    for cycle in (0, 5, 150, 299):
+        assert history.value_at("AC", cycle) == states[cycle][0][names.index("AC")]
+        assert history.value_at("MP", cycle, X) == states[cycle][1][X]
+    assert history.cycle == 300
+
+    history.run()
+    writes = [change for change in history.changes() if change.source == "MP" and change.address == X]
+    assert [change.value for change in writes] == [3, 2, 1, 0]
+
+def test_old_history_is_evicted():
+    history = TimeTravel(loaded(), keyframe_interval=50, max_keyframes=3)
+    history.run(max_cycles=700)
+    assert history.keyframe_count == 3
+    assert all(change.cycle > history.oldest for change in history.changes())
+    with pytest.raises(ValueError):
+        history.seek(history.oldest - 1)
+    history.seek(history.oldest + 10)
+    assert state(history.mic1) == reference(history.oldest + 10)[-1]
+
+def test_writes_outside_the_history_replace_the_future():
+    history = TimeTravel(loaded(), keyframe_interval=32)
+    history.run(max_cycles=200)
+    history.seek(20)
+    history.mic1.mp.set_cell(X, BitArray.from_int(9, 16))
+    assert history.newest == 20
+
+    history.run(max_cycles=100)
+    history.seek(60)
+    history.seek(20)
+    assert history.mic1.mp.cell(X).to_int32() == 9
+    assert history.value_at("MP", 20, X) == 9
+
+def test_memory_lookups_follow_evictions_and_rewrites():
+    states = reference(700)
+    history = TimeTravel(loaded(), keyframe_interval=50, max_keyframes=3)
+    history.run(max_cycles=700)
+    for cycle in range(history.oldest, 701, 7):
+        for address in (X, 4093, 4094, 4095):
+            assert history.value_at("MP", cycle, address) == states[cycle][1][address]
+
+    history.seek(history.oldest + 20)
+    history.mic1.mp.set_cell(4095, BitArray.from_int(7, 16))
+    history.run(max_cycles=40)
+    assert history.value_at("MP", history.newest, 4095) == history.mic1.mp.cell(4095).to_int32()
+    assert history.value_at("MP", history.oldest, 4095) == states[history.oldest][1][4095]
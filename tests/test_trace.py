@@ -0,0 +1,74 @@
+import io
+import textwrap
+import pytest
+from src.mic1.mic1 import Mic1
+from src.mic1.assembler_v2 import AssemblerV2
+from src.utils.trace import (
+    tracer, tracing, TraceSink, RingBufferSink, FileSink, CallbackSink,
+    REGISTER, MEMORY, MICROINSTRUCTION, MACROINSTRUCTION, DEBUG, INFO, OFF,
+)
+TRACE_PROGRAM = """
+LOCO 3
+STOD 10
+HALT: JUMP HALT
+"""
+
+def test_tracing_disabled_is_silent(capsys):
+    mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(TRACE_PROGRAM))
+    mic1.run()
+    assert capsys.readouterr().out == ""
+    assert all(getattr(tracer, category) == OFF for category in (REGISTER, MEMORY, MICROINSTRUCTION, MACROINSTRUCTION))
+
+def test_ring_buffer_keeps_selected_categories():
+    mic1 = Mic1()
+    with tracing(RingBufferSink(categories=[MEMORY, MACROINSTRUCTION])) as sink:
+        AssemblerV2.assemble(mic1.mp, textwrap.dedent(TRACE_PROGRAM))
+        mic1.run()
+    assert tracer.memory == OFF
+    records = sink.records()
+    assert {r.category for r in records} == {MEMORY, MACROINSTRUCTION}
+    assert str(records[0]) == "MEMORY (MP) changing cell (0) to 0111000000000011"
+    assert [r.address for r in records if r.category == MACROINSTRUCTION] == [0, 1, 2, 2]
+    assert [(r.address, r.value) for r in records if r.category == MEMORY][-1] == (10, 3)
+
+    small = RingBufferSink(capacity=2)
+    with tracing(small):
+        mic1.step_micro()
+    assert len(small.records()) == 2
+
+def test_sinks_filter_by_level():
+    output = io.StringIO()
+    seen = []
+    mic1 = Mic1()
+    with tracing(FileSink(output, level=INFO)), tracing(CallbackSink(seen.append, categories=[REGISTER])):
+        mic1.step_macro()
+    # Só as instruções são INFO; step_macro para já no início da seguinte
+    assert output.getvalue() == "PC (0): 0000000000000000\nPC (1): 0000000000000000\n"
+    assert "MPC, changed: 00000001" in [str(record) for record in seen]
+
+def test_unknown_category():
+    with pytest.raises(ValueError):
+        RingBufferSink(categories=["bus"])
+
+def test_level_filtered_sink_skips_emit(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(tracer, "emit", lambda category, *args: emitted.append(category))
+    mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(TRACE_PROGRAM))
+    # Registradores, memória e microinstruções são DEBUG: nenhum evento é montado
+    with tracing(RingBufferSink(categories=[REGISTER, MEMORY, MICROINSTRUCTION], level=INFO)):
+        assert (tracer.register, tracer.memory, tracer.macroinstruction) == (INFO, INFO, OFF)
+        mic1.run()
+    assert emitted == []
+
+    mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(TRACE_PROGRAM))
+    with tracing(RingBufferSink(level=INFO)), tracing(RingBufferSink(categories=[MEMORY])):
+        assert (tracer.register, tracer.memory) == (INFO, DEBUG)
+        mic1.run()
+    assert set(emitted) == {MEMORY, MACROINSTRUCTION}
+
+def test_sink_needs_write():
+    with pytest.raises(TypeError):
+        TraceSink()
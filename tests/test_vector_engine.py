@@ -0,0 +1,102 @@
+import random
+import textwrap
+import pytest
+from src.mic1.mic1 import Mic1, STOP_HALT
+from src.mic1.assembler_v2 import AssemblerV2
+from src.mic1.isa_interpreter import IsaInterpreter
+from src.mic1.register_layout import REGISTER_NAMES
+from src.utils.bit_utils import BitArray
+from src.mic1.programs import MULTIPLICATION
+
+np = pytest.importorskip("numpy")
+from src.mic1.vector_engine import VectorEngine
+
+# Conta de 'n' até 0 empilhando cada valor; n negativo cai no outro ramo e
+# chama uma sub-rotina, então as lanes divergem no primeiro desvio
+PROGRAM = """
+LODD n
+JNEG NEG
+LOOP: JZER END
+PUSH
+SUBD c1
+JUMP LOOP
+NEG: CALL SUB
+END: STOD out
+HALT: JUMP HALT
+SUB: LOCO 77
+RETN
+n = 0
+c1 = 1
+out = 0
+"""
+N, OUT = 11, 13
+
+def loaded_program(program):
+    mic1 = Mic1()
+    AssemblerV2.assemble(mic1.mp, textwrap.dedent(program))
+    return mic1
+
+def loaded(n):
+    mic1 = loaded_program(PROGRAM)
+    mic1.mp.set_cell(N, BitArray.from_int(n & 0xFFFF, 16))
+    return mic1
+
+def mic1_registers(mic1):
+    registers = {r.name: r.out_sig.signal().to_int32() for r in mic1.registers}
+    registers["MBR_RD"] = mic1.mbr_rd.out_sig.signal().to_int32()
+    registers["MBR_WR"] = mic1.mbr_wr.out_sig.signal().to_int32()
+    return registers
+
+def test_lanes_match_independent_mic1_runs():
+    inputs = [3, 0, -2, 5]
+    engine = VectorEngine.from_mic1(loaded(0), len(inputs))
+    engine.memory[:, N] = np.array(inputs) & 0xFFFF
+    steps = engine.run()
+    assert engine.halted.all()
+
+    for lane, n in enumerate(inputs):
+        mic1 = loaded(n)
+        result = mic1.run()
+        assert result.reason == STOP_HALT
+        assert engine.instructions[lane] == result.macro_instructions
+        assert engine.lane_registers(lane) == mic1_registers(mic1)
+        assert engine.memory[lane].tolist() == mic1.mp.dump_words(0, 4096)
+    assert steps == engine.instructions.max()
+    assert engine.memory[:, OUT].tolist() == [0, 0, 77, 0]
+
+def test_multiplication_lanes_with_patched_inputs():
+    # As palavras 0 e 2 são o LOCO 5 e o LOCO 4 (x e y); o produto fica em final, no endereço 21
+    factors = [(5, 4), (0, 9), (7, 3), (12, 1)]
+    engine = VectorEngine.from_mic1(loaded_program(MULTIPLICATION), len(factors))
+    for lane, (x, y) in enumerate(factors):
+        engine.memory[lane, [0, 2]] = [0x7000 | x, 0x7000 | y]
+    engine.run()
+    assert engine.halted.all()
+    assert engine.memory[:, 21].tolist() == [x * y for x, y in factors]
+
+    mic1 = loaded_program(MULTIPLICATION)
+    mic1.mp.load_words(0, [0x7000 | 7])
+    mic1.mp.load_words(2, [0x7000 | 3])
+    mic1.run()
+    assert engine.lane_registers(2) == mic1_registers(mic1)
+
+def test_random_memories_match_isa_interpreter():
+    rnd = random.Random(4)
+    memories = [[rnd.randrange(1 << 16) for _ in range(4096)] for _ in range(64)]
+    engine = VectorEngine(memories)
+    interpreters = [IsaInterpreter(memory) for memory in memories]
+    for _ in range(50):
+        engine.step(stop_on_halt=False)
+        for lane, interpreter in enumerate(interpreters):
+            interpreter.step()
+            registers = engine.lane_registers(lane)
+            assert {name: registers[name] for name in IsaInterpreter.REGISTER_NAMES} == interpreter.registers()
+    assert all(engine.memory[lane].tolist() == interpreters[lane].memory for lane in range(64))
+    assert engine.registers[:, REGISTER_NAMES.index("MINUS1")].tolist() == [0xFFFF] * 64
+
+def test_run_needs_a_limit_without_halt_detection():
+    engine = VectorEngine([[0x6000]]) # JUMP 0
+    with pytest.raises(ValueError):
+        engine.run(stop_on_halt=False)
+    assert engine.run(10, stop_on_halt=False) == 10
+    assert engine.run() == 1 and engine.halted[0]